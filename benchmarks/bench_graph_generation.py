@@ -0,0 +1,196 @@
+"""
+Benchmark for graph generation across machine sizes and types.
+
+Creates synthetic machines with 10 to 100k states for all six machine classes
+and measures for each the latency of building the graph from scratch, the
+latency of a cached get_graph call, the peak memory allocated while building
+the graph and the size of its JSON. Every state has two outgoing transitions.
+Hierarchical machines nest ten states in every top level state.
+
+Results can be saved as a baseline and later runs compared against it. A run
+fails if the build latency or peak memory of a case exceeds its baseline by
+more than the tolerance, or if its JSON size changes at all.
+
+Usage:
+    python benchmarks/bench_graph_generation.py [--sizes N ...] [--machines NAME ...]
+        [--repeat N] [--save PATH] [--compare PATH] [--tolerance FRACTION]
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from transitions_reactflow import (
+    ReactFlowMachine,
+    HierarchicalReactFlowMachine,
+    LockedReactFlowMachine,
+    LockedHierarchicalReactFlowMachine,
+    AsyncReactFlowMachine,
+    HierarchicalAsyncReactFlowMachine,
+)
+
+MACHINES: Dict[str, type] = {
+    'ReactFlowMachine': ReactFlowMachine,
+    'HierarchicalReactFlowMachine': HierarchicalReactFlowMachine,
+    'LockedReactFlowMachine': LockedReactFlowMachine,
+    'LockedHierarchicalReactFlowMachine': LockedHierarchicalReactFlowMachine,
+    'AsyncReactFlowMachine': AsyncReactFlowMachine,
+    'HierarchicalAsyncReactFlowMachine': HierarchicalAsyncReactFlowMachine,
+}
+SIZES = [10, 100, 1000, 10000, 100000]
+# Number of nested states in every top level state of hierarchical machines
+CHILDREN = 10
+# Metrics that may grow by the tolerance before a run counts as a regression
+TIMED_METRICS = ('build_ms', 'peak_kib')
+
+
+def flat_definition(size: int) -> Dict[str, Any]:
+    """
+    Create the definition of a flat machine with size states and 2 * size transitions.
+
+    Every state has a 'next' transition to the following state and a 'jump'
+    transition to a state further away, so the graph is connected but not a
+    simple ring.
+    """
+    states = [f's{i}' for i in range(size)]
+    transitions = [['next', states[i], states[(i + 1) % size]] for i in range(size)]
+    transitions += [['jump', states[i], states[(i * 7 + 3) % size]] for i in range(size)]
+    return {'states': states, 'transitions': transitions, 'initial': states[0]}
+
+
+def nested_definition(size: int) -> Dict[str, Any]:
+    """
+    Create the definition of a hierarchical machine with size states and 2 * size transitions.
+
+    States are grouped into top level states with CHILDREN nested states each,
+    which are connected by nested 'next' and 'jump' transitions. The top level
+    states are connected in a ring.
+    """
+    groups = max(1, size // (CHILDREN + 1))
+    children = max(1, size // groups - 1)
+    states: List[Any] = []
+    for group in range(groups):
+        names = [f'c{i}' for i in range(children)]
+        nested = [['next', names[i], names[(i + 1) % children]] for i in range(children)]
+        nested += [['jump', names[i], names[(i * 3 + 1) % children]] for i in range(children)]
+        states.append({'name': f'g{group}', 'children': names, 'initial': names[0], 'transitions': nested})
+    transitions = [['next', f'g{i}', f'g{(i + 1) % groups}'] for i in range(groups)]
+    transitions += [['jump', f'g{i}', f'g{(i * 7 + 3) % groups}'] for i in range(groups)]
+    return {'states': states, 'transitions': transitions, 'initial': 'g0'}
+
+
+def create_machine(name: str, size: int) -> Any:
+    """Create a machine of the given class and size without auto transitions."""
+    definition = nested_definition(size) if 'Hierarchical' in name else flat_definition(size)
+    return MACHINES[name](auto_transitions=False, **definition)
+
+
+def timed(function: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    """Return the best run time of a function in milliseconds and its last result."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def measure(name: str, size: int, repeat: int) -> Dict[str, Any]:
+    """
+    Measure graph generation for one machine class and size.
+
+    Args:
+        name: Name of the machine class in MACHINES
+        size: Number of states
+        repeat: Number of runs, the fastest of which is reported
+
+    Returns:
+        Dictionary with the number of nodes and edges, the build and cached
+        latency in milliseconds, the peak memory in KiB and the JSON size in bytes
+    """
+    machine = create_machine(name, size)
+    build_ms, graph = timed(lambda: machine.get_graph(force_new=True), repeat)
+    cached_ms, _ = timed(machine.get_graph, repeat)
+
+    tracemalloc.start()
+    try:
+        machine.get_graph(force_new=True)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'nodes': len(graph['nodes']),
+        'edges': len(graph['edges']),
+        'build_ms': round(build_ms, 3),
+        'cached_ms': round(cached_ms, 4),
+        'peak_kib': round(peak / 1024, 1),
+        'json_bytes': len(json.dumps(graph).encode('utf-8')),
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            tolerance: float) -> List[str]:
+    """
+    Compare results with a baseline.
+
+    Args:
+        results: Results of this run keyed by case
+        baseline: Saved results keyed by case
+        tolerance: Allowed relative growth of build latency and peak memory
+
+    Returns:
+        Descriptions of all regressions, empty if there are none
+    """
+    regressions = []
+    for case, result in results.items():
+        expected = baseline.get(case)
+        if expected is None:
+            continue
+        for metric in TIMED_METRICS:
+            if result[metric] > expected[metric] * (1 + tolerance):
+                regressions.append(f"{case}: {metric} {result[metric]} exceeds baseline {expected[metric]}")
+        if result['json_bytes'] != expected['json_bytes']:
+            regressions.append(f"{case}: json_bytes {result['json_bytes']} differs from {expected['json_bytes']}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='numbers of states')
+    parser.add_argument('--machines', nargs='+', default=list(MACHINES), choices=list(MACHINES),
+                        help='machine classes')
+    parser.add_argument('--repeat', type=int, default=3, help='number of runs per measurement')
+    parser.add_argument('--save', help='write the results as a baseline to this JSON file')
+    parser.add_argument('--compare', help='compare the results with the baseline in this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed relative growth of build latency and peak memory (default 0.25)')
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, Any]] = {}
+    print(f"{'machine':<36}{'states':>8}{'edges':>8}{'build ms':>11}{'cached ms':>11}"
+          f"{'peak KiB':>11}{'JSON bytes':>12}")
+    for name in args.machines:
+        for size in args.sizes:
+            result = results[f'{name}/{size}'] = measure(name, size, args.repeat)
+            print(f"{name:<36}{result['nodes']:>8}{result['edges']:>8}{result['build_ms']:>11.2f}"
+                  f"{result['cached_ms']:>11.4f}{result['peak_kib']:>11.1f}{result['json_bytes']:>12}")
+
+    if args.save:
+        with open(args.save, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print(regression, file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
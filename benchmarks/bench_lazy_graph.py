@@ -0,0 +1,81 @@
+"""
+Micro-benchmark for trigger throughput with and without lazy_graph.
+
+Compares a plain transitions Machine with ReactFlowMachine in its default
+mode, where every transition updates the model graph's style overlay, and
+with lazy_graph=True, where transitions do not touch the graph at all.
+
+Usage:
+    python benchmarks/bench_lazy_graph.py [--triggers N] [--repeat N]
+"""
+
+import argparse
+import time
+from typing import Callable, Dict
+
+from transitions import Machine
+
+from transitions_reactflow import ReactFlowMachine
+
+STATES = ['idle', 'running', 'paused', 'stopped']
+TRANSITIONS = [
+    {'trigger': 'start', 'source': 'idle', 'dest': 'running'},
+    {'trigger': 'pause', 'source': 'running', 'dest': 'paused'},
+    {'trigger': 'resume', 'source': 'paused', 'dest': 'running'},
+    {'trigger': 'stop', 'source': ['running', 'paused'], 'dest': 'stopped'},
+    {'trigger': 'reset', 'source': 'stopped', 'dest': 'idle'},
+]
+CYCLE = ['start', 'pause', 'resume', 'stop', 'reset']
+
+
+def measure(factory: Callable[[], object], triggers: int, repeat: int) -> float:
+    """
+    Measure the best trigger throughput of a machine over several runs.
+
+    Args:
+        factory: Callable that creates a fresh machine
+        triggers: Number of triggers fired per run
+        repeat: Number of runs
+
+    Returns:
+        Triggers per second of the fastest run
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        machine = factory()
+        events = [getattr(machine, name) for name in CYCLE]
+        rounds = triggers // len(events)
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for event in events:
+                event()
+        best = min(best, time.perf_counter() - start)
+
+    return rounds * len(CYCLE) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--triggers', type=int, default=100000, help='triggers per run')
+    parser.add_argument('--repeat', type=int, default=5, help='number of runs')
+    args = parser.parse_args()
+
+    factories: Dict[str, Callable[[], object]] = {
+        'Machine': lambda: Machine(states=STATES, transitions=TRANSITIONS, initial='idle'),
+        'ReactFlowMachine': lambda: ReactFlowMachine(
+            states=STATES, transitions=TRANSITIONS, initial='idle'),
+        'ReactFlowMachine(lazy_graph=True)': lambda: ReactFlowMachine(
+            states=STATES, transitions=TRANSITIONS, initial='idle', lazy_graph=True),
+    }
+
+    baseline = None
+    print(f"{'machine':<36}{'triggers/s':>14}{'relative':>10}")
+    for name, factory in factories.items():
+        rate = measure(factory, args.triggers, args.repeat)
+        baseline = baseline or rate
+        print(f"{name:<36}{rate:>14,.0f}{rate / baseline:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+Benchmark for trigger throughput of React Flow machines and plain transitions machines.
+
+Compares every React Flow machine, in its default mode and with
+lazy_graph=True, with its counterpart without graph support:
+
+- ReactFlowMachine and Machine, triggered from one thread
+- LockedReactFlowMachine and LockedMachine, triggered from N threads
+- AsyncReactFlowMachine and AsyncMachine, triggered from N concurrent tasks
+
+Every thread or task drives its own model through a cycle of five triggers, so
+all models share the machine (and its lock) but never block each other's
+transitions. Besides triggers per second, the memory allocated per trigger is
+reported as the average tracemalloc peak of single triggers, which includes
+temporary objects that are freed before the trigger returns.
+
+Usage:
+    python benchmarks/bench_triggers.py [--triggers N] [--repeat N] [--workers N] [--json PATH]
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, List, Tuple
+
+from transitions import Machine
+from transitions.extensions import LockedMachine
+from transitions.extensions.asyncio import AsyncMachine
+
+from transitions_reactflow import AsyncReactFlowMachine, LockedReactFlowMachine, ReactFlowMachine
+
+STATES = ['idle', 'running', 'paused', 'stopped']
+TRANSITIONS = [
+    {'trigger': 'start', 'source': 'idle', 'dest': 'running'},
+    {'trigger': 'pause', 'source': 'running', 'dest': 'paused'},
+    {'trigger': 'resume', 'source': 'paused', 'dest': 'running'},
+    {'trigger': 'stop', 'source': ['running', 'paused'], 'dest': 'stopped'},
+    {'trigger': 'reset', 'source': 'stopped', 'dest': 'idle'},
+]
+CYCLE = ['start', 'pause', 'resume', 'stop', 'reset']
+# Triggers whose allocations are traced per case
+ALLOCATION_SAMPLES = 1000
+
+
+class Model:
+    """Plain model driven by one thread or task."""
+
+
+def create_models(machine_cls: type, count: int, **kwargs: Any) -> List[Model]:
+    """Create a machine of the given class with count models and return the models."""
+    models = [Model() for _ in range(count)]
+    machine_cls(model=models, states=STATES, transitions=TRANSITIONS, initial='idle', **kwargs)
+    return models
+
+
+def run_sync(models: List[Model], rounds: int) -> float:
+    """Run rounds trigger cycles on every model, each in its own thread, and return the wall time."""
+    def drive(model: Model) -> None:
+        events = [getattr(model, name) for name in CYCLE]
+        for _ in range(rounds):
+            for event in events:
+                event()
+
+    if len(models) == 1:
+        start = time.perf_counter()
+        drive(models[0])
+        return time.perf_counter() - start
+
+    threads = [threading.Thread(target=drive, args=(model,)) for model in models]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def run_async(models: List[Model], rounds: int) -> float:
+    """Run rounds trigger cycles on every model, each in its own task, and return the wall time."""
+    async def drive(model: Model) -> None:
+        events = [getattr(model, name) for name in CYCLE]
+        for _ in range(rounds):
+            for event in events:
+                await event()
+
+    async def main() -> float:
+        start = time.perf_counter()
+        await asyncio.gather(*(drive(model) for model in models))
+        return time.perf_counter() - start
+
+    return asyncio.run(main())
+
+
+def allocation_per_trigger(machine_cls: type, is_async: bool, **kwargs: Any) -> float:
+    """Return the average tracemalloc peak of single triggers in bytes."""
+    model = create_models(machine_cls, 1, **kwargs)[0]
+    events = [getattr(model, name) for name in CYCLE]
+    loop = asyncio.new_event_loop() if is_async else None
+    total = 0
+    try:
+        tracemalloc.start()
+        for i in range(ALLOCATION_SAMPLES):
+            event = events[i % len(events)]
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            if loop is not None:
+                loop.run_until_complete(event())
+            else:
+                event()
+            total += tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+        if loop is not None:
+            loop.close()
+    return total / ALLOCATION_SAMPLES
+
+
+def measure(machine_cls: type, is_async: bool, workers: int, triggers: int, repeat: int,
+            **kwargs: Any) -> Dict[str, float]:
+    """
+    Measure trigger throughput and allocation of a machine class.
+
+    Args:
+        machine_cls: Machine class to measure
+        is_async: Whether the machine's triggers are coroutines
+        workers: Number of threads or tasks, each with its own model
+        triggers: Total number of triggers per run
+        repeat: Number of runs, the fastest of which is reported
+        **kwargs: Additional arguments of the machine
+
+    Returns:
+        Dictionary with 'triggers_per_s' and 'bytes_per_trigger'
+    """
+    rounds = max(1, triggers // (workers * len(CYCLE)))
+    best = float('inf')
+    for _ in range(repeat):
+        models = create_models(machine_cls, workers, **kwargs)
+        elapsed = run_async(models, rounds) if is_async else run_sync(models, rounds)
+        best = min(best, elapsed)
+    return {
+        'triggers_per_s': rounds * len(CYCLE) * workers / best,
+        'bytes_per_trigger': allocation_per_trigger(machine_cls, is_async, **kwargs),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--triggers', type=int, default=100000, help='triggers per run')
+    parser.add_argument('--repeat', type=int, default=3, help='number of runs')
+    parser.add_argument('--workers', type=int, default=4, help='threads or tasks for locked and async machines')
+    parser.add_argument('--json', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    # Groups of (name, machine class, is_async, workers, machine arguments), the first entry is the baseline
+    groups: List[List[Tuple[str, type, bool, int, Dict[str, Any]]]] = [
+        [
+            ('Machine', Machine, False, 1, {}),
+            ('ReactFlowMachine', ReactFlowMachine, False, 1, {}),
+            ('ReactFlowMachine(lazy_graph=True)', ReactFlowMachine, False, 1, {'lazy_graph': True}),
+        ],
+        [
+            ('LockedMachine', LockedMachine, False, args.workers, {}),
+            ('LockedReactFlowMachine', LockedReactFlowMachine, False, args.workers, {}),
+            ('LockedReactFlowMachine(lazy_graph=True)', LockedReactFlowMachine, False, args.workers,
+             {'lazy_graph': True}),
+        ],
+        [
+            ('AsyncMachine', AsyncMachine, True, args.workers, {}),
+            ('AsyncReactFlowMachine', AsyncReactFlowMachine, True, args.workers, {}),
+            ('AsyncReactFlowMachine(lazy_graph=True)', AsyncReactFlowMachine, True, args.workers,
+             {'lazy_graph': True}),
+        ],
+    ]
+
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'machine':<42}{'workers':>8}{'triggers/s':>14}{'relative':>10}{'bytes/trigger':>15}")
+    for group in groups:
+        baseline = None
+        for name, machine_cls, is_async, workers, kwargs in group:
+            result = results[name] = measure(machine_cls, is_async, workers, args.triggers, args.repeat, **kwargs)
+            baseline = baseline or result['triggers_per_s']
+            result['relative'] = result['triggers_per_s'] / baseline
+            print(f"{name:<42}{workers:>8}{result['triggers_per_s']:>14,.0f}{result['relative']:>10.2f}"
+                  f"{result['bytes_per_trigger']:>15,.0f}")
+
+    if args.json:
+        with open(args.json, 'w') as results_file:
+            json.dump(results, results_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+// Decoder for the binary graph format of transitions_reactflow.columnar.pack
+
+const MAGIC = [0x52, 0x46, 0x47, 0x03]; // "RFG\x03"
+const HEADER_SIZE = 20;
+
+const readColumn = (view, offset, count) => {
+  const column = new Uint32Array(count);
+  for (let i = 0; i < count; i++) {
+    column[i] = view.getUint32(offset + 4 * i, true);
+  }
+  return [column, offset + 4 * count];
+};
+
+export const decodeColumnarGraph = (buffer) => {
+  const view = new DataView(buffer);
+  MAGIC.forEach((byte, i) => {
+    if (view.getUint8(i) !== byte) {
+      throw new Error("Data is not a binary React Flow graph");
+    }
+  });
+
+  const stringCount = view.getUint32(4, true);
+  const nodeCount = view.getUint32(8, true);
+  const edgeCount = view.getUint32(12, true);
+  const tableSize = view.getUint32(16, true);
+
+  let offset = HEADER_SIZE;
+  let lengths;
+  [lengths, offset] = readColumn(view, offset, stringCount);
+
+  const decoder = new TextDecoder();
+  const strings = new Array(stringCount);
+  let position = offset;
+  for (let i = 0; i < stringCount; i++) {
+    strings[i] = decoder.decode(new Uint8Array(buffer, position, lengths[i]));
+    position += lengths[i];
+  }
+  offset += tableSize;
+
+  let nodeIds, nodeLabels, parents, collapsed, sources, targets, labels, indices, counts, triggers;
+  [nodeIds, offset] = readColumn(view, offset, nodeCount);
+  [nodeLabels, offset] = readColumn(view, offset, nodeCount);
+  [parents, offset] = readColumn(view, offset, nodeCount);
+  [collapsed, offset] = readColumn(view, offset, nodeCount);
+  [sources, offset] = readColumn(view, offset, edgeCount);
+  [targets, offset] = readColumn(view, offset, edgeCount);
+  [labels, offset] = readColumn(view, offset, edgeCount);
+  [indices, offset] = readColumn(view, offset, edgeCount);
+  [counts, offset] = readColumn(view, offset, edgeCount);
+  [triggers, offset] = readColumn(
+    view,
+    offset,
+    counts.reduce((sum, count) => sum + count, 0),
+  );
+
+  const nodes = Array.from(nodeIds, (id, i) => {
+    const node = {
+      id: strings[id],
+      data: { label: strings[nodeLabels[i]] },
+      position: { x: 0, y: 0 },
+    };
+    if (collapsed[i]) {
+      node.data.collapsed = true;
+    }
+    if (parents[i] > 0) {
+      node.parentNode = strings[parents[i] - 1];
+    }
+    return node;
+  });
+
+  let triggerOffset = 0;
+  const edges = Array.from(sources, (source, i) => {
+    const key = `e-${strings[source]}-${strings[targets[i]]}`;
+    const edge = {
+      id: indices[i] > 0 ? `${key}-${indices[i]}` : key,
+      source: strings[source],
+      target: strings[targets[i]],
+      label: strings[labels[i]],
+    };
+    if (counts[i] > 0) {
+      // Merged edges list the triggers of all parallel edges
+      const merged = Array.from(
+        triggers.subarray(triggerOffset, triggerOffset + counts[i]),
+        (index) => strings[index],
+      );
+      edge.data = { triggers: merged, count: counts[i] };
+      triggerOffset += counts[i];
+    }
+    return edge;
+  });
+
+  return { nodes, edges };
+};
@@ -16,6 +16,8 @@ const MACHINE_LAYOUTS = {
   cicd: { direction: "LR" },
 };
 
+const topLeft = (node) => ({ x: node.x - node.width / 2, y: node.y - node.height / 2 });
+
 const getLayoutedElements = (nodes, edges, direction = "TB") => {
   const g = new dagre.graphlib.Graph();
   g.setDefaultEdgeLabel(() => ({}));
@@ -32,10 +34,13 @@ const getLayoutedElements = (nodes, edges, direction = "TB") => {
   dagre.layout(g);
 
   const layoutedNodes = nodes.map((node) => {
-    const pos = g.node(node.id);
+    // Dagre positions node centers, React Flow positions top-left corners
+    const pos = topLeft(g.node(node.id));
+    // Nested nodes are positioned relative to the top-left corner of their parent node
+    const parent = node.parentNode ? topLeft(g.node(node.parentNode)) : { x: 0, y: 0 };
     return {
       ...node,
-      position: { x: pos.x - 75, y: pos.y - 30 },
+      position: { x: pos.x - parent.x, y: pos.y - parent.y },
       sourcePosition: direction === "TB" ? "bottom" : "right",
       targetPosition: direction === "TB" ? "top" : "left",
     };
@@ -79,7 +84,10 @@ export default function App() {
     const flowNodes = currentData.nodes.map((node) => ({
       id: node.id,
       data: { label: node.data?.label || node.id },
-      position: { x: 0, y: 0 },
+      position: node.position || { x: 0, y: 0 },
+      parentNode: node.parentNode,
+      sourcePosition: node.sourcePosition,
+      targetPosition: node.targetPosition,
       className:
         "rounded px-4 py-3 min-w-max text-center font-medium border-2 border-gray-800 text-sm bg-white",
     }));
@@ -92,11 +100,16 @@ export default function App() {
       type: "smooth",
     }));
 
-    const [layoutedNodes, layoutedEdges] = getLayoutedElements(
-      flowNodes,
-      flowEdges,
-      MACHINE_LAYOUTS[selectedMachine]?.direction || "TB",
-    );
+    // Graphs laid out on the server carry handle positions, others use dagre
+    const [layoutedNodes, layoutedEdges] = flowNodes.every(
+      (node) => node.sourcePosition,
+    )
+      ? [flowNodes, flowEdges]
+      : getLayoutedElements(
+          flowNodes,
+          flowEdges,
+          MACHINE_LAYOUTS[selectedMachine]?.direction || "TB",
+        );
     setNodes(layoutedNodes);
     setEdges(layoutedEdges);
   }, [currentData, selectedMachine, setNodes, setEdges]);
@@ -1,12 +1,14 @@
 from collections import OrderedDict
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify
 from flask_cors import CORS
 from transitions_reactflow import (
     ReactFlowMachine,
     HierarchicalReactFlowMachine,
     LockedReactFlowMachine,
     AsyncReactFlowMachine,
+    LayeredLayout,
 )
+from transitions_reactflow.server import create_app
 
 app = Flask(__name__, static_folder='dist', static_url_path='')
 CORS(app)
@@ -103,9 +105,13 @@ machines = OrderedDict([
 ])
 
 
+# Layout direction per machine, positions are computed on the server
+layout_directions = {'traffic': 'TB', 'device': 'LR', 'auth': 'LR', 'cicd': 'LR'}
+
 graph_data = {
     name: {
-        'graph': machine.get_graph(),
+        # Transitions from three or more states, like 'fail', are drawn from one virtual node
+        'graph': machine.get_graph(layout=LayeredLayout(direction=layout_directions[name]), bundle_sources=3),
         'type': machine.__class__.__name__
     }
     for name, machine in machines.items()
@@ -118,11 +124,20 @@ def get_all_graph_data():
     return jsonify({name: data['graph'] for name, data in graph_data.items()})
 
 
-@app.route('/graph-data/<machine_name>')
-def get_graph_data_by_name(machine_name):
-    """Serve specific state machine graph data"""
-    if machine_name in graph_data:
-        return jsonify(graph_data[machine_name]['graph'])
+# /graph-data/<machine_name> and /graph-data/<machine_name>/overlay are served from
+# compressed caches with ETags, all other requests are passed to the Flask app
+graph_server = create_app(app=app.wsgi_app, bundle_sources=3)
+for name, machine in machines.items():
+    graph_server.register(name, machine, layout=LayeredLayout(direction=layout_directions[name]))
+app.wsgi_app = graph_server
+
+
+@app.route('/graph-data/<machine_name>.bin')
+def get_binary_graph_data_by_name(machine_name):
+    """Serve specific state machine graph data in the binary columnar format (see columnar.js)"""
+    if machine_name in machines:
+        data = machines[machine_name].get_graph(format='binary')
+        return Response(data, mimetype='application/octet-stream')
     return jsonify({'error': 'Machine not found'}), 404
 
 
@@ -150,7 +165,9 @@ if __name__ == '__main__':
     print("Starting server at http://localhost:5050")
     print("\nEndpoints:")
     print("  • http://localhost:5050/ (react app)")
-    print("  • http://localhost:5050/graph-data/<machine_name> (specific graph)")
+    print("  • http://localhost:5050/graph-data/<machine_name> (specific graph, cached with ETag)")
+    print("  • http://localhost:5050/graph-data/<machine_name>/overlay (active state)")
+    print("  • http://localhost:5050/graph-data/<machine_name>.bin (specific graph, binary)")
     print("  • http://localhost:5050/graph-data (all graphs)")
     print("  • http://localhost:5050/machines (machine info)")
     app.run(debug=True, port=5050)
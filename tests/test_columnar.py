@@ -0,0 +1,130 @@
+"""Tests for the columnar graph encodings."""
+
+import json
+
+import pytest
+from transitions_reactflow import EdgeRecord, HierarchicalReactFlowMachine, NodeRecord, ReactFlowMachine, columnar
+
+
+class TestColumnar:
+    """Test cases for the columnar and binary graph formats."""
+
+    def test_columnar_layout(self):
+        """Test that strings are stored once and referenced by index."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running'],
+            transitions=[['start', 'idle', 'running'], ['start', 'idle', 'running']],
+            initial='idle', auto_transitions=False)
+
+        columns = machine.get_graph(format='columnar')
+
+        assert columns == {
+            'version': columnar.COLUMNAR_VERSION,
+            'strings': ['idle', 'running', 'start'],
+            'nodes': {'id': [0, 1], 'label': [0, 1], 'parent': [0, 0], 'collapsed': [0, 0]},
+            'edges': {'source': [0, 0], 'target': [1, 1], 'label': [2, 2], 'index': [0, 1], 'count': [0, 0],
+                      'triggers': []},
+        }
+
+    def test_columnar_round_trip(self):
+        """Test that the columnar format survives JSON and restores the graph."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running', 'stopped'],
+            transitions=[
+                ['start', 'idle', 'running'],
+                ['restart', 'idle', 'running'],
+                ['stop', ['idle', 'running'], 'stopped'],
+            ],
+            initial='idle')
+
+        columns = json.loads(json.dumps(machine.get_graph(format='columnar')))
+
+        assert columnar.from_columns(columns) == machine.get_graph()
+
+    def test_binary_round_trip(self):
+        """Test that the binary format restores the graph."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running', 'stopped'],
+            transitions=[
+                ['start', 'idle', 'running'],
+                ['restart', 'idle', 'running'],
+                ['stop', ['idle', 'running'], 'stopped'],
+            ],
+            initial='idle')
+
+        data = machine.get_graph(format='binary')
+
+        assert data.startswith(columnar.BINARY_MAGIC)
+        assert columnar.unpack(data) == machine.get_graph()
+
+    def test_binary_format_is_cached(self):
+        """Test that encodings are cached until the topology changes."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running', 'stopped'],
+            transitions=[
+                ['start', 'idle', 'running'],
+                ['restart', 'idle', 'running'],
+                ['stop', ['idle', 'running'], 'stopped'],
+            ],
+            initial='idle')
+        data = machine.get_graph(format='binary')
+
+        assert machine.get_graph(format='binary') is data
+
+        machine.add_transition('reset', 'stopped', 'idle')
+        data = machine.get_graph(format='binary')
+        assert [edge['label'] for edge in columnar.unpack(data)['edges']][-1] == 'reset'
+
+    def test_ids_after_removal(self):
+        """Test that edge IDs with gaps are restored."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running', 'stopped'],
+            transitions=[
+                ['start', 'idle', 'running'],
+                ['restart', 'idle', 'running'],
+                ['stop', ['idle', 'running'], 'stopped'],
+            ],
+            initial='idle')
+        machine.get_graph()
+        machine.remove_transition('start')
+
+        assert columnar.unpack(machine.get_graph(format='binary')) == machine.get_graph()
+
+    def test_unicode_names(self):
+        """Test that non-ASCII state names are encoded."""
+        nodes = [NodeRecord('größe', 'Größe'), NodeRecord('ende', 'ende')]
+        edges = [EdgeRecord('e-größe-ende', 'größe', 'ende', 'weiter')]
+
+        graph = columnar.unpack(columnar.pack(nodes, edges))
+
+        assert graph['nodes'][0]['data']['label'] == 'Größe'
+        assert graph['edges'][0]['id'] == 'e-größe-ende'
+
+    def test_nested_states(self):
+        """Test that parents and collapsed flags of nested states are restored."""
+        machine = HierarchicalReactFlowMachine(
+            states=['idle', {'name': 'busy', 'children': ['a', {'name': 'b', 'children': ['x', 'y']}]}],
+            transitions=[['go', 'idle', 'busy_a'], ['next', 'busy_a', 'busy_b_x']],
+            initial='idle', auto_transitions=False)
+
+        for options in ({}, {'max_depth': 1}):
+            data = machine.get_graph(format='binary', **options)
+            assert columnar.unpack(data) == machine.get_graph(**options)
+
+    def test_invalid_edge_id(self):
+        """Test that edge IDs outside the ID scheme are rejected."""
+        with pytest.raises(ValueError, match="cannot be encoded"):
+            columnar.to_columns([], [EdgeRecord('custom', 'a', 'b', 'go')])
+
+    def test_invalid_payload(self):
+        """Test that malformed payloads raise ValueError."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running'], transitions=[['start', 'idle', 'running']], initial='idle')
+        data = machine.get_graph(format='binary')
+
+        with pytest.raises(ValueError, match="not a binary"):
+            columnar.unpack(b'XXXX' + data[4:])
+        with pytest.raises(ValueError, match="Malformed"):
+            columnar.unpack(data[:-4])
+        with pytest.raises(ValueError, match="Unsupported"):
+            columnar.from_columns({'version': 0})
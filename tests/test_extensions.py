@@ -1,5 +1,7 @@
 """Tests for ReactFlow extension machine classes."""
 
+import json
+import pickle
 import pytest
 import threading
 import time
@@ -10,6 +12,9 @@ from transitions_reactflow import (
     LockedHierarchicalReactFlowMachine,
     AsyncReactFlowMachine,
     HierarchicalAsyncReactFlowMachine,
+    GraphStats,
+    TransitionRecorder,
+    generate_graphs,
 )
 
 
@@ -113,6 +118,15 @@ class TestReactFlowMachine:
         result = machine._init_graphviz_engine('graphviz')
         assert result != ReactFlowGraph
 
+    def test_add_internal_transition(self):
+        """Test that transitions can be added without a destination, like in Machine."""
+        machine = ReactFlowMachine(states=['a', 'b'], initial='a', auto_transitions=False)
+        machine.get_graph()
+
+        machine.add_transition('tick', 'a')
+
+        assert machine.get_graph()['edges'] == [{'id': 'e-a-a', 'source': 'a', 'target': 'a', 'label': 'tick'}]
+
 
 class TestHierarchicalReactFlowMachine:
     """Test cases for HierarchicalReactFlowMachine."""
@@ -240,6 +254,25 @@ class TestLockedReactFlowMachine:
         assert isinstance(graph['nodes'], list)
         assert isinstance(graph['edges'], list)
 
+    def test_add_model_with_context(self):
+        """Test that models can be added with a model context, like in LockedMachine."""
+        entered = []
+
+        class Context:
+            def __enter__(self):
+                entered.append(True)
+
+            def __exit__(self, *exc):
+                return False
+
+        machine = LockedReactFlowMachine(states=['a', 'b'], transitions=[['go', 'a', 'b']], initial='a')
+        model = type('Model', (), {})()
+        machine.add_model(model, model_context=Context())
+
+        model.go()
+        assert entered == [True]
+        assert [node['id'] for node in model.get_graph()['nodes']] == ['a', 'b']
+
 
 class TestLockedHierarchicalReactFlowMachine:
     """Test cases for LockedHierarchicalReactFlowMachine."""
@@ -386,6 +419,36 @@ class TestAsyncReactFlowMachine:
         assert isinstance(graph['nodes'], list)
         assert isinstance(graph['edges'], list)
 
+    @pytest.mark.asyncio
+    async def test_overlay_marks_active_state(self):
+        """Test that the overlay marks the current state as active after a transition."""
+        for machine_cls in (AsyncReactFlowMachine, HierarchicalAsyncReactFlowMachine):
+            machine = machine_cls(
+                states=['a', 'b'],
+                transitions=[{'trigger': 'go', 'source': 'a', 'dest': 'b'}],
+                initial='a')
+            version = machine.get_graph_overlay()['version']
+
+            await machine.go()
+            overlay = machine.get_graph_overlay()
+            assert overlay['nodes'] == {'a': {'className': 'previous'},
+                                        'b': {'className': 'active'}}
+            assert overlay['edges'] == {'e-a-b': {'className': 'previous'}}
+            assert overlay['version'] > version
+            # Reading the overlay again does not change it
+            assert machine.get_graph_overlay() == overlay
+
+    @pytest.mark.asyncio
+    async def test_overlay_marks_fired_trigger(self):
+        """Test that only the edge of the fired trigger is marked among parallel edges."""
+        for machine_cls in (AsyncReactFlowMachine, HierarchicalAsyncReactFlowMachine):
+            machine = machine_cls(
+                states=['a', 'b'], transitions=[['go', 'a', 'b'], ['jump', 'a', 'b']], initial='a')
+
+            await machine.jump()
+
+            assert machine.get_graph_overlay()['edges'] == {'e-a-b-1': {'className': 'previous'}}
+
 
 class TestHierarchicalAsyncReactFlowMachine:
     """Test cases for HierarchicalAsyncReactFlowMachine."""
@@ -547,3 +610,654 @@ class TestMachineInteroperability:
             # The graph should be generated without errors
             graph = machine.get_graph()
             assert isinstance(graph, dict)
+
+
+class TestLazyGraph:
+    """Test cases for machines created with lazy_graph=True."""
+
+    def test_no_graph_until_requested(self):
+        """Test that lazy machines create graphs only on get_graph."""
+        states = ['idle', 'running']
+        transitions = [
+            {'trigger': 'start', 'source': 'idle', 'dest': 'running'},
+            {'trigger': 'stop', 'source': 'running', 'dest': 'idle'},
+        ]
+
+        for machine_cls in (ReactFlowMachine, HierarchicalReactFlowMachine,
+                            LockedReactFlowMachine, LockedHierarchicalReactFlowMachine):
+            machine = machine_cls(
+                states=states, transitions=transitions, initial='idle', lazy_graph=True)
+
+            machine.start()
+            assert machine.model_graphs == {}
+
+            graph = machine.get_graph()
+            assert len(graph['nodes']) == 2
+            assert len(graph['edges']) == 2
+            assert len(machine.model_graphs) == 1
+
+    def test_transitions_do_not_touch_graph(self):
+        """Test that transitions of lazy machines do not update the graph."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running'],
+            transitions=[{'trigger': 'start', 'source': 'idle', 'dest': 'running'}],
+            initial='idle', lazy_graph=True)
+        machine.get_graph()
+        graph = machine.model_graphs[id(machine)]
+        version = graph.overlay_version
+
+        machine.start()
+        assert graph.overlay_version == version
+
+    def test_active_state_synchronized_on_read(self):
+        """Test that the overlay of lazy machines reflects the current state."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running'],
+            transitions=[{'trigger': 'start', 'source': 'idle', 'dest': 'running'}],
+            initial='idle', lazy_graph=True)
+
+        assert machine.get_graph_overlay()['nodes'] == {'idle': {'className': 'active'}}
+        machine.start()
+        assert machine.get_graph_overlay()['nodes'] == {'running': {'className': 'active'}}
+
+    def test_lazy_topology_changes(self):
+        """Test that topology changes before the first get_graph are included."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running'],
+            transitions=[{'trigger': 'start', 'source': 'idle', 'dest': 'running'}],
+            initial='idle', lazy_graph=True)
+
+        machine.add_transition('stop', 'running', 'idle')
+
+        assert len(machine.get_graph()['edges']) == 2
+
+    @pytest.mark.asyncio
+    async def test_async_transitions(self):
+        """Test that lazy async machines trigger transitions without creating graphs."""
+        for machine_cls in (AsyncReactFlowMachine, HierarchicalAsyncReactFlowMachine):
+            machine = machine_cls(
+                states=['idle', 'running'],
+                transitions=[{'trigger': 'start', 'source': 'idle', 'dest': 'running'}],
+                initial='idle', lazy_graph=True)
+
+            await machine.start()
+            assert machine.state == 'running'
+            assert machine.model_graphs == {}
+            assert machine.get_graph_overlay()['nodes'] == {'running': {'className': 'active'}}
+
+    @pytest.mark.asyncio
+    async def test_async_transitions_do_not_touch_graph(self):
+        """Test that transitions of lazy async machines do not update an existing graph."""
+        for machine_cls in (AsyncReactFlowMachine, HierarchicalAsyncReactFlowMachine):
+            machine = machine_cls(
+                states=['idle', 'running'],
+                transitions=[{'trigger': 'start', 'source': 'idle', 'dest': 'running'},
+                             {'trigger': 'stop', 'source': 'running', 'dest': 'idle'}],
+                initial='idle', lazy_graph=True)
+            machine.get_graph()
+            graph = machine.model_graphs.get(id(machine))
+            version = graph.overlay_version
+
+            await machine.start()
+            assert graph.overlay_version == version
+            assert machine.get_graph_overlay()['nodes'] == {'running': {'className': 'active'}}
+
+            restored = pickle.loads(pickle.dumps(machine))
+            graph = restored.model_graphs.get(id(restored))
+            version = graph.overlay_version
+            await restored.stop()
+            assert graph.overlay_version == version
+            assert restored.get_graph_overlay()['nodes'] == {'idle': {'className': 'active'}}
+
+
+class TestSharedGraph:
+    """Test cases for the node/edge index shared by all models of a machine."""
+
+    class Model:
+        pass
+
+    def test_models_share_topology(self):
+        """Test that all model graphs use the same node/edge index."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running'],
+            transitions=[{'trigger': 'start', 'source': 'idle', 'dest': 'running'}],
+            initial='idle')
+        models = [self.Model() for _ in range(3)]
+        machine.add_model(models)
+
+        graphs = [machine.model_graphs[id(model)] for model in [machine] + models]
+        assert len({id(graph) for graph in graphs}) == 4
+        assert len({id(graph._topology) for graph in graphs}) == 1
+        assert models[0].get_graph() == machine.get_graph()
+
+    def test_topology_change_visible_to_all_models(self):
+        """Test that a topology change is applied once for all models."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running', 'stopped'],
+            transitions=[{'trigger': 'start', 'source': 'idle', 'dest': 'running'}],
+            initial='idle')
+        model = self.Model()
+        machine.add_model(model)
+
+        machine.add_transition('stop', 'running', 'stopped')
+
+        assert len(model.get_graph()['edges']) == 2
+        assert model.get_graph() == machine.get_graph()
+
+    def test_force_new_rebuilds_topology(self):
+        """Test that regenerating an existing graph rebuilds the shared index."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running'],
+            transitions=[{'trigger': 'start', 'source': 'idle', 'dest': 'running'}],
+            initial='idle')
+        topology = machine.model_graphs[id(machine)]._topology
+
+        machine.get_graph(force_new=True)
+
+        assert machine.model_graphs[id(machine)]._topology is not topology
+
+    def test_pickle_machine(self):
+        """Test that pickled machines rebuild the shared index."""
+        import pickle
+
+        machine = ReactFlowMachine(
+            states=['idle', 'running'],
+            transitions=[{'trigger': 'start', 'source': 'idle', 'dest': 'running'}],
+            initial='idle')
+        graph = machine.get_graph()
+
+        restored = pickle.loads(pickle.dumps(machine))
+
+        assert restored.get_graph() == graph
+        assert restored.get_graph_overlay()['nodes'] == {'idle': {'className': 'active'}}
+
+
+class TestAsyncGraph:
+    """Test cases for graph generation that does not block the event loop."""
+
+    @pytest.mark.asyncio
+    async def test_matches_get_graph(self):
+        """Test that the asynchronous graph equals the synchronous one."""
+        machine = AsyncReactFlowMachine(
+            states=['idle', 'running', 'stopped'],
+            transitions=[
+                {'trigger': 'start', 'source': 'idle', 'dest': 'running'},
+                {'trigger': 'stop', 'source': 'running', 'dest': 'stopped'}
+            ],
+            initial='idle')
+        machine.add_transition('reset', 'stopped', 'idle')
+
+        graph = await machine.get_graph_async()
+
+        assert graph == machine.get_graph()
+        assert await machine.get_graph_async(format='columnar') == machine.get_graph(format='columnar')
+
+    @pytest.mark.asyncio
+    async def test_stats(self):
+        """Test that asynchronous graph generation records its stages."""
+        stats = GraphStats()
+        machine = AsyncReactFlowMachine(
+            states=['idle', 'running'],
+            transitions=[{'trigger': 'start', 'source': 'idle', 'dest': 'running'}],
+            initial='idle', lazy_graph=True, graph_stats=stats)
+
+        await machine.get_graph_async(serialize=True)
+        await machine.get_graph_async()
+
+        assert {'read', 'edges', 'nodes', 'index', 'render', 'serialize'} <= set(stats.timings)
+        assert stats.counters['index_misses'] == 1
+        assert stats.counters['index_hits'] == 1
+
+    @pytest.mark.asyncio
+    async def test_installs_topology(self):
+        """Test that an index built in the executor is used by later calls."""
+        machine = AsyncReactFlowMachine(
+            states=['idle', 'running'],
+            transitions=[{'trigger': 'start', 'source': 'idle', 'dest': 'running'}],
+            initial='idle', lazy_graph=True)
+
+        await machine.get_graph_async()
+        topology = machine.model_graphs.get(id(machine))._topology
+        machine.get_graph()
+
+        assert machine.model_graphs.get(id(machine))._topology is topology
+
+    @pytest.mark.asyncio
+    async def test_serialize(self):
+        """Test that graphs can be returned as JSON."""
+        import json
+
+        machine = AsyncReactFlowMachine(
+            states=['idle', 'running'],
+            transitions=[{'trigger': 'start', 'source': 'idle', 'dest': 'running'}],
+            initial='idle')
+
+        assert json.loads(await machine.get_graph_async(serialize=True)) == machine.get_graph()
+        with pytest.raises(ValueError, match="cannot be serialized"):
+            await machine.get_graph_async(serialize=True, format='binary')
+
+    @pytest.mark.asyncio
+    async def test_snapshot_of_call_time(self):
+        """Test that changes during rendering neither race with nor show up in the result."""
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        machine = AsyncReactFlowMachine(
+            states=['idle', 'running', 'stopped'],
+            transitions=[{'trigger': 'start', 'source': 'idle', 'dest': 'running'}],
+            initial='idle')
+        graph = machine.model_graphs[id(machine)]
+        topology = graph._topology
+        started, release = threading.Event(), threading.Event()
+        render = graph._render_graph
+
+        def blocked_render(*args, **kwargs):
+            started.set()
+            release.wait(5)
+            return render(*args, **kwargs)
+
+        graph._render_graph = blocked_render
+        with ThreadPoolExecutor(1) as executor:
+            task = asyncio.ensure_future(machine.get_graph_async(executor=executor))
+            while not started.is_set():
+                await asyncio.sleep(0.001)
+            # The event loop is not blocked while the graph is rendered
+            await machine.start()
+            machine.add_transition('stop', 'running', 'stopped')
+            release.set()
+            result = await task
+        del graph._render_graph
+
+        assert len(result['edges']) == 1
+        assert len(topology.get_graph()['edges']) == 1
+        assert len(machine.get_graph()['edges']) == 2
+        assert machine.state == 'running'
+
+    @pytest.mark.asyncio
+    async def test_hierarchical_views(self):
+        """Test regions and views of hierarchical machines."""
+        machine = HierarchicalAsyncReactFlowMachine(
+            states=['idle', {'name': 'busy', 'children': ['a', 'b'], 'initial': 'a'}],
+            transitions=[
+                {'trigger': 'start', 'source': 'idle', 'dest': 'busy'},
+                {'trigger': 'next', 'source': 'busy_a', 'dest': 'busy_b'}
+            ],
+            initial='idle')
+        await machine.start()
+
+        assert await machine.get_graph_async(max_depth=0) == machine.get_graph(max_depth=0)
+        assert await machine.get_graph_async(collapsed='busy') == machine.get_graph(collapsed='busy')
+        assert await machine.get_graph_async(show_roi=True) == machine.get_graph(show_roi=True)
+
+    def test_flat_snapshot_matches_markup(self):
+        """Test that flat machines read without markup build the same index."""
+        import enum
+
+        class States(enum.Enum):
+            IDLE = 1
+            RUNNING = 2
+
+        machine = AsyncReactFlowMachine(
+            states=States,
+            transitions=[
+                {'trigger': 'start', 'source': States.IDLE, 'dest': States.RUNNING},
+                {'trigger': 'ping', 'source': States.RUNNING, 'dest': None}
+            ],
+            initial=States.IDLE, show_auto_transitions=True)
+        machine.add_states('paused')
+        graph = machine.model_graphs[id(machine)]
+        fingerprint = graph._topology_fingerprint()
+
+        expected = graph._build_topology(fingerprint, *graph._read_elements()).get_graph()
+        assert graph._build_topology(fingerprint, *graph._snapshot_elements()).get_graph() == expected
+
+
+class TestGraphSnapshots:
+    """Test cases for the copy-on-write graph snapshots of locked machines."""
+
+    def test_changes_publish_new_snapshot(self):
+        """Test that topology changes replace the index instead of changing it."""
+        machine = LockedReactFlowMachine(
+            states=['idle', 'running', 'stopped'],
+            transitions=[{'trigger': 'start', 'source': 'idle', 'dest': 'running'}],
+            initial='idle')
+        graph = machine.model_graphs[id(machine)]
+        topology = graph._topology
+        before = machine.get_graph()
+
+        machine.add_transition('stop', 'running', 'stopped')
+
+        assert graph._topology is not topology
+        assert topology.get_graph() == before
+        assert len(before['edges']) == 1
+        assert len(machine.get_graph()['edges']) == 2
+
+        # Clients holding the previous snapshot catch up with its diff
+        edges = {edge['id']: edge for edge in before['edges']}
+        for change in graph.diff(topology.version)['edges']:
+            if change['type'] == 'remove':
+                del edges[change['id']]
+            else:
+                edges[change['item']['id']] = change['item']
+        assert list(edges.values()) == machine.get_graph()['edges']
+
+    def test_unread_snapshot_changed_in_place(self):
+        """Test that deltas copy the index only after it was read, and share the change log."""
+        machine = LockedReactFlowMachine(
+            states=['idle', 'running', 'stopped'],
+            transitions=[{'trigger': 'start', 'source': 'idle', 'dest': 'running'}],
+            initial='idle')
+        graph = machine.model_graphs[id(machine)]
+        machine.get_graph()
+        shared = graph._topology
+
+        machine.add_transition('stop', 'running', 'stopped')
+        copied = graph._topology
+        machine.add_transition('reset', 'stopped', 'idle')
+
+        assert copied is not shared
+        assert graph._topology is copied
+        assert copied._log[2][2] is shared._log
+        assert len(shared.get_graph()['edges']) == 1
+        assert len(machine.get_graph()['edges']) == 3
+
+    def test_read_without_lock(self):
+        """Test that graphs are read while another thread holds the machine lock."""
+        entered, release = threading.Event(), threading.Event()
+
+        def block(*args):
+            entered.set()
+            release.wait(5)
+
+        machine = LockedReactFlowMachine(
+            states=['idle', {'name': 'running', 'on_enter': block}],
+            transitions=[{'trigger': 'start', 'source': 'idle', 'dest': 'running'}],
+            initial='idle')
+        machine.add_transition('stop', 'running', 'idle')
+        thread = threading.Thread(target=machine.start)
+        thread.start()
+        try:
+            assert entered.wait(5)
+            start = time.perf_counter()
+            graph = machine.get_graph()
+            assert time.perf_counter() - start < 1
+        finally:
+            release.set()
+            thread.join()
+
+        assert len(graph['edges']) == 2
+
+    def test_concurrent_reads_are_consistent(self):
+        """Test that readers never see a partially applied change."""
+        states = [f's{i}' for i in range(50)]
+        machine = LockedReactFlowMachine(
+            states=states,
+            transitions=[{'trigger': 'next', 'source': states[i], 'dest': states[i + 1]} for i in range(49)],
+            initial='s0', auto_transitions=False)
+        errors = []
+        done = threading.Event()
+
+        def read():
+            while not done.is_set():
+                graph = machine.get_graph()
+                nodes = {node['id'] for node in graph['nodes']}
+                edge_ids = [edge['id'] for edge in graph['edges']]
+                if len(set(edge_ids)) != len(edge_ids) or any(
+                        edge['source'] not in nodes or edge['target'] not in nodes for edge in graph['edges']):
+                    errors.append(graph)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        try:
+            for i in range(200):
+                machine.add_transition(f'jump{i}', states[i % 50], states[(i * 7) % 50])
+                if i >= 5:
+                    machine.remove_transition(f'jump{i - 5}')
+        finally:
+            done.set()
+            for reader in readers:
+                reader.join()
+
+        assert errors == []
+        edges = sorted((edge['source'], edge['target'], edge['label']) for edge in machine.get_graph()['edges'])
+        rebuilt = machine.get_graph(force_new=True)
+        assert edges == sorted((edge['source'], edge['target'], edge['label']) for edge in rebuilt['edges'])
+
+    def test_hierarchical_snapshot_rebuilt_once(self):
+        """Test that outdated snapshots of hierarchical machines are rebuilt under the lock."""
+        machine = LockedHierarchicalReactFlowMachine(
+            states=['idle', {'name': 'busy', 'children': ['a', 'b'], 'initial': 'a'}],
+            transitions=[{'trigger': 'start', 'source': 'idle', 'dest': 'busy'}],
+            initial='idle')
+        graph = machine.model_graphs[id(machine)]
+
+        machine.add_transition('next', 'busy_a', 'busy_b')
+        builds = []
+        build_topology = graph._build_topology
+        graph._build_topology = lambda *args: builds.append(args) or build_topology(*args)
+        results = []
+        readers = [threading.Thread(target=lambda: results.append(machine.get_graph())) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join()
+
+        assert len(builds) == 1
+        assert all(result == results[0] for result in results)
+        assert graph._topology.version == machine.graph_version
+        assert 'e-busy_a-busy_b' in {edge['id'] for edge in results[0]['edges']}
+
+
+class TestGenerateGraphs:
+    """Test cases for generating the graphs of many machines in parallel."""
+
+    @pytest.mark.parametrize('processes', [False, True])
+    def test_matches_get_graph(self, processes):
+        """Test that graphs generated by workers equal those of get_graph, keyed like the input."""
+        states = [f's{i}' for i in range(10)]
+        machines = {
+            'flat': ReactFlowMachine(
+                states=states, transitions=[['next', states[i], states[i + 1]] for i in range(9)], initial='s0'),
+            'nested': HierarchicalReactFlowMachine(
+                states=['idle', {'name': 'busy', 'children': ['a', 'b'], 'initial': 'a'}],
+                transitions=[['start', 'idle', 'busy'], ['next', 'busy_a', 'busy_b'], ['reset', '*', 'idle']],
+                initial='idle'),
+            'locked': LockedReactFlowMachine(states=['a', 'b'], transitions=[['go', 'a', 'b']], initial='a'),
+        }
+
+        results = generate_graphs(machines, workers=2, processes=processes)
+
+        assert results == {name: machine.get_graph() for name, machine in machines.items()}
+
+    def test_sequence_with_options(self):
+        """Test that sequences keep their order and options are passed on."""
+        machines = [
+            ReactFlowMachine(states=['a', 'b', 'c'], transitions=[['go', 'a', 'b'], ['go', 'b', 'c']], initial='a'),
+            HierarchicalReactFlowMachine(
+                states=['idle', {'name': 'busy', 'children': ['a', 'b'], 'initial': 'a'}],
+                transitions=[['start', 'idle', 'busy'], ['next', 'busy_a', 'busy_b']], initial='idle'),
+        ]
+
+        results = generate_graphs(machines, workers=2, processes=False, serialize=True, layout='layered')
+
+        assert [json.loads(result) for result in results] == [
+            json.loads(json.dumps(machine.get_graph(layout='layered'))) for machine in machines]
+
+    def test_nested_options_resolved_by_machine(self):
+        """Test that the region of interest of a hierarchical machine is resolved before it is sent."""
+        machine = HierarchicalReactFlowMachine(
+            states=['idle', {'name': 'busy', 'children': ['a', 'b'], 'initial': 'a'}],
+            transitions=[['start', 'idle', 'busy'], ['next', 'busy_a', 'busy_b'], ['reset', '*', 'idle']],
+            initial='idle')
+
+        results = generate_graphs([machine], roi_state='busy_b', radius=0)
+
+        assert results == [machine.get_graph(roi_state='busy_b', radius=0)]
+
+    def test_definitions(self):
+        """Test that machine definitions are generated without creating machines."""
+        definition = {'states': ['a', 'b'], 'transitions': [['go', 'a', 'b']], 'initial': 'a'}
+        machine = ReactFlowMachine(**definition)
+
+        results = generate_graphs([definition, definition], workers=1, format='columnar')
+
+        assert results == [machine.get_graph(format='columnar')] * 2
+
+    def test_invalid_arguments(self):
+        """Test that invalid machines and options raise ValueError."""
+        machine = ReactFlowMachine(states=['a'], initial='a')
+        with pytest.raises(ValueError):
+            generate_graphs([machine], workers=0)
+        with pytest.raises(ValueError):
+            generate_graphs([machine], serialize=True, format='binary')
+        with pytest.raises(ValueError):
+            generate_graphs([object()])
+        with pytest.raises(ValueError):
+            generate_graphs([{'transitions': []}])
+
+
+class TestTelemetry:
+    """Test cases for the transition telemetry overlay."""
+
+    class Model:
+        pass
+
+    def test_counts_per_edge(self):
+        """Test that executed transitions are counted per edge ID of get_graph."""
+        recorder = TransitionRecorder(buckets=(0.001, 1.0))
+        machine = ReactFlowMachine(
+            states=['idle', 'running'],
+            transitions=[['start', 'idle', 'running'], ['stop', 'running', 'idle'],
+                         ['tick', 'running', None], ['start', 'running', 'running']],
+            initial='idle', auto_transitions=False, telemetry=recorder)
+
+        machine.start()
+        machine.tick()
+        machine.tick()
+        machine.stop()
+        machine.start()
+
+        overlay = machine.get_telemetry_overlay()
+        edge_ids = {edge['id'] for edge in machine.get_graph()['edges']}
+        assert set(overlay['edges']) <= edge_ids
+        assert {edge_id: entry['count'] for edge_id, entry in overlay['edges'].items()} == {
+            'e-idle-running': 2, 'e-running-running-1': 2, 'e-running-idle': 1}
+        assert overlay['buckets'] == [0.001, 1.0]
+        assert overlay['max'] == 2
+        entry = overlay['edges']['e-idle-running']
+        assert sum(entry['histogram']) == 2 and len(entry['histogram']) == 3
+        assert entry['sum'] > 0
+
+    def test_failed_transitions_not_counted(self):
+        """Test that transitions whose conditions fail are not recorded."""
+        machine = ReactFlowMachine(
+            states=['a', 'b'], transitions=[{'trigger': 'go', 'source': 'a', 'dest': 'b', 'conditions': 'ready'}],
+            initial='a', telemetry=TransitionRecorder())
+        machine.ready = lambda: False
+
+        machine.go()
+
+        assert machine.get_telemetry_overlay()['edges'] == {}
+
+    def test_callback_duration(self):
+        """Test that durations include the transition callbacks."""
+        machine = ReactFlowMachine(
+            states=['a', 'b'],
+            transitions=[{'trigger': 'go', 'source': 'a', 'dest': 'b', 'before': lambda: time.sleep(0.01)}],
+            initial='a', telemetry=TransitionRecorder(buckets=(0.005, 1.0)))
+
+        machine.go()
+
+        assert machine.get_telemetry_overlay()['edges']['e-a-b']['histogram'] == [0, 1, 0]
+
+    def test_nested_edge_ids(self):
+        """Test that nested transitions are recorded with the full state names."""
+        machine = HierarchicalReactFlowMachine(
+            states=['idle', {'name': 'busy', 'children': ['a', 'b'], 'initial': 'a',
+                             'transitions': [['next', 'a', 'b']]}],
+            transitions=[['start', 'idle', 'busy']], initial='idle', telemetry=TransitionRecorder())
+
+        machine.start()
+        machine.next()
+
+        overlay = machine.get_telemetry_overlay()
+        assert {edge_id: entry['count'] for edge_id, entry in overlay['edges'].items()} == {
+            'e-idle-busy': 1, 'e-busy_a-busy_b': 1}
+
+    def test_locked_threads(self):
+        """Test that concurrent triggers of a locked machine are all counted."""
+        models = [self.Model() for _ in range(4)]
+        machine = LockedReactFlowMachine(
+            model=models, states=['a', 'b'], transitions=[['go', 'a', 'b'], ['back', 'b', 'a']],
+            initial='a', telemetry=TransitionRecorder())
+
+        def drive(model):
+            for _ in range(100):
+                model.go()
+                model.back()
+
+        threads = [threading.Thread(target=drive, args=(model,)) for model in models]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        edges = machine.get_telemetry_overlay()['edges']
+        assert edges['e-a-b']['count'] == edges['e-b-a']['count'] == 400
+
+    def test_ended_threads_retired(self):
+        """Test that the counters of ended threads are merged instead of kept per thread."""
+        recorder = TransitionRecorder()
+        machine = LockedReactFlowMachine(
+            states=['a', 'b'], transitions=[['go', 'a', 'b'], ['back', 'b', 'a']],
+            initial='a', telemetry=recorder)
+
+        def drive():
+            machine.go()
+            machine.back()
+
+        for _ in range(20):
+            thread = threading.Thread(target=drive)
+            thread.start()
+            thread.join()
+
+        assert recorder._threads == {}
+        edges = machine.get_telemetry_overlay()['edges']
+        assert edges['e-a-b']['count'] == edges['e-b-a']['count'] == 20
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('lazy_graph', [False, True])
+    async def test_async(self, lazy_graph):
+        """Test that async transitions are recorded."""
+        machine = AsyncReactFlowMachine(
+            states=['a', 'b'], transitions=[['go', 'a', 'b']], initial='a', lazy_graph=lazy_graph,
+            telemetry=TransitionRecorder())
+
+        await machine.go()
+
+        assert machine.get_telemetry_overlay()['edges']['e-a-b']['count'] == 1
+
+    def test_reset_and_pickle(self):
+        """Test that counters can be reset and survive pickling with the machine."""
+        recorder = TransitionRecorder()
+        machine = ReactFlowMachine(states=['a', 'b'], transitions=[['go', 'a', 'b']], initial='a',
+                                   telemetry=recorder)
+        machine.go()
+
+        restored = pickle.loads(pickle.dumps(machine))
+        restored.to_a()
+        restored.go()
+        recorder.reset()
+
+        assert machine.get_telemetry_overlay()['edges'] == {}
+        assert restored.get_telemetry_overlay()['edges']['e-a-b']['count'] == 2
+
+    def test_invalid_arguments(self):
+        """Test that invalid buckets and machines without telemetry raise ValueError."""
+        with pytest.raises(ValueError):
+            TransitionRecorder(buckets=())
+        with pytest.raises(ValueError):
+            TransitionRecorder(buckets=(1.0, 0.5))
+        with pytest.raises(ValueError):
+            ReactFlowMachine(states=['a'], initial='a').get_telemetry_overlay()
@@ -1,7 +1,12 @@
 """Tests for ReactFlowGraph class."""
 
+import enum
+import json
+
 import pytest
-from transitions_reactflow import ReactFlowMachine
+from transitions_reactflow import (
+    EdgeRecord, GraphStats, HierarchicalReactFlowMachine, LayoutCache, NodeRecord, ReactFlowGraph, ReactFlowMachine,
+    columnar, topology)
 
 
 class TestReactFlowGraph:
@@ -144,13 +149,13 @@ class TestReactFlowGraph:
         assert 'edges' in graph
 
     def test_set_previous_transition(self):
-        """Test set_previous_transition method (no-op for React Flow)."""
+        """Test set_previous_transition method without a machine."""
         from transitions_reactflow.diagrams_reactflow import ReactFlowGraph
 
         graph = ReactFlowGraph(None)
         # Should not raise an error
         graph.set_previous_transition('idle', 'running')
-        # Method is no-op, so no assertions needed
+        assert graph._node_styles == {'idle': 'previous'}
 
     def test_get_graph_exception_handling(self):
         """Test exception handling in get_graph method."""
@@ -163,3 +168,1585 @@ class TestReactFlowGraph:
         with patch.object(graph, '_get_elements', return_value=(None, [])):
             with pytest.raises(ValueError, match="Failed to generate React Flow graph"):
                 graph.get_graph()
+
+
+class TestGraphCache:
+    """Test cases for cached, version-stamped graph output."""
+
+    def test_graph_is_cached(self):
+        """Test that repeated calls reuse the cached graph."""
+        states = ['idle', 'running']
+        transitions = [{'trigger': 'start',
+                        'source': 'idle', 'dest': 'running'}]
+
+        machine = ReactFlowMachine(
+            states=states, transitions=transitions, initial='idle')
+        graph = machine.get_graph()
+        topology = machine.model_graphs[id(machine)]._topology
+        cached = topology.get_graph()
+
+        assert machine.get_graph() == graph
+        assert topology.get_graph() is cached
+
+    def test_graph_is_not_shared(self):
+        """Test that modifying a returned graph does not affect other callers or models."""
+        class Model:
+            pass
+
+        machine = ReactFlowMachine(
+            states=['idle', 'running'], transitions=[['start', 'idle', 'running']], initial='idle')
+        model = Model()
+        machine.add_model(model)
+        for options in ({}, {'layout': 'layered'}, {'merge_parallel': True}):
+            graph = machine.get_graph(**options)
+            expected = json.loads(json.dumps(graph))
+            graph['nodes'][0]['position']['x'] = 999
+            graph['nodes'][0]['data'] = {}
+            graph['nodes'].append({'id': 'extra'})
+            graph['edges'].clear()
+
+            assert model.get_graph(**options) == expected
+            assert machine.get_graph(**options) == expected
+
+        columns = machine.get_graph(format='columnar')
+        expected = json.loads(json.dumps(columns))
+        columns['strings'].append('extra')
+        columns['nodes']['id'].append(0)
+        assert machine.get_graph(format='columnar') == expected
+
+    def test_cache_survives_transitions(self):
+        """Test that state changes do not invalidate the cached graph."""
+        states = ['idle', 'running']
+        transitions = [
+            {'trigger': 'start', 'source': 'idle', 'dest': 'running'},
+            {'trigger': 'stop', 'source': 'running', 'dest': 'idle'},
+        ]
+
+        machine = ReactFlowMachine(
+            states=states, transitions=transitions, initial='idle')
+        graph = machine.get_graph()
+        version = machine.graph_version
+
+        machine.start()
+        machine.stop()
+
+        assert machine.graph_version == version
+        assert machine.get_graph() == graph
+        assert machine.model_graphs[id(machine)]._topology.is_cached('react-flow')
+
+    def test_add_transition_invalidates_cache(self):
+        """Test that adding a transition bumps the version and rebuilds the graph."""
+        states = ['idle', 'running', 'stopped']
+        transitions = [{'trigger': 'start',
+                        'source': 'idle', 'dest': 'running'}]
+
+        machine = ReactFlowMachine(
+            states=states, transitions=transitions, initial='idle')
+        graph = machine.get_graph()
+        version = machine.graph_version
+
+        machine.add_transition('stop', 'running', 'stopped')
+
+        assert machine.graph_version > version
+        new_graph = machine.get_graph()
+        assert new_graph is not graph
+        assert len(new_graph['edges']) == 2
+        assert 'stopped' in {node['id'] for node in new_graph['nodes']}
+
+    def test_remove_transition_invalidates_cache(self):
+        """Test that removing a transition rebuilds the graph."""
+        states = ['idle', 'running', 'stopped']
+        transitions = [
+            {'trigger': 'start', 'source': 'idle', 'dest': 'running'},
+            {'trigger': 'stop', 'source': 'running', 'dest': 'stopped'},
+        ]
+
+        machine = ReactFlowMachine(
+            states=states, transitions=transitions, initial='idle')
+        assert len(machine.get_graph()['edges']) == 2
+
+        machine.remove_transition('stop')
+
+        graph = machine.get_graph()
+        assert len(graph['edges']) == 1
+        assert 'stopped' not in {node['id'] for node in graph['nodes']}
+
+    def test_add_states_bumps_version(self):
+        """Test that add_states bumps the graph version while add_model keeps it and the index."""
+        machine = ReactFlowMachine(
+            states=['idle'], initial='idle')
+
+        version = machine.graph_version
+        machine.add_states(['running'])
+        assert machine.graph_version > version
+
+        class Model:
+            pass
+
+        version = machine.graph_version
+        topology = machine.model_graphs[id(machine)]._get_topology()
+        model = Model()
+        machine.add_model(model)
+        assert machine.graph_version == version
+        assert machine.model_graphs[id(model)]._get_topology() is topology
+        assert topology.version == version
+
+    def test_graph_version_on_graph(self):
+        """Test that the graph engine exposes the machine's graph version."""
+        from transitions_reactflow.diagrams_reactflow import ReactFlowGraph
+
+        machine = ReactFlowMachine(
+            states=['idle', 'running'], initial='idle')
+        graph = machine.model_graphs[id(machine)]
+
+        assert graph.graph_version == machine.graph_version
+        assert ReactFlowGraph(None).graph_version == 0
+
+
+class TestIncrementalGraph:
+    """Test cases for incremental node/edge index maintenance."""
+
+    @staticmethod
+    def _normalize(graph):
+        nodes = sorted(node['id'] for node in graph['nodes'])
+        edges = sorted((edge['source'], edge['target'], edge['label']) for edge in graph['edges'])
+        return nodes, edges
+
+    def test_add_transition_applies_delta(self):
+        """Test that adding a transition updates the existing index."""
+        states = ['idle', 'running', 'stopped']
+        transitions = [{'trigger': 'start',
+                        'source': 'idle', 'dest': 'running'}]
+
+        machine = ReactFlowMachine(
+            states=states, transitions=transitions, initial='idle')
+        graph = machine.model_graphs[id(machine)]
+        machine.get_graph()
+        topology = graph._topology
+
+        machine.add_transition('stop', 'running', 'stopped')
+        machine.add_transition('halt', 'running', 'stopped')
+
+        # The index was updated in place instead of being rebuilt
+        assert graph._topology is topology
+        result = machine.get_graph()
+        assert [edge['id'] for edge in result['edges']] == [
+            'e-idle-running', 'e-running-stopped', 'e-running-stopped-1']
+        assert {node['id'] for node in result['nodes']} == set(states)
+
+    def test_removed_edges_keep_remaining_ids(self):
+        """Test that removing a transition does not renumber other edges."""
+        states = ['idle', 'running']
+        transitions = [
+            {'trigger': 'start', 'source': 'idle', 'dest': 'running'},
+            {'trigger': 'restart', 'source': 'idle', 'dest': 'running'},
+        ]
+
+        machine = ReactFlowMachine(
+            states=states, transitions=transitions, initial='idle')
+        machine.get_graph()
+
+        machine.remove_transition('start')
+
+        edges = machine.get_graph()['edges']
+        assert [(edge['id'], edge['label']) for edge in edges] == [('e-idle-running-1', 'restart')]
+
+    def test_add_states_becomes_node_when_used(self):
+        """Test that added states only appear once a transition references them."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running'],
+            transitions=[{'trigger': 'start', 'source': 'idle', 'dest': 'running'}],
+            initial='idle')
+        machine.get_graph()
+
+        machine.add_states([{'name': 'stopped'}])
+        assert 'stopped' not in {node['id'] for node in machine.get_graph()['nodes']}
+
+        machine.add_transition('stop', '*', 'stopped')
+        graph = machine.get_graph()
+        assert 'stopped' in {node['id'] for node in graph['nodes']}
+        assert len([edge for edge in graph['edges'] if edge['label'] == 'stop']) == 3
+
+    def test_add_states_with_enum_names(self):
+        """Test that Enum states added directly or as dictionaries are applied by their name."""
+        class States(enum.Enum):
+            IDLE = 1
+            RUNNING = 2
+            STOPPED = 3
+
+        machine = ReactFlowMachine(states=[States.IDLE], initial=States.IDLE, auto_transitions=False)
+        machine.get_graph()
+
+        machine.add_states([{'name': States.RUNNING}, States.STOPPED])
+        machine.add_transition('start', States.IDLE, States.RUNNING)
+        machine.add_transition('stop', States.RUNNING, States.STOPPED)
+
+        graph = machine.get_graph()
+        assert [node['id'] for node in graph['nodes']] == ['IDLE', 'RUNNING', 'STOPPED']
+        assert self._normalize(graph) == self._normalize(ReactFlowGraph(machine).get_graph())
+
+    def test_deltas_match_full_rebuild(self):
+        """Test that incremental updates produce the same graph as a rebuild."""
+        from transitions_reactflow.diagrams_reactflow import ReactFlowGraph
+
+        for show_auto_transitions in (False, True):
+            machine = ReactFlowMachine(
+                states=['a', 'b'], transitions=[['go', 'a', 'b']], initial='a',
+                show_auto_transitions=show_auto_transitions)
+            machine.get_graph()
+
+            machine.add_states(['c', 'd'])
+            machine.add_transition('go', ['b', 'c'], 'd')
+            machine.add_transition('stay', 'c', None)
+            machine.add_transition('loop', '*', '=')
+            machine.remove_transition('go', source='a')
+
+            expected = ReactFlowGraph(machine).get_graph()
+            assert self._normalize(machine.get_graph()) == self._normalize(expected)
+
+    def test_hierarchical_machine_rebuilds(self):
+        """Test that hierarchical machines rebuild their index on changes."""
+        from transitions_reactflow import HierarchicalReactFlowMachine
+
+        machine = HierarchicalReactFlowMachine(
+            states=['idle', {'name': 'busy', 'children': ['a', 'b']}],
+            transitions=[['start', 'idle', 'busy_a']], initial='idle')
+        graph = machine.model_graphs[id(machine)]
+        machine.get_graph()
+        topology = graph._topology
+
+        machine.add_transition('next', 'busy_a', 'busy_b')
+
+        result = machine.get_graph()
+        assert graph._topology is not topology
+        assert ('busy_a', 'busy_b', 'next') in self._normalize(result)[1]
+
+    def test_rebuild_keeps_edge_ids(self):
+        """Test that rebuilding the index keeps the IDs of edges that were assigned by deltas."""
+        machine = ReactFlowMachine(
+            states=['a', 'b'], transitions=[['x', 'b', 'b'], ['y', 'b', 'b']], initial='a', auto_transitions=False)
+        machine.get_graph()
+        machine.remove_transition('x')
+        machine.add_transition('z', 'b', 'b')
+        ids = [edge['id'] for edge in machine.get_graph()['edges']]
+        assert ids == ['e-b-b-1', 'e-b-b-2']
+
+        machine.get_graph(force_new=True)
+        machine.add_transition('w', 'a', 'b')
+        machine.add_transition('v', 'b', 'b')
+
+        edges = {edge['label']: edge['id'] for edge in machine.get_graph()['edges']}
+        assert edges == {'y': 'e-b-b-1', 'z': 'e-b-b-2', 'w': 'e-a-b', 'v': 'e-b-b-3'}
+
+    def test_hierarchical_rebuild_keeps_edge_ids(self):
+        """Test that removing a transition of a hierarchical machine does not rename other edges."""
+        machine = HierarchicalReactFlowMachine(
+            states=['a', 'b'], transitions=[['x', 'b', 'b'], ['y', 'b', 'b']], initial='a', auto_transitions=False)
+        machine.get_graph()
+        version = machine.graph_version
+
+        machine.remove_transition('x')
+
+        assert [edge['id'] for edge in machine.get_graph()['edges']] == ['e-b-b-1']
+        assert machine.model_graphs[id(machine)].diff(version)['edges'] == [{'type': 'remove', 'id': 'e-b-b'}]
+
+    def test_copy_is_independent(self):
+        """Test that deltas applied to a copy of the index leave the original unchanged."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running', 'stopped'],
+            transitions=[
+                {'trigger': 'start', 'source': 'idle', 'dest': 'running'},
+                {'trigger': 'stop', 'source': 'running', 'dest': 'stopped'}
+            ],
+            initial='idle')
+        topology = machine.model_graphs[id(machine)]._topology
+        graph = json.loads(json.dumps(topology.get_graph()))
+
+        copy = topology.copy()
+        copy.sync_trigger('stop', [])
+        copy.sync_trigger('halt', [('running', 'idle')])
+        copy.commit((topology.version + 1,) + topology.fingerprint[1:])
+
+        assert topology.get_graph() == graph
+        assert [edge.id for edge in topology.out_edges('running')] == ['e-running-stopped']
+        assert topology.triggers('running') == ['stop']
+        assert topology.diff(topology.version)['edges'] == []
+        assert [edge.id for edge in copy.out_edges('running')] == ['e-running-idle']
+        assert {node['id'] for node in copy.get_graph()['nodes']} == {'idle', 'running'}
+        assert copy.diff(topology.version)['edges'] == [
+            {'type': 'remove', 'id': 'e-running-stopped'},
+            {'type': 'add', 'item': copy.get_graph()['edges'][1]}]
+
+
+class TestGraphDiff:
+    """Test cases for the graph diff/patch API."""
+
+    @staticmethod
+    def _apply(client, diff):
+        if diff['reset']:
+            client['nodes'].clear()
+            client['edges'].clear()
+        for key in ('nodes', 'edges'):
+            for change in diff[key]:
+                if change['type'] == 'remove':
+                    del client[key][change['id']]
+                else:
+                    client[key][change['item']['id']] = change['item']
+
+    def test_diff_without_changes(self):
+        """Test that a diff against the current version is empty."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running'], transitions=[['start', 'idle', 'running']], initial='idle')
+        graph = machine.model_graphs[id(machine)]
+
+        diff = graph.diff(machine.graph_version)
+        assert diff == {'version': machine.graph_version, 'reset': False, 'nodes': [], 'edges': []}
+
+    def test_diff_after_add_and_remove(self):
+        """Test that diffs contain add and remove changes."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running', 'stopped'],
+            transitions=[['start', 'idle', 'running']], initial='idle')
+        graph = machine.model_graphs[id(machine)]
+        version = machine.graph_version
+
+        machine.add_transition('stop', 'running', 'stopped')
+        diff = graph.diff(version)
+        assert diff['version'] == machine.graph_version
+        assert diff['nodes'] == [{'type': 'add', 'item': {
+            'id': 'stopped', 'data': {'label': 'stopped'}, 'position': {'x': 0, 'y': 0}}}]
+        assert [change['type'] for change in diff['edges']] == ['add']
+        assert diff['edges'][0]['item']['id'] == 'e-running-stopped'
+
+        version = diff['version']
+        machine.remove_transition('stop')
+        diff = graph.diff(version)
+        assert diff['nodes'] == [{'type': 'remove', 'id': 'stopped'}]
+        assert diff['edges'] == [{'type': 'remove', 'id': 'e-running-stopped'}]
+
+    def test_diffs_replay_to_current_graph(self):
+        """Test that applying diffs reproduces the current graph, also across rebuilds."""
+        from transitions_reactflow import HierarchicalReactFlowMachine
+
+        for machine_cls in (ReactFlowMachine, HierarchicalReactFlowMachine):
+            machine = machine_cls(
+                states=['a', 'b', 'c'], transitions=[['go', 'a', 'b']], initial='a')
+            graph = machine.get_graph()
+            client = {'nodes': {node['id']: node for node in graph['nodes']},
+                      'edges': {edge['id']: edge for edge in graph['edges']}}
+            version = machine.graph_version
+
+            machine.add_transition('go', 'b', 'c')
+            machine.add_states(['d'])
+            machine.add_transition('jump', '*', 'd')
+
+            diff = machine.model_graphs[id(machine)].diff(version)
+            assert not diff['reset']
+            self._apply(client, diff)
+
+            graph = machine.get_graph()
+            assert client['nodes'] == {node['id']: node for node in graph['nodes']}
+            assert client['edges'] == {edge['id']: edge for edge in graph['edges']}
+
+    def test_unknown_version_resets(self):
+        """Test that diffs against unknown versions return the full graph."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running'], transitions=[['start', 'idle', 'running']], initial='idle')
+        graph = machine.model_graphs[id(machine)]
+
+        diff = graph.diff(machine.graph_version + 10)
+        assert diff['reset'] is True
+        assert [change['item']['id'] for change in diff['nodes']] == ['idle', 'running']
+        assert [change['type'] for change in diff['edges']] == ['add']
+
+    def test_trimmed_versions_reset(self, monkeypatch):
+        """Test that the oldest changes are dropped once the change log is full."""
+        monkeypatch.setattr(topology, 'MAX_CHANGES', 4)
+        machine = ReactFlowMachine(states=['a', 'b', 'c'], initial='a', auto_transitions=False)
+        graph = machine.model_graphs[id(machine)]
+        machine.get_graph()
+        versions = [machine.graph_version]
+        for trigger in ('one', 'two', 'three', 'four'):
+            machine.add_transition(trigger, 'a', 'b')
+            versions.append(machine.graph_version)
+
+        assert graph.diff(versions[0])['reset'] is True
+        assert graph.diff(versions[2])['reset'] is False
+        assert [change['item']['label'] for change in graph.diff(versions[2])['edges']] == ['three', 'four']
+
+
+class TestCompactGraph:
+    """Test cases for the compact node/edge representation."""
+
+    def test_compact_format(self):
+        """Test that the compact format returns records instead of dictionaries."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running'], transitions=[['start', 'idle', 'running']], initial='idle')
+
+        graph = machine.get_graph(format='compact')
+
+        assert graph['nodes'] == [NodeRecord('idle', 'idle'), NodeRecord('running', 'running')]
+        assert graph['edges'] == [EdgeRecord('e-idle-running', 'idle', 'running', 'start')]
+
+    def test_records_match_react_flow_output(self):
+        """Test that converted records equal the React Flow output."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running', 'stopped'],
+            transitions=[['start', 'idle', 'running'], ['stop', ['idle', 'running'], 'stopped']],
+            initial='idle')
+
+        compact = machine.get_graph(format='compact')
+        graph = machine.get_graph()
+
+        assert [node.to_dict() for node in compact['nodes']] == graph['nodes']
+        assert [edge.to_dict() for edge in compact['edges']] == graph['edges']
+
+    def test_compact_format_follows_deltas(self):
+        """Test that the compact format reflects incremental updates."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running'], transitions=[['start', 'idle', 'running']], initial='idle')
+        machine.get_graph()
+
+        machine.add_transition('stop', 'running', 'idle')
+
+        edges = machine.get_graph(format='compact')['edges']
+        assert [edge.label for edge in edges] == ['start', 'stop']
+        assert machine.get_graph()['edges'][1] == edges[1].to_dict()
+
+    def test_edge_ids(self):
+        """Test that edge IDs are numbered per source and target and can be parsed back."""
+        assert EdgeRecord.make_id('a', 'b') == 'e-a-b'
+        assert EdgeRecord.make_id('a', 'b', 2) == 'e-a-b-2'
+        assert EdgeRecord('e-a-b', 'a', 'b', 'go').id_count() == 0
+        assert EdgeRecord('e-a-b-2', 'a', 'b', 'go').id_count() == 2
+        assert EdgeRecord('e-a-b-x', 'a', 'b', 'go').id_count() is None
+        assert EdgeRecord('custom', 'a', 'b', 'go').id_count() is None
+
+    def test_unknown_format(self):
+        """Test that unknown formats are rejected."""
+        machine = ReactFlowMachine(states=['idle'], initial='idle')
+
+        with pytest.raises(ValueError, match="Unknown graph format"):
+            machine.get_graph(format='svg')
+
+    def test_options_validated_once(self):
+        """Test that every public entry point checks its options exactly once."""
+        machine = ReactFlowMachine(states=['idle', 'running'], transitions=[['start', 'idle', 'running']],
+                                   initial='idle')
+        graph = machine.model_graphs[id(machine)]
+        calls = []
+        validate = graph._validate_options
+        graph._validate_options = lambda **kwargs: calls.append(kwargs) or validate(**kwargs)
+
+        machine.get_graph(layout='layered')
+        graph.get_children('idle')
+        graph.get_parallel_edges('idle', 'running')
+        assert len(calls) == 3
+
+        with pytest.raises(ValueError, match="Layouts are not supported"):
+            machine.get_graph(format='compact', layout='layered')
+        with pytest.raises(ValueError, match="bundle_sources must be at least 2"):
+            graph.get_parallel_edges('idle', 'running', bundle_sources=1)
+
+
+class TestStreamingJson:
+    """Test cases for the chunked JSON serializer."""
+
+    def test_matches_cached_graph(self):
+        """Test that streaming the cached index yields the JSON of get_graph."""
+        states = ['idle', 'running', 'stopped']
+        transitions = [
+            ['start', 'idle', 'running'],
+            ['stop', ['idle', 'running'], 'stopped'],
+            ['halt', 'running', 'stopped'],
+            ['refresh', 'running', None],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='idle')
+        graph = machine.model_graphs[id(machine)]
+
+        chunks = list(graph.iter_json(chunk_size=2))
+
+        assert len(chunks) > 3
+        assert ''.join(chunks) == json.dumps(machine.get_graph())
+
+    def test_streams_from_machine(self):
+        """Test that flat machines are streamed without building the index."""
+        states = ['idle', 'running', 'stopped']
+        transitions = [
+            ['start', 'idle', 'running'],
+            ['stop', ['idle', 'running'], 'stopped'],
+            ['halt', 'running', 'stopped'],
+            ['refresh', 'running', None],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='idle', lazy_graph=True)
+        graph = machine._get_model_graph(machine)
+
+        result = json.loads(''.join(graph.iter_json(chunk_size=2)))
+
+        assert graph._topology is None
+        assert result == machine.get_graph()
+
+    def test_empty_graph(self):
+        """Test that graphs without edges are valid JSON."""
+        machine = ReactFlowMachine(states=['idle'], initial='idle', auto_transitions=False)
+        graph = machine.model_graphs[id(machine)]
+
+        assert json.loads(''.join(graph.iter_json())) == {'nodes': [], 'edges': []}
+
+    def test_hierarchical_machine(self):
+        """Test that hierarchical machines are streamed from their index."""
+        machine = HierarchicalReactFlowMachine(
+            states=['idle', {'name': 'busy', 'children': ['a', 'b']}],
+            transitions=[['go', 'idle', 'busy'], ['next', 'busy_a', 'busy_b']], initial='idle')
+        graph = machine.model_graphs[id(machine)]
+
+        assert json.loads(''.join(graph.iter_json())) == machine.get_graph()
+
+
+class TestRegionOfInterest:
+    """Test cases for region of interest subgraphs."""
+
+    def test_radius_one(self):
+        """Test that the default radius includes direct neighbours in both directions."""
+        states = ['s0', 's1', 's2', 's3', 's4', 's5']
+        transitions = [
+            ['next', 's0', 's1'],
+            ['next', 's1', 's2'],
+            ['next', 's2', 's3'],
+            ['next', 's3', 's4'],
+            ['next', 's4', 's5'],
+            ['jump', 's2', 's5'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='s0', auto_transitions=False)
+
+        graph = machine.get_graph(roi_state='s1')
+
+        assert graph['nodes'][0]['id'] == 's1'
+        assert {node['id'] for node in graph['nodes']} == {'s0', 's1', 's2'}
+        assert {edge['id'] for edge in graph['edges']} == {'e-s0-s1', 'e-s1-s2'}
+
+    def test_radius_two(self):
+        """Test that edges are only included between states of the region."""
+        states = ['s0', 's1', 's2', 's3', 's4', 's5']
+        transitions = [
+            ['next', 's0', 's1'],
+            ['next', 's1', 's2'],
+            ['next', 's2', 's3'],
+            ['next', 's3', 's4'],
+            ['next', 's4', 's5'],
+            ['jump', 's2', 's5'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='s0', auto_transitions=False)
+
+        graph = machine.get_graph(roi_state='s1', radius=2)
+
+        assert {node['id'] for node in graph['nodes']} == {'s0', 's1', 's2', 's3', 's5'}
+        assert {edge['id'] for edge in graph['edges']} == {'e-s0-s1', 'e-s1-s2', 'e-s2-s3', 'e-s2-s5'}
+
+    def test_radius_zero(self):
+        """Test that a radius of 0 returns the region of interest only."""
+        states = ['s0', 's1', 's2', 's3', 's4', 's5']
+        transitions = [
+            ['next', 's0', 's1'],
+            ['next', 's1', 's2'],
+            ['next', 's2', 's3'],
+            ['next', 's3', 's4'],
+            ['next', 's4', 's5'],
+            ['jump', 's2', 's5'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='s0', auto_transitions=False)
+
+        graph = machine.get_graph(roi_state='s2', radius=0)
+
+        assert graph == {'nodes': [machine.get_graph()['nodes'][2]], 'edges': []}
+
+    def test_max_nodes(self):
+        """Test that the region stops growing at max_nodes."""
+        states = ['s0', 's1', 's2', 's3', 's4', 's5']
+        transitions = [
+            ['next', 's0', 's1'],
+            ['next', 's1', 's2'],
+            ['next', 's2', 's3'],
+            ['next', 's3', 's4'],
+            ['next', 's4', 's5'],
+            ['jump', 's2', 's5'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='s0', auto_transitions=False)
+
+        graph = machine.get_graph(roi_state='s0', radius=5, max_nodes=3)
+
+        assert [node['id'] for node in graph['nodes']] == ['s0', 's1', 's2']
+
+    def test_show_roi(self):
+        """Test that show_roi follows the state of the model."""
+        states = ['s0', 's1', 's2', 's3', 's4', 's5']
+        transitions = [
+            ['next', 's0', 's1'],
+            ['next', 's1', 's2'],
+            ['next', 's2', 's3'],
+            ['next', 's3', 's4'],
+            ['next', 's4', 's5'],
+            ['jump', 's2', 's5'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='s0', auto_transitions=False)
+        machine.next()
+        machine.next()
+
+        graph = machine.get_graph(show_roi=True, radius=1)
+
+        assert {node['id'] for node in graph['nodes']} == {'s1', 's2', 's3', 's5'}
+
+    def test_follows_deltas(self):
+        """Test that the adjacency index reflects added and removed transitions."""
+        states = ['s0', 's1', 's2', 's3', 's4', 's5']
+        transitions = [
+            ['next', 's0', 's1'],
+            ['next', 's1', 's2'],
+            ['next', 's2', 's3'],
+            ['next', 's3', 's4'],
+            ['next', 's4', 's5'],
+            ['jump', 's2', 's5'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='s0', auto_transitions=False)
+        machine.get_graph()
+
+        machine.add_transition('back', 's5', 's0')
+        assert {node['id'] for node in machine.get_graph(roi_state='s0')['nodes']} == {'s0', 's1', 's5'}
+
+        machine.remove_transition('back', 's5', 's0')
+        assert {node['id'] for node in machine.get_graph(roi_state='s0')['nodes']} == {'s0', 's1'}
+
+    def test_compact_and_binary_formats(self):
+        """Test that regions are available in the other formats."""
+        states = ['s0', 's1', 's2', 's3', 's4', 's5']
+        transitions = [
+            ['next', 's0', 's1'],
+            ['next', 's1', 's2'],
+            ['next', 's2', 's3'],
+            ['next', 's3', 's4'],
+            ['next', 's4', 's5'],
+            ['jump', 's2', 's5'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='s0', auto_transitions=False)
+
+        compact = machine.get_graph(roi_state='s1', format='compact')
+        binary = machine.get_graph(roi_state='s1', format='binary')
+
+        assert {node.id for node in compact['nodes']} == {'s0', 's1', 's2'}
+        assert columnar.unpack(binary) == machine.get_graph(roi_state='s1')
+
+    def test_invalid_bounds(self):
+        """Test that negative radii and non-positive node limits are rejected."""
+        states = ['s0', 's1', 's2', 's3', 's4', 's5']
+        transitions = [
+            ['next', 's0', 's1'],
+            ['next', 's1', 's2'],
+            ['next', 's2', 's3'],
+            ['next', 's3', 's4'],
+            ['next', 's4', 's5'],
+            ['jump', 's2', 's5'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='s0', auto_transitions=False)
+
+        with pytest.raises(ValueError, match="radius"):
+            machine.get_graph(roi_state='s1', radius=-1)
+        with pytest.raises(ValueError, match="max_nodes"):
+            machine.get_graph(roi_state='s1', max_nodes=0)
+
+    def test_nested_state(self):
+        """Test that nested states are represented by their closest ancestor node."""
+        machine = HierarchicalReactFlowMachine(
+            states=['idle', {'name': 'busy', 'children': ['a', 'b']}, 'done'],
+            transitions=[['go', 'idle', 'busy'], ['finish', 'busy', 'done']],
+            initial='idle', auto_transitions=False)
+
+        graph = machine.get_graph(roi_state='busy_a', radius=1)
+
+        assert 'busy' in {node['id'] for node in graph['nodes']}
+
+
+class TestNestedStates:
+    """Test cases for nested states as parent/child nodes."""
+
+    @staticmethod
+    def _edges(graph):
+        return {(edge['source'], edge['target'], edge['label']) for edge in graph['edges']}
+
+    def test_child_nodes(self):
+        """Test that nested states reference their parent and follow it."""
+        states = ['idle', {'name': 'busy', 'initial': 'a', 'children': ['a', {'name': 'b', 'children': ['x', 'y']}]}]
+        transitions = [
+            ['go', 'idle', 'busy'],
+            ['next', 'busy_a', 'busy_b'],
+            ['deep', 'busy_b_x', 'busy_b_y'],
+            ['out', 'busy', 'idle'],
+            ['quit', 'busy_a', 'idle'],
+            ['quit', 'busy_b_y', 'idle'],
+        ]
+
+        machine = HierarchicalReactFlowMachine(
+            states=states, transitions=transitions, initial='idle', auto_transitions=False)
+
+        graph = machine.get_graph()
+
+        assert [node['id'] for node in graph['nodes']] == ['idle', 'busy', 'busy_a', 'busy_b', 'busy_b_x', 'busy_b_y']
+        assert graph['nodes'][4] == {
+            'id': 'busy_b_x', 'data': {'label': 'x'}, 'position': {'x': 0, 'y': 0}, 'parentNode': 'busy_b'}
+        assert 'parentNode' not in graph['nodes'][1]
+        assert ('busy_b_x', 'busy_b_y', 'deep') in self._edges(graph)
+
+    def test_unused_parent_is_included(self):
+        """Test that parents of referenced states are nodes even without own transitions."""
+        machine = HierarchicalReactFlowMachine(
+            states=['idle', {'name': 'busy', 'children': ['a', 'b']}],
+            transitions=[['go', 'idle', 'busy_a']], initial='idle', auto_transitions=False)
+
+        nodes = machine.get_graph()['nodes']
+
+        assert [node['id'] for node in nodes] == ['idle', 'busy', 'busy_a']
+
+    def test_max_depth(self):
+        """Test that deeper states are hidden and their edges are rolled up."""
+        states = ['idle', {'name': 'busy', 'initial': 'a', 'children': ['a', {'name': 'b', 'children': ['x', 'y']}]}]
+        transitions = [
+            ['go', 'idle', 'busy'],
+            ['next', 'busy_a', 'busy_b'],
+            ['deep', 'busy_b_x', 'busy_b_y'],
+            ['out', 'busy', 'idle'],
+            ['quit', 'busy_a', 'idle'],
+            ['quit', 'busy_b_y', 'idle'],
+        ]
+
+        machine = HierarchicalReactFlowMachine(
+            states=states, transitions=transitions, initial='idle', auto_transitions=False)
+
+        graph = machine.get_graph(max_depth=0)
+
+        assert graph['nodes'][1] == {
+            'id': 'busy', 'data': {'label': 'busy', 'collapsed': True}, 'position': {'x': 0, 'y': 0}}
+        assert len(graph['nodes']) == 2
+        assert self._edges(graph) == {('idle', 'busy', 'go'), ('busy', 'idle', 'out'), ('busy', 'idle', 'quit')}
+        assert [edge['id'] for edge in graph['edges']] == ['e-idle-busy', 'e-busy-idle', 'e-busy-idle-1']
+
+    def test_collapsed(self):
+        """Test that collapsed states hide their descendants only."""
+        states = ['idle', {'name': 'busy', 'initial': 'a', 'children': ['a', {'name': 'b', 'children': ['x', 'y']}]}]
+        transitions = [
+            ['go', 'idle', 'busy'],
+            ['next', 'busy_a', 'busy_b'],
+            ['deep', 'busy_b_x', 'busy_b_y'],
+            ['out', 'busy', 'idle'],
+            ['quit', 'busy_a', 'idle'],
+            ['quit', 'busy_b_y', 'idle'],
+        ]
+
+        machine = HierarchicalReactFlowMachine(
+            states=states, transitions=transitions, initial='idle', auto_transitions=False)
+
+        graph = machine.get_graph(collapsed='busy_b')
+
+        assert [node['id'] for node in graph['nodes']] == ['idle', 'busy', 'busy_a', 'busy_b']
+        assert graph['nodes'][3]['data'] == {'label': 'b', 'collapsed': True}
+        assert ('busy_b', 'idle', 'quit') in self._edges(graph)
+        assert all('busy_b_' not in edge['source'] + edge['target'] for edge in graph['edges'])
+
+    def test_rolled_up_ids_are_unique(self):
+        """Test that rolled up edges do not reuse IDs of the full graph."""
+        states = ['idle', {'name': 'busy', 'initial': 'a', 'children': ['a', {'name': 'b', 'children': ['x', 'y']}]}]
+        transitions = [
+            ['go', 'idle', 'busy'],
+            ['next', 'busy_a', 'busy_b'],
+            ['deep', 'busy_b_x', 'busy_b_y'],
+            ['out', 'busy', 'idle'],
+            ['quit', 'busy_a', 'idle'],
+            ['quit', 'busy_b_y', 'idle'],
+        ]
+
+        machine = HierarchicalReactFlowMachine(
+            states=states, transitions=transitions, initial='idle', auto_transitions=False)
+
+        full = {edge['id']: edge for edge in machine.get_graph()['edges']}
+        graph = machine.get_graph(max_depth=1)
+
+        for edge in graph['edges']:
+            assert edge['id'] not in full or full[edge['id']] == edge
+
+    def test_get_children(self):
+        """Test that expanding a collapsed state returns its children and their edges."""
+        states = ['idle', {'name': 'busy', 'initial': 'a', 'children': ['a', {'name': 'b', 'children': ['x', 'y']}]}]
+        transitions = [
+            ['go', 'idle', 'busy'],
+            ['next', 'busy_a', 'busy_b'],
+            ['deep', 'busy_b_x', 'busy_b_y'],
+            ['out', 'busy', 'idle'],
+            ['quit', 'busy_a', 'idle'],
+            ['quit', 'busy_b_y', 'idle'],
+        ]
+
+        machine = HierarchicalReactFlowMachine(
+            states=states, transitions=transitions, initial='idle', auto_transitions=False)
+        graph = machine.model_graphs[id(machine)]
+
+        children = graph.get_children('busy', max_depth=0)
+
+        assert [node['id'] for node in children['nodes']] == ['busy_a', 'busy_b']
+        assert children['nodes'][1]['data']['collapsed'] is True
+        # Every edge of the expanded view touches busy or one of its children
+        expanded = machine.get_graph(collapsed='busy_b')
+        assert sorted(children['edges'], key=lambda edge: edge['id']) == \
+            sorted(expanded['edges'], key=lambda edge: edge['id'])
+        assert ('busy_b', 'idle', 'quit') in self._edges(children)
+
+    def test_get_graph_children(self):
+        """Test that the machine returns the children of the first model's graph."""
+        states = ['idle', {'name': 'busy', 'initial': 'a', 'children': ['a', {'name': 'b', 'children': ['x', 'y']}]}]
+        transitions = [
+            ['go', 'idle', 'busy'],
+            ['next', 'busy_a', 'busy_b'],
+            ['deep', 'busy_b_x', 'busy_b_y'],
+            ['out', 'busy', 'idle'],
+            ['quit', 'busy_a', 'idle'],
+            ['quit', 'busy_b_y', 'idle'],
+        ]
+
+        machine = HierarchicalReactFlowMachine(
+            states=states, transitions=transitions, initial='idle', auto_transitions=False)
+
+        children = machine.get_graph_children('busy_b', format='compact')
+
+        assert [node.id for node in children['nodes']] == ['busy_b_x', 'busy_b_y']
+        assert all(node.parent == 'busy_b' for node in children['nodes'])
+
+    def test_get_children_of_hidden_state(self):
+        """Test that only states shown in the view can be expanded."""
+        states = ['idle', {'name': 'busy', 'initial': 'a', 'children': ['a', {'name': 'b', 'children': ['x', 'y']}]}]
+        transitions = [
+            ['go', 'idle', 'busy'],
+            ['next', 'busy_a', 'busy_b'],
+            ['deep', 'busy_b_x', 'busy_b_y'],
+            ['out', 'busy', 'idle'],
+            ['quit', 'busy_a', 'idle'],
+            ['quit', 'busy_b_y', 'idle'],
+        ]
+
+        machine = HierarchicalReactFlowMachine(
+            states=states, transitions=transitions, initial='idle', auto_transitions=False)
+        graph = machine.model_graphs[id(machine)]
+
+        with pytest.raises(ValueError, match="not a node"):
+            graph.get_children('busy_b', max_depth=0)
+        with pytest.raises(ValueError, match="not a node"):
+            graph.get_children('unknown')
+
+    def test_collapsed_view_formats(self):
+        """Test that collapsed views are available as records."""
+        states = ['idle', {'name': 'busy', 'initial': 'a', 'children': ['a', {'name': 'b', 'children': ['x', 'y']}]}]
+        transitions = [
+            ['go', 'idle', 'busy'],
+            ['next', 'busy_a', 'busy_b'],
+            ['deep', 'busy_b_x', 'busy_b_y'],
+            ['out', 'busy', 'idle'],
+            ['quit', 'busy_a', 'idle'],
+            ['quit', 'busy_b_y', 'idle'],
+        ]
+
+        machine = HierarchicalReactFlowMachine(
+            states=states, transitions=transitions, initial='idle', auto_transitions=False)
+
+        records = machine.get_graph(max_depth=0, format='compact')
+
+        assert records['nodes'][1] == NodeRecord('busy', 'busy', None, True)
+
+    def test_invalid_options(self):
+        """Test that invalid view options are rejected."""
+        states = ['idle', {'name': 'busy', 'initial': 'a', 'children': ['a', {'name': 'b', 'children': ['x', 'y']}]}]
+        transitions = [
+            ['go', 'idle', 'busy'],
+            ['next', 'busy_a', 'busy_b'],
+            ['deep', 'busy_b_x', 'busy_b_y'],
+            ['out', 'busy', 'idle'],
+            ['quit', 'busy_a', 'idle'],
+            ['quit', 'busy_b_y', 'idle'],
+        ]
+
+        machine = HierarchicalReactFlowMachine(
+            states=states, transitions=transitions, initial='idle', auto_transitions=False)
+
+        with pytest.raises(ValueError, match="max_depth"):
+            machine.get_graph(max_depth=-1)
+        with pytest.raises(ValueError, match="roi_state"):
+            machine.get_graph(roi_state='idle', max_depth=1)
+
+    def test_region_includes_parents(self):
+        """Test that regions include the parents of nested nodes before them."""
+        states = ['idle', {'name': 'busy', 'initial': 'a', 'children': ['a', {'name': 'b', 'children': ['x', 'y']}]}]
+        transitions = [
+            ['go', 'idle', 'busy'],
+            ['next', 'busy_a', 'busy_b'],
+            ['deep', 'busy_b_x', 'busy_b_y'],
+            ['out', 'busy', 'idle'],
+            ['quit', 'busy_a', 'idle'],
+            ['quit', 'busy_b_y', 'idle'],
+        ]
+
+        machine = HierarchicalReactFlowMachine(
+            states=states, transitions=transitions, initial='idle', auto_transitions=False)
+
+        graph = machine.get_graph(roi_state='busy_b_y', radius=0)
+
+        assert [node['id'] for node in graph['nodes']] == ['busy', 'busy_b', 'busy_b_y']
+
+
+class TestAdjacency:
+    """Test cases for adjacency queries on the graph."""
+
+    def test_out_and_in_edges(self):
+        """Test that edges leaving and entering a state are returned."""
+        states = ['idle', 'running', 'paused', 'stopped']
+        transitions = [
+            ['start', 'idle', 'running'],
+            ['pause', 'running', 'paused'],
+            ['resume', 'paused', 'running'],
+            ['stop', ['running', 'paused'], 'stopped'],
+            ['abort', 'running', 'stopped'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='idle', auto_transitions=False)
+        graph = machine.model_graphs[id(machine)]
+
+        assert [edge['label'] for edge in graph.get_out_edges('running')] == ['pause', 'stop', 'abort']
+        assert [edge['source'] for edge in graph.get_in_edges('stopped')] == ['running', 'paused', 'running']
+        assert graph.get_out_edges('stopped') == []
+        assert graph.get_out_edges('idle') == [machine.get_graph()['edges'][0]]
+
+    def test_triggers(self):
+        """Test that triggers of a state are returned without duplicates."""
+        states = ['idle', 'running', 'paused', 'stopped']
+        transitions = [
+            ['start', 'idle', 'running'],
+            ['pause', 'running', 'paused'],
+            ['resume', 'paused', 'running'],
+            ['stop', ['running', 'paused'], 'stopped'],
+            ['abort', 'running', 'stopped'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='idle', auto_transitions=False)
+        graph = machine.model_graphs[id(machine)]
+        machine.add_transition('abort', 'running', 'idle')
+
+        assert graph.get_triggers('running') == ['pause', 'stop', 'abort']
+        assert graph.get_triggers('unknown') == []
+
+    def test_reachable(self):
+        """Test that reachable states are returned by distance."""
+        states = ['idle', 'running', 'paused', 'stopped']
+        transitions = [
+            ['start', 'idle', 'running'],
+            ['pause', 'running', 'paused'],
+            ['resume', 'paused', 'running'],
+            ['stop', ['running', 'paused'], 'stopped'],
+            ['abort', 'running', 'stopped'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='idle', auto_transitions=False)
+        graph = machine.model_graphs[id(machine)]
+
+        assert graph.get_reachable('idle') == ['running', 'paused', 'stopped']
+        assert graph.get_reachable('idle', max_distance=1) == ['running']
+        assert graph.get_reachable('running') == ['paused', 'stopped', 'running']
+        assert graph.get_reachable('stopped') == []
+
+    def test_can_reach(self):
+        """Test reachability checks between two states."""
+        states = ['idle', 'running', 'paused', 'stopped']
+        transitions = [
+            ['start', 'idle', 'running'],
+            ['pause', 'running', 'paused'],
+            ['resume', 'paused', 'running'],
+            ['stop', ['running', 'paused'], 'stopped'],
+            ['abort', 'running', 'stopped'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='idle', auto_transitions=False)
+        graph = machine.model_graphs[id(machine)]
+
+        assert graph.can_reach('idle', 'stopped')
+        assert not graph.can_reach('stopped', 'idle')
+        assert not graph.can_reach('idle', 'idle')
+
+    def test_follows_deltas(self):
+        """Test that queries reflect added and removed transitions."""
+        states = ['idle', 'running', 'paused', 'stopped']
+        transitions = [
+            ['start', 'idle', 'running'],
+            ['pause', 'running', 'paused'],
+            ['resume', 'paused', 'running'],
+            ['stop', ['running', 'paused'], 'stopped'],
+            ['abort', 'running', 'stopped'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='idle', auto_transitions=False)
+        graph = machine.model_graphs[id(machine)]
+        graph.get_out_edges('idle')
+
+        machine.add_transition('reset', 'stopped', 'idle')
+        assert graph.can_reach('stopped', 'running')
+
+        machine.remove_transition('reset')
+        assert graph.get_in_edges('idle') == []
+
+    def test_enum_states(self):
+        """Test that Enum states can be queried."""
+        class States(enum.Enum):
+            RED = 1
+            GREEN = 2
+
+        machine = ReactFlowMachine(
+            states=States, transitions=[['go', States.RED, States.GREEN]], initial=States.RED,
+            auto_transitions=False)
+        graph = machine.model_graphs[id(machine)]
+
+        assert graph.get_triggers(States.RED) == ['go']
+        assert graph.get_reachable(States.RED) == ['GREEN']
+
+
+class TestEdgeBundles:
+    """Test cases for bundling edges of wildcard and multi-source transitions."""
+
+    def test_wildcard_source(self):
+        """Test that transitions from every state become one edge from a virtual node."""
+        states = ['disconnected', 'connected', 'error']
+        transitions = [
+            ['connect', 'disconnected', 'connected'],
+            ['disconnect', 'connected', 'disconnected'],
+            {'trigger': 'fail', 'source': '*', 'dest': 'error'},
+            ['reset', 'error', 'disconnected'],
+            ['retry', ['connected', 'error'], 'disconnected'],
+        ]
+
+        machine = ReactFlowMachine(
+            states=states, transitions=transitions, initial='disconnected', auto_transitions=False)
+
+        graph = machine.get_graph(bundle_sources=3)
+
+        assert graph['nodes'][-1] == {
+            'id': '*', 'data': {'label': 'any state', 'collapsed': True}, 'position': {'x': 0, 'y': 0}}
+        fail = [edge for edge in graph['edges'] if edge['label'] == 'fail']
+        assert fail == [{'id': 'e-*-error', 'source': '*', 'target': 'error', 'label': 'fail'}]
+        assert len(graph['edges']) == len(machine.get_graph()['edges']) - 2
+
+    def test_source_lists(self):
+        """Test that bundles with other sources get numbered virtual nodes."""
+        states = ['disconnected', 'connected', 'error']
+        transitions = [
+            ['connect', 'disconnected', 'connected'],
+            ['disconnect', 'connected', 'disconnected'],
+            {'trigger': 'fail', 'source': '*', 'dest': 'error'},
+            ['reset', 'error', 'disconnected'],
+            ['retry', ['connected', 'error'], 'disconnected'],
+        ]
+
+        machine = ReactFlowMachine(
+            states=states, transitions=transitions, initial='disconnected', auto_transitions=False)
+        machine.add_transition('restart', ['connected', 'error'], 'connected')
+
+        graph = machine.get_graph(bundle_sources=2)
+
+        assert [node['id'] for node in graph['nodes']] == ['disconnected', 'connected', 'error', '*', '*1']
+        assert graph['nodes'][-1]['data']['label'] == '2 states'
+        assert {(edge['source'], edge['label']) for edge in graph['edges'] if edge['source'].startswith('*')} == {
+            ('*', 'fail'), ('*1', 'retry'), ('*1', 'restart')}
+
+    def test_below_threshold(self):
+        """Test that edges with fewer sources are not bundled."""
+        states = ['disconnected', 'connected', 'error']
+        transitions = [
+            ['connect', 'disconnected', 'connected'],
+            ['disconnect', 'connected', 'disconnected'],
+            {'trigger': 'fail', 'source': '*', 'dest': 'error'},
+            ['reset', 'error', 'disconnected'],
+            ['retry', ['connected', 'error'], 'disconnected'],
+        ]
+
+        machine = ReactFlowMachine(
+            states=states, transitions=transitions, initial='disconnected', auto_transitions=False)
+
+        assert machine.get_graph(bundle_sources=4) == machine.get_graph()
+
+    def test_bundled_edges(self):
+        """Test that bundled edges are expanded on demand."""
+        states = ['disconnected', 'connected', 'error']
+        transitions = [
+            ['connect', 'disconnected', 'connected'],
+            ['disconnect', 'connected', 'disconnected'],
+            {'trigger': 'fail', 'source': '*', 'dest': 'error'},
+            ['reset', 'error', 'disconnected'],
+            ['retry', ['connected', 'error'], 'disconnected'],
+        ]
+
+        machine = ReactFlowMachine(
+            states=states, transitions=transitions, initial='disconnected', auto_transitions=False)
+        graph = machine.model_graphs[id(machine)]
+
+        edges = graph.get_bundled_edges('fail', 'error')
+
+        assert edges['nodes'] == []
+        assert [edge['source'] for edge in edges['edges']] == ['disconnected', 'connected', 'error']
+        assert all(edge in machine.get_graph()['edges'] for edge in edges['edges'])
+
+    def test_bundles_in_views(self):
+        """Test that rolled up edges of collapsed views are bundled."""
+        machine = HierarchicalReactFlowMachine(
+            states=['idle', {'name': 'busy', 'children': ['a', 'b']}, 'error'],
+            transitions=[['go', 'idle', 'busy_a'], {'trigger': 'fail', 'source': '*', 'dest': 'error'}],
+            initial='idle', auto_transitions=False)
+
+        graph = machine.get_graph(max_depth=0, bundle_sources=3)
+        bundled = machine.model_graphs[id(machine)].get_bundled_edges('fail', 'error', max_depth=0)
+
+        assert ('*', 'error', 'fail') in {(edge['source'], edge['target'], edge['label']) for edge in graph['edges']}
+        assert {edge['source'] for edge in bundled['edges']} == {'idle', 'busy', 'error'}
+
+    def test_bundle_is_cached(self):
+        """Test that bundles of the whole graph are cached until the topology changes."""
+        states = ['disconnected', 'connected', 'error']
+        transitions = [
+            ['connect', 'disconnected', 'connected'],
+            ['disconnect', 'connected', 'disconnected'],
+            {'trigger': 'fail', 'source': '*', 'dest': 'error'},
+            ['reset', 'error', 'disconnected'],
+            ['retry', ['connected', 'error'], 'disconnected'],
+        ]
+
+        machine = ReactFlowMachine(
+            states=states, transitions=transitions, initial='disconnected', auto_transitions=False)
+        records = machine.get_graph(bundle_sources=3, format='compact')
+
+        topology = machine.model_graphs[id(machine)]._topology
+
+        assert machine.get_graph(bundle_sources=3, format='compact') == records
+        assert topology.is_cached('bundle:3:False:compact')
+        machine.add_transition('fail', 'error', 'disconnected')
+        assert not topology.is_cached('bundle:3:False:compact')
+        assert machine.get_graph(bundle_sources=3, format='compact') != records
+
+    def test_binary_format(self):
+        """Test that virtual nodes and bundled edges are encoded."""
+        states = ['disconnected', 'connected', 'error']
+        transitions = [
+            ['connect', 'disconnected', 'connected'],
+            ['disconnect', 'connected', 'disconnected'],
+            {'trigger': 'fail', 'source': '*', 'dest': 'error'},
+            ['reset', 'error', 'disconnected'],
+            ['retry', ['connected', 'error'], 'disconnected'],
+        ]
+
+        machine = ReactFlowMachine(
+            states=states, transitions=transitions, initial='disconnected', auto_transitions=False)
+
+        data = machine.get_graph(bundle_sources=3, format='binary')
+
+        assert columnar.unpack(data) == machine.get_graph(bundle_sources=3)
+
+    def test_invalid_threshold(self):
+        """Test that bundles need at least two sources."""
+        states = ['disconnected', 'connected', 'error']
+        transitions = [
+            ['connect', 'disconnected', 'connected'],
+            ['disconnect', 'connected', 'disconnected'],
+            {'trigger': 'fail', 'source': '*', 'dest': 'error'},
+            ['reset', 'error', 'disconnected'],
+            ['retry', ['connected', 'error'], 'disconnected'],
+        ]
+
+        machine = ReactFlowMachine(
+            states=states, transitions=transitions, initial='disconnected', auto_transitions=False)
+
+        with pytest.raises(ValueError, match="bundle_sources"):
+            machine.get_graph(bundle_sources=1)
+
+
+class TestParallelEdges:
+    """Test cases for merging parallel edges between the same states."""
+
+    def test_merged_edge(self):
+        """Test that parallel edges become one edge listing their triggers."""
+        states = ['idle', 'running', 'stopped']
+        transitions = [
+            ['start', 'idle', 'running'],
+            ['begin', 'idle', 'running'],
+            ['go', 'idle', 'running'],
+            ['stop', 'running', 'stopped'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='idle', auto_transitions=False)
+
+        graph = machine.get_graph(merge_parallel=True)
+
+        assert graph['edges'] == [
+            {'id': 'e-idle-running', 'source': 'idle', 'target': 'running', 'label': 'start, begin, go',
+             'data': {'triggers': ['start', 'begin', 'go'], 'count': 3}},
+            {'id': 'e-running-stopped', 'source': 'running', 'target': 'stopped', 'label': 'stop'},
+        ]
+        assert graph['nodes'] == machine.get_graph()['nodes']
+
+    def test_repeated_trigger(self):
+        """Test that triggers are counted per edge but labelled once."""
+        states = ['idle', 'running', 'stopped']
+        transitions = [
+            ['start', 'idle', 'running'],
+            ['begin', 'idle', 'running'],
+            ['go', 'idle', 'running'],
+            ['stop', 'running', 'stopped'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='idle', auto_transitions=False)
+        machine.add_transition('start', 'idle', 'running', conditions='ready')
+
+        edge = machine.get_graph(merge_parallel=True)['edges'][0]
+
+        assert edge['label'] == 'start, begin, go'
+        assert edge['data']['count'] == 4
+
+    def test_without_parallel_edges(self):
+        """Test that graphs without parallel edges are not changed."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running'], transitions=[['start', 'idle', 'running']], initial='idle')
+
+        assert machine.get_graph(merge_parallel=True) == machine.get_graph()
+
+    def test_parallel_edges(self):
+        """Test that merged edges are expanded on demand."""
+        states = ['idle', 'running', 'stopped']
+        transitions = [
+            ['start', 'idle', 'running'],
+            ['begin', 'idle', 'running'],
+            ['go', 'idle', 'running'],
+            ['stop', 'running', 'stopped'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='idle', auto_transitions=False)
+        graph = machine.model_graphs[id(machine)]
+
+        edges = graph.get_parallel_edges('idle', 'running')
+
+        assert edges['nodes'] == []
+        assert edges['edges'] == machine.get_graph()['edges'][:3]
+
+    def test_overlay_applies_to_merged_edge(self):
+        """Test that the merged edge keeps an ID highlighted by the overlay."""
+        states = ['idle', 'running', 'stopped']
+        transitions = [
+            ['start', 'idle', 'running'],
+            ['begin', 'idle', 'running'],
+            ['go', 'idle', 'running'],
+            ['stop', 'running', 'stopped'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='idle', auto_transitions=False)
+        machine.begin()
+
+        merged = machine.get_graph(merge_parallel=True)['edges'][0]
+
+        assert machine.get_graph_overlay(merge_parallel=True)['edges'] == {merged['id']: {'className': 'previous'}}
+        assert machine.get_graph_overlay()['edges'] == {'e-idle-running-1': {'className': 'previous'}}
+
+    def test_merge_with_bundles(self):
+        """Test that bundled edges from the same virtual node are merged as well."""
+        states = ['idle', 'running', 'stopped']
+        transitions = [
+            ['start', 'idle', 'running'],
+            ['begin', 'idle', 'running'],
+            ['go', 'idle', 'running'],
+            ['stop', 'running', 'stopped'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='idle', auto_transitions=False)
+        machine.add_transition('fail', '*', 'stopped')
+        machine.add_transition('abort', '*', 'stopped')
+        graph = machine.model_graphs[id(machine)]
+
+        merged = machine.get_graph(bundle_sources=3, merge_parallel=True)['edges'][-1]
+        edges = graph.get_parallel_edges('*', 'stopped', bundle_sources=3)
+
+        assert (merged['source'], merged['label']) == ('*', 'fail, abort')
+        assert [edge['label'] for edge in edges['edges']] == ['fail', 'abort']
+
+    def test_binary_format(self):
+        """Test that the triggers of merged edges are encoded."""
+        states = ['idle', 'running', 'stopped']
+        transitions = [
+            ['start', 'idle', 'running'],
+            ['begin', 'idle', 'running'],
+            ['go', 'idle', 'running'],
+            ['stop', 'running', 'stopped'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='idle', auto_transitions=False)
+
+        data = machine.get_graph(merge_parallel=True, format='binary')
+
+        assert columnar.unpack(data) == machine.get_graph(merge_parallel=True)
+
+
+class TestStyleOverlay:
+    """Test cases for the active state/previous transition style overlay."""
+
+    def test_initial_state_is_active(self):
+        """Test that the initial state is marked active."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running'], transitions=[['start', 'idle', 'running']], initial='idle')
+
+        overlay = machine.get_graph_overlay()
+        assert overlay['nodes'] == {'idle': {'className': 'active'}}
+        assert overlay['edges'] == {}
+
+    def test_transition_updates_overlay_only(self):
+        """Test that transitions update the overlay without touching the graph."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running'],
+            transitions=[['start', 'idle', 'running'], ['restart', 'idle', 'running']],
+            initial='idle')
+        graph = machine.get_graph()
+        version = machine.get_graph_overlay()['version']
+
+        machine.start()
+
+        overlay = machine.get_graph_overlay()
+        assert overlay['version'] > version
+        assert overlay['nodes'] == {'idle': {'className': 'previous'},
+                                    'running': {'className': 'active'}}
+        assert overlay['edges'] == {'e-idle-running': {'className': 'previous'}}
+        assert machine.get_graph() == graph
+        assert machine.model_graphs[id(machine)]._topology.is_cached('react-flow')
+
+    def test_overlay_marks_fired_trigger(self):
+        """Test that only the edge of the fired trigger is marked among parallel edges."""
+        for machine_cls in (ReactFlowMachine, HierarchicalReactFlowMachine):
+            machine = machine_cls(
+                states=['idle', 'running'],
+                transitions=[['start', 'idle', 'running'], ['restart', 'idle', 'running']],
+                initial='idle')
+
+            machine.restart()
+
+            assert machine.get_graph_overlay()['edges'] == {'e-idle-running-1': {'className': 'previous'}}
+
+    def test_overlay_per_model(self):
+        """Test that every model has its own overlay."""
+        class Model:
+            pass
+
+        machine = ReactFlowMachine(
+            states=['idle', 'running'], transitions=[['start', 'idle', 'running']], initial='idle')
+        model = Model()
+        machine.add_model(model)
+
+        model.start()
+
+        assert machine.get_graph_overlay()['nodes'] == {'idle': {'className': 'active'}}
+        assert machine.get_graph_overlay(model)['nodes']['running'] == {'className': 'active'}
+
+    def test_reset_styling(self):
+        """Test that reset_styling clears the overlay."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running'], transitions=[['start', 'idle', 'running']], initial='idle')
+        machine.start()
+        graph = machine.model_graphs[id(machine)]
+
+        graph.reset_styling()
+
+        overlay = graph.get_overlay()
+        assert overlay['nodes'] == {}
+        assert overlay['edges'] == {}
+
+
+class TestGraphFromDefinition:
+    """Test cases for graphs built from machine definitions."""
+
+    def test_flat_definition_matches_machine(self):
+        """Test that a flat definition has the nodes and edges of its machine."""
+        states = ['idle', 'busy', 'done', 'unused']
+        transitions = [
+            ['start', 'idle', 'busy'],
+            {'trigger': 'finish', 'source': ['busy', 'idle'], 'dest': 'done'},
+            ['reset', '*', 'idle'],
+            ['refresh', '*', '='],
+            ['start', 'done', 'idle'],
+            {'trigger': 'poll', 'source': 'busy', 'dest': None},
+        ]
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='idle')
+
+        graph = ReactFlowGraph.from_definition(states, transitions)
+
+        assert graph.machine is None
+        assert graph.get_graph() == machine.get_graph()
+        assert graph.get_graph(roi_state='busy') == machine.get_graph(roi_state='busy')
+
+    def test_enum_definition_matches_machine(self):
+        """Test that Enum states and transitions are converted to their names."""
+        class States(enum.Enum):
+            RED = 1
+            GREEN = 2
+
+        transitions = [['go', States.RED, States.GREEN], ['stop', States.GREEN, States.RED]]
+        machine = ReactFlowMachine(states=States, transitions=transitions, initial=States.RED)
+
+        graph = ReactFlowGraph.from_definition(States, transitions)
+
+        assert graph.get_graph() == machine.get_graph()
+
+    def test_hierarchical_definition_matches_machine(self):
+        """Test that nested states, nested transitions, initial and wildcard edges match the machine."""
+        states = [
+            'idle',
+            {'name': 'busy', 'initial': 'a', 'children': [
+                'a', 'b',
+                {'name': 'c', 'initial': 'x', 'children': ['x', 'y'],
+                 'transitions': [['next', 'x', 'y'], ['back', '*', 'x']]},
+            ], 'transitions': [['next', 'a', 'b'], ['restart', '*', 'a']]},
+            {'name': 'both', 'parallel': ['left', 'right']},
+        ]
+        transitions = [
+            ['start', 'idle', 'busy'],
+            ['reset', '*', 'idle'],
+            ['refresh', '*', '='],
+            ['jump', 'idle', 'busy_c_y'],
+            ['start', 'busy_a', 'both'],
+        ]
+        machine = HierarchicalReactFlowMachine(states=states, transitions=transitions, initial='idle')
+
+        graph = ReactFlowGraph.from_definition(states, transitions, hierarchical=True)
+
+        assert graph.get_graph() == machine.get_graph()
+        assert graph.get_graph(max_depth=0) == machine.get_graph(max_depth=0)
+        assert graph.get_graph(collapsed='busy_c') == machine.get_graph(collapsed='busy_c')
+        assert graph.get_children('busy') == machine.get_graph_children('busy')
+
+    def test_custom_separator(self):
+        """Test that nested node IDs use the given separator."""
+        graph = ReactFlowGraph.from_definition(
+            [{'name': 'busy', 'initial': 'a', 'children': ['a']}], hierarchical=True, separator='.')
+
+        result = graph.get_graph()
+
+        assert [node['id'] for node in result['nodes']] == ['busy', 'busy.a']
+        assert result['edges'][0]['target'] == 'busy.a'
+
+    def test_nested_states_require_hierarchical(self):
+        """Test that nested states in a flat definition are rejected."""
+        with pytest.raises(ValueError, match='hierarchical'):
+            ReactFlowGraph.from_definition([{'name': 'busy', 'children': ['a']}])
+
+    def test_invalid_definition(self):
+        """Test that states and transitions that cannot be converted raise ValueError."""
+        with pytest.raises(ValueError):
+            ReactFlowGraph.from_definition([42])
+        with pytest.raises(ValueError):
+            ReactFlowGraph.from_definition(['a'], [['go', 'a']])
+
+
+class TestGraphStats:
+    """Test cases for timings and counters of the graph pipeline."""
+
+    def test_build_stages(self):
+        """Test that building and reusing the index is timed and counted."""
+        stats = GraphStats()
+        machine = ReactFlowMachine(
+            states=['idle', 'running', 'stopped'],
+            transitions=[['start', 'idle', 'running'], ['stop', 'running', 'stopped']],
+            initial='idle', auto_transitions=False, lazy_graph=True, graph_stats=stats)
+
+        machine.get_graph()
+        machine.get_graph()
+
+        result = stats.as_dict()
+        assert {'get_graph', 'read', 'edges', 'nodes', 'index', 'render'} <= set(result['timings'])
+        assert result['calls']['get_graph'] == 2
+        assert result['calls']['read'] == 1
+        assert result['counters'] == {
+            'index_misses': 1, 'index_hits': 1, 'output_misses': 1, 'output_hits': 1,
+            'states_read': 3, 'transitions_read': 2, 'edges_built': 2, 'nodes_built': 3,
+        }
+
+    def test_nested_states_counted(self):
+        """Test that nested states are counted when reading a hierarchical machine."""
+        stats = GraphStats()
+        machine = HierarchicalReactFlowMachine(
+            states=['idle', {'name': 'busy', 'children': ['a', 'b'], 'initial': 'a'}],
+            transitions=[['start', 'idle', 'busy']], initial='idle', auto_transitions=False, lazy_graph=True,
+            graph_stats=stats)
+
+        machine.get_graph()
+
+        assert stats.counters['states_read'] == 4
+        assert stats.counters['nodes_built'] == 4
+
+    def test_callback(self):
+        """Test that the callback receives every completed stage."""
+        stages = []
+        stats = GraphStats(lambda stage, seconds: stages.append(stage))
+        machine = ReactFlowMachine(
+            states=['idle', 'running', 'stopped'],
+            transitions=[['start', 'idle', 'running'], ['stop', 'running', 'stopped']],
+            initial='idle', auto_transitions=False, lazy_graph=True, graph_stats=stats)
+
+        machine.get_graph()
+
+        assert stages == ['read', 'edges', 'nodes', 'index', 'render', 'get_graph']
+        assert all(seconds >= 0 for seconds in machine.graph_stats.timings.values())
+
+    def test_deltas_and_formats(self):
+        """Test that deltas, encodings, layouts and JSON serialization are timed."""
+        stats = GraphStats()
+        machine = ReactFlowMachine(
+            states=['idle', 'running', 'stopped'],
+            transitions=[['start', 'idle', 'running'], ['stop', 'running', 'stopped']],
+            initial='idle', auto_transitions=False, lazy_graph=True, graph_stats=stats, layout_cache=LayoutCache())
+        machine.get_graph()
+
+        machine.add_transition('reset', 'stopped', 'idle')
+        machine.get_graph(format='binary')
+        machine.get_graph(layout='layered')
+        machine.get_graph(roi_state='idle', layout='layered')
+        ''.join(machine.model_graphs[id(machine)].iter_json())
+
+        assert stats.calls['delta'] == 1
+        assert stats.calls['encode'] == 1
+        assert stats.calls['serialize'] == 1
+        # The region around 'idle' is the whole graph, whose layout is found in the cache
+        assert stats.calls['layout'] == 1
+        assert stats.counters['layout_cache_misses'] == 1
+        assert stats.counters['layout_cache_hits'] == 1
+
+    def test_reset(self):
+        """Test that reset clears all statistics."""
+        stats = GraphStats()
+        machine = ReactFlowMachine(
+            states=['idle', 'running', 'stopped'],
+            transitions=[['start', 'idle', 'running'], ['stop', 'running', 'stopped']],
+            initial='idle', auto_transitions=False, lazy_graph=True, graph_stats=stats)
+        machine.get_graph()
+
+        stats.reset()
+
+        assert stats.as_dict() == {'timings': {}, 'calls': {}, 'counters': {}}
+
+    def test_graph_without_machine(self):
+        """Test that graphs built from definitions use their own graph_stats."""
+        graph = ReactFlowGraph.from_definition(['a', 'b'], [['go', 'a', 'b']])
+        graph.graph_stats = GraphStats()
+
+        graph.get_graph()
+
+        assert graph.graph_stats.counters == {'index_hits': 1, 'output_misses': 1}
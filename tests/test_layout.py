@@ -0,0 +1,457 @@
+"""Tests for the server-side graph layouts."""
+
+import os
+import pickle
+
+import pytest
+from transitions_reactflow import HierarchicalReactFlowMachine, LayeredLayout, Layout, LayoutCache, ReactFlowMachine
+
+
+class TestLayeredLayout:
+    """Test cases for LayeredLayout."""
+
+    def test_layers_follow_edges(self):
+        """Test that nodes are placed in layers along the edges."""
+        layout = LayeredLayout()
+
+        result = layout.compute(['a', 'b', 'c'], [('a', 'b'), ('b', 'c'), ('a', 'c')])
+
+        ys = [result[name]['position']['y'] for name in 'abc']
+        assert ys == [0, 180, 360]
+        assert result['a']['sourcePosition'] == 'bottom'
+        assert result['a']['targetPosition'] == 'top'
+
+    def test_nodes_of_a_layer_do_not_overlap(self):
+        """Test that nodes in the same layer keep their minimum distance."""
+        layout = LayeredLayout()
+
+        result = layout.compute(['root', 'a', 'b', 'c'], [('root', 'a'), ('root', 'b'), ('root', 'c')])
+
+        xs = sorted(result[name]['position']['x'] for name in 'abc')
+        assert xs[1] - xs[0] >= 230
+        assert xs[2] - xs[1] >= 230
+        # The parent is centered above its children
+        assert result['root']['position']['x'] == pytest.approx(xs[1])
+
+    def test_cycles(self):
+        """Test that cyclic graphs are laid out."""
+        layout = LayeredLayout()
+
+        result = layout.compute(['a', 'b', 'c'], [('a', 'b'), ('b', 'c'), ('c', 'a'), ('c', 'c')])
+
+        assert sorted(result[name]['position']['y'] for name in 'abc') == [0, 180, 360]
+
+    @pytest.mark.parametrize('direction, depth_axis, handles', [
+        ('LR', 'x', ('right', 'left')),
+        ('RL', 'x', ('left', 'right')),
+        ('BT', 'y', ('top', 'bottom')),
+    ])
+    def test_directions(self, direction, depth_axis, handles):
+        """Test that the direction determines the rank axis and handle sides."""
+        layout = LayeredLayout(direction=direction)
+
+        result = layout.compute(['a', 'b'], [('a', 'b')])
+
+        first, second = result['a']['position'][depth_axis], result['b']['position'][depth_axis]
+        assert (first < second) == (direction == 'LR')
+        assert (result['a']['sourcePosition'], result['a']['targetPosition']) == handles
+
+    def test_nested_layout(self):
+        """Test that parents are sized to enclose their children, which are laid out along their edges."""
+        layout = LayeredLayout(group_padding=20)
+
+        result = layout.compute_nested(['p', 'a', 'b', 'q'], [('a', 'b'), ('p', 'q')], {'a': 'p', 'b': 'p'})
+
+        assert result['p']['style'] == {'width': 190, 'height': 280}
+        assert result['a']['position'] == {'x': 20, 'y': 20}
+        assert result['b']['position'] == {'x': 20, 'y': 200}
+        # The next layer follows the parent's full height
+        assert result['q']['position']['y'] == 400
+        assert 'style' not in result['q']
+
+    def test_invalid_direction(self):
+        """Test that unknown directions are rejected."""
+        with pytest.raises(ValueError, match="Unknown layout direction"):
+            LayeredLayout(direction='diagonal')
+
+
+class TestGraphLayout:
+    """Test cases for get_graph(layout=...)."""
+
+    def test_layout_by_name(self):
+        """Test that layouts can be selected by name."""
+        states = ['red', 'yellow', 'green']
+        transitions = [
+            ['next', 'red', 'green'],
+            ['next', 'green', 'yellow'],
+            ['next', 'yellow', 'red'],
+            ['emergency', ['green', 'yellow'], 'red'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='red')
+
+        graph = machine.get_graph(layout='layered')
+
+        positions = {node['id']: node['position'] for node in graph['nodes']}
+        assert positions == {'red': {'x': 0, 'y': 0}, 'green': {'x': 0, 'y': 180},
+                             'yellow': {'x': 0, 'y': 360}}
+        assert graph['edges'] == machine.get_graph()['edges']
+        # The unlaid graph is not modified
+        assert machine.get_graph()['nodes'][0]['position'] == {'x': 0, 'y': 0}
+
+    def test_nested_positions_are_relative(self):
+        """Test that nested nodes are positioned relative to their parent node."""
+        machine = HierarchicalReactFlowMachine(
+            states=['idle', {'name': 'busy', 'children': ['a', 'b']}],
+            transitions=[['go', 'idle', 'busy'], ['next', 'busy_a', 'busy_b']],
+            initial='idle', auto_transitions=False)
+        layout = LayeredLayout()
+        absolute = layout.compute_nested(
+            [node['id'] for node in machine.get_graph()['nodes']],
+            [(edge['source'], edge['target']) for edge in machine.get_graph()['edges']],
+            {'busy_a': 'busy', 'busy_b': 'busy'})
+
+        positions = {node['id']: node['position'] for node in machine.get_graph(layout=layout)['nodes']}
+
+        assert positions['busy'] == absolute['busy']['position']
+        assert positions['busy_b'] == {
+            'x': absolute['busy_b']['position']['x'] - absolute['busy']['position']['x'],
+            'y': absolute['busy_b']['position']['y'] - absolute['busy']['position']['y'],
+        }
+
+    def test_nested_nodes_inside_parent(self):
+        """Test that nested nodes lie within the bounds of their sized parent node."""
+        machine = HierarchicalReactFlowMachine(
+            states=['idle', {'name': 'busy', 'children': ['a', {'name': 'b', 'children': ['x', 'y']}]}, 'done'],
+            transitions=[['go', 'idle', 'busy'], ['next', 'busy_a', 'busy_b'],
+                         ['next', 'busy_b_x', 'busy_b_y'], ['finish', 'busy_b_y', 'done']],
+            initial='idle', auto_transitions=False)
+        layout = LayeredLayout()
+
+        nodes = {node['id']: node for node in machine.get_graph(layout=layout)['nodes']}
+
+        for node in nodes.values():
+            parent = nodes.get(node.get('parentNode'))
+            size = node.get('style', {'width': layout.node_width, 'height': layout.node_height})
+            if parent is None:
+                continue
+            assert 0 <= node['position']['x'] <= parent['style']['width'] - size['width']
+            assert 0 <= node['position']['y'] <= parent['style']['height'] - size['height']
+        # Top level nodes do not overlap the enclosing parent
+        busy = nodes['busy']
+        assert nodes['idle']['position']['y'] + layout.node_height < busy['position']['y']
+        assert nodes['done']['position']['y'] > busy['position']['y'] + busy['style']['height']
+
+    def test_layout_is_cached(self):
+        """Test that layouts are cached until the topology changes."""
+        states = ['red', 'yellow', 'green']
+        transitions = [
+            ['next', 'red', 'green'],
+            ['next', 'green', 'yellow'],
+            ['next', 'yellow', 'red'],
+            ['emergency', ['green', 'yellow'], 'red'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='red')
+        graph = machine.get_graph(layout=LayeredLayout(direction='LR'))
+        topology = machine.model_graphs[id(machine)]._topology
+        name = f"layout:{LayeredLayout(direction='LR').key!r}"
+
+        assert topology.is_cached(name)
+        assert machine.get_graph(layout=LayeredLayout(direction='LR')) == graph
+        assert machine.get_graph(layout='layered') != graph
+
+        machine.add_state('blinking')
+        machine.add_transition('fault', 'red', 'blinking')
+        assert not topology.is_cached(name)
+        assert machine.get_graph(layout=LayeredLayout(direction='LR')) != graph
+
+    def test_custom_layout(self):
+        """Test that Layout subclasses can be plugged in."""
+        class Diagonal(Layout):
+            def compute(self, nodes, edges):
+                return {name: {'position': {'x': i, 'y': i}} for i, name in enumerate(nodes)}
+
+        states = ['red', 'yellow', 'green']
+        transitions = [
+            ['next', 'red', 'green'],
+            ['next', 'green', 'yellow'],
+            ['next', 'yellow', 'red'],
+            ['emergency', ['green', 'yellow'], 'red'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='red')
+
+        graph = machine.get_graph(layout=Diagonal())
+
+        assert [node['position'] for node in graph['nodes']] == [{'x': i, 'y': i} for i in range(3)]
+
+    def test_invalid_layout(self):
+        """Test that unknown layouts and unsupported formats are rejected."""
+        states = ['red', 'yellow', 'green']
+        transitions = [
+            ['next', 'red', 'green'],
+            ['next', 'green', 'yellow'],
+            ['next', 'yellow', 'red'],
+            ['emergency', ['green', 'yellow'], 'red'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='red')
+
+        with pytest.raises(ValueError, match="Unknown layout"):
+            machine.get_graph(layout='circular')
+        with pytest.raises(ValueError, match="not supported"):
+            machine.get_graph(format='compact', layout='layered')
+
+    def test_incomplete_layout(self):
+        """Test that layouts without compute cannot be created."""
+        class Incomplete(Layout):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    def test_failing_layout(self):
+        """Test that layout errors are wrapped in ValueError."""
+        class Broken(Layout):
+            def compute(self, nodes, edges):
+                raise RuntimeError("boom")
+
+        states = ['red', 'yellow', 'green']
+        transitions = [
+            ['next', 'red', 'green'],
+            ['next', 'green', 'yellow'],
+            ['next', 'yellow', 'red'],
+            ['emergency', ['green', 'yellow'], 'red'],
+        ]
+
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='red')
+
+        with pytest.raises(ValueError, match="Failed to lay out"):
+            machine.get_graph(layout=Broken())
+
+
+class TestIncrementalLayout:
+    """Test cases for incremental layered layouts."""
+
+    @staticmethod
+    def _positions(graph):
+        return {node['id']: node['position'] for node in graph['nodes']}
+
+    def test_existing_nodes_keep_positions(self):
+        """Test that adding a transition only places the new node."""
+        machine = ReactFlowMachine(
+            states=['a', 'b', 'c', 'd', 'e'],
+            transitions=[['go', 'a', 'b'], ['go', 'b', 'c'], ['go', 'a', 'd'], ['go', 'd', 'e']],
+            initial='a', auto_transitions=False)
+        layout = LayeredLayout(incremental=True)
+        before = self._positions(machine.get_graph(layout=layout))
+
+        machine.add_state('f')
+        machine.add_transition('go', 'c', 'f')
+        after = self._positions(machine.get_graph(layout=layout))
+
+        assert {name: after[name] for name in before} == before
+        assert after['f']['y'] == before['c']['y'] + 180
+        assert after['f']['x'] == before['c']['x']
+
+    def test_overlapping_neighbours_move_aside(self):
+        """Test that nodes in the target layer are moved only as far as needed."""
+        machine = ReactFlowMachine(
+            states=['a', 'b', 'c', 'd', 'e'],
+            transitions=[['go', 'a', 'b'], ['go', 'b', 'c'], ['go', 'a', 'd'], ['go', 'd', 'e']],
+            initial='a', auto_transitions=False)
+        layout = LayeredLayout(incremental=True)
+        before = self._positions(machine.get_graph(layout=layout))
+
+        machine.add_state('f')
+        machine.add_transition('go', 'a', 'f')
+        after = self._positions(machine.get_graph(layout=layout))
+
+        layer = sorted(after[name]['x'] for name in ('b', 'd', 'f'))
+        assert after['f']['y'] == before['b']['y']
+        assert layer[1] - layer[0] >= 230
+        assert layer[2] - layer[1] >= 230
+        assert after['c'] == before['c']
+
+    def test_unconnected_nodes(self):
+        """Test that nodes without placed neighbours start a new component."""
+        machine = ReactFlowMachine(
+            states=['a', 'b', 'c', 'd', 'e'],
+            transitions=[['go', 'a', 'b'], ['go', 'b', 'c'], ['go', 'a', 'd'], ['go', 'd', 'e']],
+            initial='a', auto_transitions=False)
+        layout = LayeredLayout(incremental=True)
+        before = self._positions(machine.get_graph(layout=layout))
+
+        machine.add_states(['x', 'y'])
+        machine.add_transition('go', 'x', 'y')
+        after = self._positions(machine.get_graph(layout=layout))
+
+        assert after['x']['y'] == before['a']['y']
+        assert after['x']['x'] == before['a']['x'] + 230
+        assert after['y']['y'] == after['x']['y'] + 180
+        layer = sorted(position['x'] for position in after.values() if position['y'] == after['y']['y'])
+        assert all(second - first >= 230 for first, second in zip(layer, layer[1:]))
+
+    def test_region_keeps_graph_positions(self):
+        """Test that regions are placed where they are in the layout of the whole graph."""
+        machine = ReactFlowMachine(
+            states=['a', 'b', 'c', 'd', 'e'],
+            transitions=[['go', 'a', 'b'], ['go', 'b', 'c'], ['go', 'a', 'd'], ['go', 'd', 'e']],
+            initial='a', auto_transitions=False)
+        layout = LayeredLayout(incremental=True)
+        positions = self._positions(machine.get_graph(layout=layout))
+
+        region = self._positions(machine.get_graph(roi_state='b', layout=layout))
+
+        assert region == {name: positions[name] for name in ('a', 'b', 'c')}
+
+    def test_full_layout_without_incremental_mode(self):
+        """Test that layouts are recomputed from scratch by default."""
+        machine = ReactFlowMachine(
+            states=['a', 'b', 'c', 'd', 'e'],
+            transitions=[['go', 'a', 'b'], ['go', 'b', 'c'], ['go', 'a', 'd'], ['go', 'd', 'e']],
+            initial='a', auto_transitions=False)
+        layout = LayeredLayout()
+        before = self._positions(machine.get_graph(layout=layout))
+
+        machine.add_state('f')
+        machine.add_transition('go', 'a', 'f')
+        after = self._positions(machine.get_graph(layout=layout))
+
+        assert after == self._positions(ReactFlowMachine(
+            states=['a', 'b', 'c', 'd', 'e', 'f'],
+            transitions=[['go', 'a', 'b'], ['go', 'b', 'c'], ['go', 'a', 'd'], ['go', 'd', 'e'], ['go', 'a', 'f']],
+            initial='a', auto_transitions=False).get_graph(layout=layout))
+        assert after != before
+
+    def test_mostly_new_graph_is_laid_out_from_scratch(self):
+        """Test that incremental layouts fall back if most nodes are new."""
+        layout = LayeredLayout(incremental=True)
+        previous = layout.compute(['a'], [])
+
+        result = layout.update(['a', 'b', 'c'], [('a', 'b'), ('b', 'c')], previous)
+
+        assert result == layout.compute(['a', 'b', 'c'], [('a', 'b'), ('b', 'c')])
+
+
+class CountingLayout(LayeredLayout):
+    """Layered layout that counts its computations."""
+
+    calls = 0
+
+    def compute(self, nodes, edges):
+        CountingLayout.calls += 1
+        return super().compute(nodes, edges)
+
+
+class TestLayoutCache:
+    """Test cases for LayoutCache."""
+
+    def test_key_depends_on_graph_and_options(self):
+        """Test that keys are stable and change with the graph or options."""
+        nodes, edges = ['a', 'b'], [('a', 'b')]
+        key = LayoutCache.key(LayeredLayout(), nodes, edges)
+
+        assert key == LayoutCache.key(LayeredLayout(), list(nodes), list(edges))
+        assert key != LayoutCache.key(LayeredLayout(direction='LR'), nodes, edges)
+        assert key != LayoutCache.key(LayeredLayout(), nodes, [('b', 'a')])
+        assert key != LayoutCache.key(LayeredLayout(), nodes, edges, {'b': 'a'})
+        assert key == LayoutCache.key(LayeredLayout(), nodes, edges, {})
+
+        class Unkeyed(Layout):
+            def compute(self, nodes, edges):
+                return {}
+
+        assert LayoutCache.key(Unkeyed(), nodes, edges) is None
+
+    def test_lru_eviction(self):
+        """Test that the least recently used layout is evicted."""
+        cache = LayoutCache(max_size=2)
+        cache.put('a', {})
+        cache.put('b', {})
+        cache.get('a')
+        cache.put('c', {})
+
+        assert cache.get('a') == {}
+        assert cache.get('b') is None
+        assert cache.get('c') == {}
+
+    def test_reused_across_machines(self):
+        """Test that machines sharing a cache compute a layout once."""
+        states = ['red', 'yellow', 'green']
+        transitions = [
+            ['next', 'red', 'green'],
+            ['next', 'green', 'yellow'],
+            ['next', 'yellow', 'red'],
+            ['emergency', ['green', 'yellow'], 'red'],
+        ]
+        cache = LayoutCache()
+        CountingLayout.calls = 0
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='red', layout_cache=cache)
+        other = ReactFlowMachine(states=states, transitions=transitions, initial='red', layout_cache=cache)
+
+        first = machine.get_graph(layout=CountingLayout())
+        second = other.get_graph(layout=CountingLayout())
+
+        assert CountingLayout.calls == 1
+        assert first == second
+
+    def test_cache_used_after_topology_change(self):
+        """Test that layouts of later versions are shared through the cache as well."""
+        states = ['red', 'yellow', 'green']
+        transitions = [
+            ['next', 'red', 'green'],
+            ['next', 'green', 'yellow'],
+            ['next', 'yellow', 'red'],
+            ['emergency', ['green', 'yellow'], 'red'],
+        ]
+        cache = LayoutCache()
+        CountingLayout.calls = 0
+        machine = ReactFlowMachine(states=states, transitions=transitions, initial='red', layout_cache=cache)
+        machine.get_graph(layout=CountingLayout())
+        machine.add_transition('fault', 'red', 'yellow')
+        graph = machine.get_graph(layout=CountingLayout())
+
+        other = ReactFlowMachine(states=states, transitions=transitions, initial='red', layout_cache=cache)
+        other.add_transition('fault', 'red', 'yellow')
+
+        assert other.get_graph(layout=CountingLayout()) == graph
+        assert CountingLayout.calls == 2
+
+    def test_directory_tier(self, tmp_path):
+        """Test that layouts are stored on disk and survive a new cache instance."""
+        states = ['red', 'yellow', 'green']
+        transitions = [
+            ['next', 'red', 'green'],
+            ['next', 'green', 'yellow'],
+            ['next', 'yellow', 'red'],
+            ['emergency', ['green', 'yellow'], 'red'],
+        ]
+        CountingLayout.calls = 0
+        machine = ReactFlowMachine(
+            states=states, transitions=transitions, initial='red', layout_cache=LayoutCache(directory=str(tmp_path)))
+        graph = machine.get_graph(layout=CountingLayout())
+
+        assert len(os.listdir(tmp_path)) == 1
+        machine = ReactFlowMachine(
+            states=states, transitions=transitions, initial='red', layout_cache=LayoutCache(directory=str(tmp_path)))
+        restored = machine.get_graph(layout=CountingLayout())
+        assert CountingLayout.calls == 1
+        assert restored == graph
+
+    def test_corrupt_file_is_a_miss(self, tmp_path):
+        """Test that unreadable files are recomputed."""
+        cache = LayoutCache(directory=str(tmp_path))
+        (tmp_path / 'broken.json').write_text('{')
+
+        assert cache.get('broken') is None
+
+    def test_pickle(self):
+        """Test that caches can be pickled despite their lock."""
+        cache = LayoutCache()
+        cache.put('a', {'x': {}})
+
+        restored = pickle.loads(pickle.dumps(cache))
+
+        assert restored.get('a') == {'x': {}}
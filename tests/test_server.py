@@ -0,0 +1,186 @@
+"""Tests for the WSGI graph server."""
+
+import gzip
+import json
+
+import pytest
+from transitions_reactflow import HierarchicalReactFlowMachine, LockedReactFlowMachine, ReactFlowMachine, server
+from transitions_reactflow.server import create_app
+
+
+def request(app, path, **environ):
+    """Call a WSGI application and return the status code, headers and body."""
+    response = {}
+
+    def start_response(status, headers):
+        response['status'] = int(status.split()[0])
+        response['headers'] = dict(headers)
+
+    body = b''.join(app({'PATH_INFO': path, 'REQUEST_METHOD': 'GET', **environ}, start_response))
+    return response['status'], response['headers'], body
+
+
+class TestGraphServer:
+    """Test cases for serving machine graphs over WSGI."""
+
+    def test_graph_json(self):
+        """Test that the graph is served as the JSON of get_graph with the given options."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running'], transitions=[['start', 'idle', 'running']], initial='idle')
+        app = create_app({'demo': machine}, layout='layered')
+
+        status, headers, body = request(app, '/graph-data/demo')
+
+        assert status == 200
+        assert headers['Content-Type'] == 'application/json'
+        assert headers['Content-Length'] == str(len(body))
+        assert 'Content-Encoding' not in headers
+        assert json.loads(body) == json.loads(json.dumps(machine.get_graph(layout='layered')))
+
+    def test_gzip(self):
+        """Test that clients accepting gzip receive the precompressed graph."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running'], transitions=[['start', 'idle', 'running']], initial='idle')
+        app = create_app({'demo': machine})
+
+        status, headers, body = request(app, '/graph-data/demo', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        _, _, identity = request(app, '/graph-data/demo', HTTP_ACCEPT_ENCODING='gzip;q=0')
+
+        assert status == 200
+        assert headers['Content-Encoding'] == 'gzip'
+        assert headers['Vary'] == 'Accept-Encoding'
+        assert gzip.decompress(body) == identity
+
+    def test_not_modified(self):
+        """Test that requests with the current ETag get 304 until the topology changes."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running'], transitions=[['start', 'idle', 'running']], initial='idle')
+        app = create_app({'demo': machine})
+        _, headers, _ = request(app, '/graph-data/demo', HTTP_ACCEPT_ENCODING='gzip')
+        etag = headers['ETag']
+
+        status, headers, body = request(app, '/graph-data/demo', HTTP_IF_NONE_MATCH=etag)
+        assert (status, body) == (304, b'')
+        assert headers['ETag'] != etag  # tags the identity encoding, which was requested this time
+
+        machine.start()
+        assert request(app, '/graph-data/demo', HTTP_IF_NONE_MATCH=f'W/{etag}')[0] == 304
+
+        machine.add_transition('stop', 'running', 'idle')
+        status, headers, body = request(app, '/graph-data/demo', HTTP_IF_NONE_MATCH=etag)
+        assert status == 200
+        assert headers['ETag'] != etag
+        assert len(json.loads(body)['edges']) == 2
+
+    def test_graph_generated_once_per_version(self):
+        """Test that the encoded graph is reused until the graph version changes."""
+        machine = ReactFlowMachine(
+            states=['idle', 'running'], transitions=[['start', 'idle', 'running']], initial='idle')
+        app = create_app({'demo': machine})
+        calls = []
+        get_graph = machine._get_graph
+        machine._get_graph = lambda *args, **kwargs: calls.append(args) or get_graph(*args, **kwargs)
+
+        for _ in range(3):
+            request(app, '/graph-data/demo')
+        machine.add_state('stopped')
+        request(app, '/graph-data/demo')
+
+        assert len(calls) == 2
+
+    def test_region_follows_state(self):
+        """Test that graphs of the region of interest are regenerated when the state changes."""
+        machine = ReactFlowMachine(
+            states=['a', 'b', 'c', 'd'], transitions=[['next', 'a', 'b'], ['next', 'b', 'c'], ['next', 'c', 'd']],
+            initial='a', auto_transitions=False)
+        app = create_app({'demo': machine}, show_roi=True)
+        _, headers, body = request(app, '/graph-data/demo')
+        assert {node['id'] for node in json.loads(body)['nodes']} == {'a', 'b'}
+
+        machine.next()
+        machine.next()
+        status, _, body = request(app, '/graph-data/demo', HTTP_IF_NONE_MATCH=headers['ETag'])
+
+        assert status == 200
+        assert json.loads(body) == json.loads(json.dumps(machine.get_graph(show_roi=True)))
+
+    def test_etag_of_generated_region(self):
+        """Test that a state change before the graph is generated is reflected in the ETag."""
+        machine = ReactFlowMachine(
+            states=['a', 'b', 'c'], transitions=[['next', 'a', 'b'], ['next', 'b', 'c'], ['back', 'b', 'a']],
+            initial='a', auto_transitions=False)
+        app = create_app({'demo': machine}, show_roi=True)
+        entry = app._entries['demo']
+        key = entry.key
+
+        def key_then_transition():
+            result = key()
+            entry.key = key
+            machine.next()
+            return result
+
+        entry.key = key_then_transition
+        _, headers, body = request(app, '/graph-data/demo')
+        assert {node['id'] for node in json.loads(body)['nodes']} == {'a', 'b', 'c'}
+
+        machine.back()
+        status, _, body = request(app, '/graph-data/demo', HTTP_IF_NONE_MATCH=headers['ETag'])
+        assert status == 200
+        assert {node['id'] for node in json.loads(body)['nodes']} == {'a', 'b'}
+
+        machine.next()
+        assert request(app, '/graph-data/demo', HTTP_IF_NONE_MATCH=headers['ETag'])[0] == 304
+
+    def test_overlay(self):
+        """Test that the overlay reflects transitions and supports ETags."""
+        machine = LockedReactFlowMachine(
+            states=['a', 'b'], transitions=[['go', 'a', 'b']], initial='a', lazy_graph=True)
+        app = create_app({'demo': machine})
+
+        status, headers, body = request(app, '/graph-data/demo/overlay')
+        assert status == 200
+        assert json.loads(body)['nodes'] == {'a': {'className': 'active'}}
+        assert request(app, '/graph-data/demo/overlay', HTTP_IF_NONE_MATCH=headers['ETag'])[0] == 304
+
+        machine.go()
+        status, _, body = request(app, '/graph-data/demo/overlay', HTTP_IF_NONE_MATCH=headers['ETag'])
+        assert status == 200
+        assert json.loads(body)['nodes'] == {'b': {'className': 'active'}}
+
+    def test_routing(self):
+        """Test prefixes, HEAD, unknown machines, other methods and the wrapped application."""
+        def fallback(environ, start_response):
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return [b'fallback']
+
+        app = create_app(prefix='/api/')
+        app.register('nested', HierarchicalReactFlowMachine(
+            states=['a', {'name': 'b', 'children': ['x', 'y']}], initial='a'))
+
+        status, headers, body = request(app, '/api/nested', REQUEST_METHOD='HEAD')
+        assert (status, body) == (200, b'')
+        assert int(headers['Content-Length']) > 0
+        assert request(app, '/api/other')[0] == 404
+        assert request(app, '/api/nested', REQUEST_METHOD='POST')[0] == 405
+
+        app.app = fallback
+        assert request(app, '/index.html') == (200, {'Content-Type': 'text/plain'}, b'fallback')
+        app.unregister('nested')
+        assert request(app, '/api/nested')[2] == b'fallback'
+
+    def test_negotiate(self):
+        """Test that the preferred supported encoding is chosen."""
+        assert server._negotiate('') == 'identity'
+        assert server._negotiate('deflate, gzip;q=0.5') == 'gzip'
+        assert server._negotiate('*') == server.ENCODINGS[0]
+        assert server._negotiate('*, gzip;q=0, br;q=0') == 'identity'
+
+    def test_invalid_arguments(self):
+        """Test that invalid machines and names raise ValueError."""
+        app = create_app()
+        with pytest.raises(ValueError):
+            app.register('demo', object())
+        with pytest.raises(ValueError):
+            app.register('a/b', ReactFlowMachine(states=['idle'], initial='idle'))
+        with pytest.raises(ValueError):
+            app.unregister('demo')
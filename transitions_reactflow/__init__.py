@@ -17,6 +17,11 @@ from .machine import (
     HierarchicalAsyncReactFlowMachine,
 )
 from .diagrams_reactflow import ReactFlowGraph
+from .topology import NodeRecord, EdgeRecord
+from .layout import Layout, LayeredLayout, LayoutCache
+from .batch import generate_graphs
+from .stats import GraphStats
+from .telemetry import TransitionRecorder
 
 __all__ = [
     "ReactFlowMachine",
@@ -26,4 +31,12 @@ __all__ = [
     "AsyncReactFlowMachine",
     "HierarchicalAsyncReactFlowMachine",
     "ReactFlowGraph",
+    "NodeRecord",
+    "EdgeRecord",
+    "Layout",
+    "LayeredLayout",
+    "LayoutCache",
+    "generate_graphs",
+    "GraphStats",
+    "TransitionRecorder",
 ]
@@ -1,6 +1,8 @@
 """Type stubs for transitions_reactflow package."""
 
-from typing import Any, Dict, List, Optional, Sequence
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
 from transitions.core import StateConfig
 from transitions.extensions import (
     GraphMachine,
@@ -16,8 +18,74 @@ __author__: str
 
 
 class ReactFlowMixin:
+    lazy_graph: bool
+    layout_cache: Optional[LayoutCache]
+    graph_stats: Optional[GraphStats]
+    telemetry: Optional[TransitionRecorder]
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None: ...
+
+    @property
+    def graph_version(self) -> int: ...
+
     def _init_graphviz_engine(self, graph_engine: str) -> type: ...
 
+    def add_states(
+        self,
+        states: Any,
+        on_enter: Any = ...,
+        on_exit: Any = ...,
+        ignore_invalid_triggers: Any = ...,
+        **kwargs: Any
+    ) -> None: ...
+
+    def add_transition(
+        self,
+        trigger: str,
+        source: Any,
+        dest: Any = ...,
+        conditions: Any = ...,
+        unless: Any = ...,
+        before: Any = ...,
+        after: Any = ...,
+        prepare: Any = ...,
+        **kwargs: Any
+    ) -> None: ...
+
+    def remove_transition(
+        self, trigger: str, source: Any = ..., dest: Any = ...
+    ) -> None: ...
+
+    def add_model(self, model: Any, initial: Any = ..., **kwargs: Any) -> None: ...
+
+    def get_graph_overlay(
+        self, model: Any = ..., merge_parallel: bool = ...
+    ) -> Dict[str, Any]: ...
+
+    def get_telemetry_overlay(self) -> Dict[str, Any]: ...
+
+    def get_graph_children(
+        self, state: Any, model: Any = ..., **kwargs: Any
+    ) -> Any: ...
+
+
+class LockedReactFlowMixin(ReactFlowMixin):
+    def add_model(
+        self, model: Any, initial: Any = ..., model_context: Any = ..., **kwargs: Any
+    ) -> None: ...
+
+class AsyncReactFlowMixin(ReactFlowMixin):
+    def __init__(self, *args: Any, **kwargs: Any) -> None: ...
+
+    async def get_graph_async(
+        self,
+        model: Any = ...,
+        show_roi: bool = ...,
+        serialize: bool = ...,
+        executor: Optional[Executor] = ...,
+        **kwargs: Any
+    ) -> Any: ...
+
 
 class ReactFlowMachine(ReactFlowMixin, GraphMachine):
     def __init__(
@@ -31,12 +99,26 @@ class ReactFlowMachine(ReactFlowMixin, GraphMachine):
         title: str = ...,
         show_conditions: bool = ...,
         show_state_attributes: bool = ...,
+        lazy_graph: bool = ...,
+        layout_cache: Optional[LayoutCache] = ...,
+        graph_stats: Optional[GraphStats] = ...,
+        telemetry: Optional[TransitionRecorder] = ...,
         **kwargs: Any
     ) -> None: ...
 
     def get_graph(
-        self, title: Optional[str] = ..., roi_state: Optional[str] = ...
-    ) -> Dict[str, List[Dict[str, Any]]]: ...
+        self,
+        title: Optional[str] = ...,
+        roi_state: Optional[Any] = ...,
+        format: str = ...,
+        layout: Optional[Union[str, Layout]] = ...,
+        radius: int = ...,
+        max_nodes: Optional[int] = ...,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        bundle_sources: Optional[int] = ...,
+        merge_parallel: bool = ...,
+    ) -> Any: ...
 
 
 class HierarchicalReactFlowMachine(ReactFlowMixin, HierarchicalGraphMachine):
@@ -51,15 +133,29 @@ class HierarchicalReactFlowMachine(ReactFlowMixin, HierarchicalGraphMachine):
         title: str = ...,
         show_conditions: bool = ...,
         show_state_attributes: bool = ...,
+        lazy_graph: bool = ...,
+        layout_cache: Optional[LayoutCache] = ...,
+        graph_stats: Optional[GraphStats] = ...,
+        telemetry: Optional[TransitionRecorder] = ...,
         **kwargs: Any
     ) -> None: ...
 
     def get_graph(
-        self, title: Optional[str] = ..., roi_state: Optional[str] = ...
-    ) -> Dict[str, List[Dict[str, Any]]]: ...
-
-
-class LockedReactFlowMachine(ReactFlowMixin, LockedGraphMachine):
+        self,
+        title: Optional[str] = ...,
+        roi_state: Optional[Any] = ...,
+        format: str = ...,
+        layout: Optional[Union[str, Layout]] = ...,
+        radius: int = ...,
+        max_nodes: Optional[int] = ...,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        bundle_sources: Optional[int] = ...,
+        merge_parallel: bool = ...,
+    ) -> Any: ...
+
+
+class LockedReactFlowMachine(LockedReactFlowMixin, LockedGraphMachine):
     def __init__(
         self,
         model: Any = ...,
@@ -71,16 +167,30 @@ class LockedReactFlowMachine(ReactFlowMixin, LockedGraphMachine):
         title: str = ...,
         show_conditions: bool = ...,
         show_state_attributes: bool = ...,
+        lazy_graph: bool = ...,
+        layout_cache: Optional[LayoutCache] = ...,
+        graph_stats: Optional[GraphStats] = ...,
+        telemetry: Optional[TransitionRecorder] = ...,
         **kwargs: Any
     ) -> None: ...
 
     def get_graph(
-        self, title: Optional[str] = ..., roi_state: Optional[str] = ...
-    ) -> Dict[str, List[Dict[str, Any]]]: ...
+        self,
+        title: Optional[str] = ...,
+        roi_state: Optional[Any] = ...,
+        format: str = ...,
+        layout: Optional[Union[str, Layout]] = ...,
+        radius: int = ...,
+        max_nodes: Optional[int] = ...,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        bundle_sources: Optional[int] = ...,
+        merge_parallel: bool = ...,
+    ) -> Any: ...
 
 
 class LockedHierarchicalReactFlowMachine(
-    ReactFlowMixin, LockedHierarchicalGraphMachine
+    LockedReactFlowMixin, LockedHierarchicalGraphMachine
 ):
     def __init__(
         self,
@@ -93,15 +203,29 @@ class LockedHierarchicalReactFlowMachine(
         title: str = ...,
         show_conditions: bool = ...,
         show_state_attributes: bool = ...,
+        lazy_graph: bool = ...,
+        layout_cache: Optional[LayoutCache] = ...,
+        graph_stats: Optional[GraphStats] = ...,
+        telemetry: Optional[TransitionRecorder] = ...,
         **kwargs: Any
     ) -> None: ...
 
     def get_graph(
-        self, title: Optional[str] = ..., roi_state: Optional[str] = ...
-    ) -> Dict[str, List[Dict[str, Any]]]: ...
-
-
-class AsyncReactFlowMachine(ReactFlowMixin, AsyncGraphMachine):
+        self,
+        title: Optional[str] = ...,
+        roi_state: Optional[Any] = ...,
+        format: str = ...,
+        layout: Optional[Union[str, Layout]] = ...,
+        radius: int = ...,
+        max_nodes: Optional[int] = ...,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        bundle_sources: Optional[int] = ...,
+        merge_parallel: bool = ...,
+    ) -> Any: ...
+
+
+class AsyncReactFlowMachine(AsyncReactFlowMixin, AsyncGraphMachine):
     def __init__(
         self,
         model: Any = ...,
@@ -113,16 +237,30 @@ class AsyncReactFlowMachine(ReactFlowMixin, AsyncGraphMachine):
         title: str = ...,
         show_conditions: bool = ...,
         show_state_attributes: bool = ...,
+        lazy_graph: bool = ...,
+        layout_cache: Optional[LayoutCache] = ...,
+        graph_stats: Optional[GraphStats] = ...,
+        telemetry: Optional[TransitionRecorder] = ...,
         **kwargs: Any
     ) -> None: ...
 
     def get_graph(
-        self, title: Optional[str] = ..., roi_state: Optional[str] = ...
-    ) -> Dict[str, List[Dict[str, Any]]]: ...
+        self,
+        title: Optional[str] = ...,
+        roi_state: Optional[Any] = ...,
+        format: str = ...,
+        layout: Optional[Union[str, Layout]] = ...,
+        radius: int = ...,
+        max_nodes: Optional[int] = ...,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        bundle_sources: Optional[int] = ...,
+        merge_parallel: bool = ...,
+    ) -> Any: ...
 
 
 class HierarchicalAsyncReactFlowMachine(
-    ReactFlowMixin, HierarchicalAsyncGraphMachine
+    AsyncReactFlowMixin, HierarchicalAsyncGraphMachine
 ):
     def __init__(
         self,
@@ -135,30 +273,300 @@ class HierarchicalAsyncReactFlowMachine(
         title: str = ...,
         show_conditions: bool = ...,
         show_state_attributes: bool = ...,
+        lazy_graph: bool = ...,
+        layout_cache: Optional[LayoutCache] = ...,
+        graph_stats: Optional[GraphStats] = ...,
+        telemetry: Optional[TransitionRecorder] = ...,
         **kwargs: Any
     ) -> None: ...
 
     def get_graph(
-        self, title: Optional[str] = ..., roi_state: Optional[str] = ...
-    ) -> Dict[str, List[Dict[str, Any]]]: ...
+        self,
+        title: Optional[str] = ...,
+        roi_state: Optional[Any] = ...,
+        format: str = ...,
+        layout: Optional[Union[str, Layout]] = ...,
+        radius: int = ...,
+        max_nodes: Optional[int] = ...,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        bundle_sources: Optional[int] = ...,
+        merge_parallel: bool = ...,
+    ) -> Any: ...
+
+
+class NodeRecord(NamedTuple):
+    id: str
+    label: str
+    parent: Optional[str] = ...
+    collapsed: bool = ...
+
+    @classmethod
+    def create(
+        cls, name: str, label: Optional[str] = ..., parent: Optional[str] = ...
+    ) -> NodeRecord: ...
+
+    def to_dict(self) -> Dict[str, Any]: ...
+
+
+class EdgeRecord(NamedTuple):
+    id: str
+    source: str
+    target: str
+    label: str
+    triggers: Tuple[str, ...] = ...
+
+    @classmethod
+    def create(
+        cls, edge_id: str, source: str, target: str, label: str
+    ) -> EdgeRecord: ...
+
+    @staticmethod
+    def make_id(source: str, target: str, count: int = ...) -> str: ...
+
+    def id_count(self) -> Optional[int]: ...
+
+    def to_dict(self) -> Dict[str, Any]: ...
+
+
+class Layout(ABC):
+    incremental: bool
+
+    @property
+    def key(self) -> Optional[Tuple[Any, ...]]: ...
+
+    @abstractmethod
+    def compute(
+        self, nodes: Sequence[str], edges: Sequence[Tuple[str, str]]
+    ) -> Dict[str, Dict[str, Any]]: ...
+
+    def update(
+        self,
+        nodes: Sequence[str],
+        edges: Sequence[Tuple[str, str]],
+        previous: Dict[str, Dict[str, Any]],
+    ) -> Dict[str, Dict[str, Any]]: ...
+
+    def compute_nested(
+        self,
+        nodes: Sequence[str],
+        edges: Sequence[Tuple[str, str]],
+        parents: Mapping[str, str],
+    ) -> Dict[str, Dict[str, Any]]: ...
+
+
+class LayeredLayout(Layout):
+    direction: str
+    node_width: float
+    node_height: float
+    node_sep: float
+    rank_sep: float
+    sweeps: int
+    incremental: bool
+    group_padding: float
+
+    def __init__(
+        self,
+        direction: str = ...,
+        node_width: float = ...,
+        node_height: float = ...,
+        node_sep: float = ...,
+        rank_sep: float = ...,
+        sweeps: int = ...,
+        incremental: bool = ...,
+        group_padding: float = ...,
+    ) -> None: ...
+
+    @property
+    def key(self) -> Optional[Tuple[Any, ...]]: ...
+
+    def compute(
+        self, nodes: Sequence[str], edges: Sequence[Tuple[str, str]]
+    ) -> Dict[str, Dict[str, Any]]: ...
+
+    def update(
+        self,
+        nodes: Sequence[str],
+        edges: Sequence[Tuple[str, str]],
+        previous: Dict[str, Dict[str, Any]],
+    ) -> Dict[str, Dict[str, Any]]: ...
+
+    def compute_nested(
+        self,
+        nodes: Sequence[str],
+        edges: Sequence[Tuple[str, str]],
+        parents: Mapping[str, str],
+    ) -> Dict[str, Dict[str, Any]]: ...
+
+
+class LayoutCache:
+    max_size: int
+    directory: Optional[str]
+
+    def __init__(
+        self, max_size: int = ..., directory: Optional[str] = ...
+    ) -> None: ...
+
+    @staticmethod
+    def key(
+        layout: Layout,
+        nodes: Sequence[str],
+        edges: Sequence[Tuple[str, str]],
+        parents: Optional[Mapping[str, str]] = ...,
+    ) -> Optional[str]: ...
+
+    def get(self, key: str) -> Optional[Dict[str, Dict[str, Any]]]: ...
+
+    def put(self, key: str, value: Dict[str, Dict[str, Any]]) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class GraphStats:
+    callback: Optional[Callable[[str, float], None]]
+    timings: Dict[str, float]
+    calls: Dict[str, int]
+    counters: Dict[str, int]
+
+    def __init__(
+        self, callback: Optional[Callable[[str, float], None]] = ...
+    ) -> None: ...
+
+    def add_time(self, stage: str, seconds: float) -> None: ...
+
+    def count(self, name: str, value: int = ...) -> None: ...
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]: ...
+
+    def reset(self) -> None: ...
+
+
+class TransitionRecorder:
+    buckets: Tuple[float, ...]
+
+    def __init__(self, buckets: Sequence[float] = ...) -> None: ...
+
+    def record(self, source: str, target: str, trigger: str, seconds: float) -> None: ...
+
+    def get_histograms(self) -> Dict[Tuple[str, str, str], Dict[str, Any]]: ...
+
+    def to_overlay(self, edges: Iterable[EdgeRecord]) -> Dict[str, Any]: ...
+
+    def reset(self) -> None: ...
 
 
 class ReactFlowGraph:
-    machine: GraphMachine
+    machine: Optional[GraphMachine]
+    overlay_version: int
+    graph_stats: Optional[GraphStats]
+
+    def __init__(self, machine: Optional[GraphMachine]) -> None: ...
+
+    @classmethod
+    def from_definition(
+        cls,
+        states: Any,
+        transitions: Optional[List[Any]] = ...,
+        hierarchical: bool = ...,
+        separator: str = ...,
+    ) -> "ReactFlowGraph": ...
 
-    def __init__(self, machine: GraphMachine) -> None: ...
+    @property
+    def graph_version(self) -> int: ...
+
+    @property
+    def stats(self) -> Optional[GraphStats]: ...
+
+    def invalidate(self) -> None: ...
 
     def generate(self) -> None: ...
 
     def get_graph(
-        self, title: Optional[str] = ..., roi_state: Optional[str] = ...
-    ) -> Dict[str, List[Dict[str, Any]]]: ...
+        self,
+        title: Optional[str] = ...,
+        roi_state: Optional[Any] = ...,
+        format: str = ...,
+        layout: Optional[Union[str, Layout]] = ...,
+        radius: int = ...,
+        max_nodes: Optional[int] = ...,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        bundle_sources: Optional[int] = ...,
+        merge_parallel: bool = ...,
+    ) -> Any: ...
+
+    def get_children(
+        self,
+        state: Any,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        format: str = ...,
+    ) -> Any: ...
+
+    def get_bundled_edges(
+        self,
+        trigger: str,
+        target: Any,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        format: str = ...,
+    ) -> Any: ...
+
+    def get_parallel_edges(
+        self,
+        source: Any,
+        target: Any,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        bundle_sources: Optional[int] = ...,
+        format: str = ...,
+    ) -> Any: ...
+
+    def get_out_edges(self, state: Any) -> List[Dict[str, Any]]: ...
+
+    def get_in_edges(self, state: Any) -> List[Dict[str, Any]]: ...
+
+    def get_triggers(self, state: Any) -> List[str]: ...
 
-    def set_previous_transition(self, src: str, dst: str) -> None: ...
+    def get_reachable(
+        self, state: Any, max_distance: Optional[int] = ...
+    ) -> List[str]: ...
+
+    def can_reach(self, source: Any, target: Any) -> bool: ...
+
+    def diff(self, since_version: int) -> Dict[str, Any]: ...
+
+    def iter_json(self, chunk_size: int = ...) -> Iterator[str]: ...
+
+    def update_states(
+        self, names: Sequence[str], previous_version: int
+    ) -> None: ...
+
+    def update_trigger(self, trigger: str, previous_version: int) -> None: ...
+
+    def get_overlay(self, merge_parallel: bool = ...) -> Dict[str, Any]: ...
+
+    def expect_trigger(self, trigger: str) -> None: ...
+
+    def set_previous_transition(self, src: str, dst: Optional[str]) -> None: ...
+
+    def set_active_state(self, state: Any) -> None: ...
+
+    def mark_active_state(self, state: Any) -> None: ...
 
     def reset_styling(self) -> None: ...
 
     def set_node_style(self, state: Any, style: str) -> None: ...
 
 
+
+def generate_graphs(
+    machines: Union[Mapping[Any, Any], Sequence[Any]],
+    workers: Optional[int] = ...,
+    processes: bool = ...,
+    serialize: bool = ...,
+    **kwargs: Any,
+) -> Union[Dict[Any, Any], List[Any]]: ...
+
+
 __all__: List[str]
@@ -0,0 +1,108 @@
+"""Graph generation for many machines in parallel."""
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .diagrams_reactflow import ReactFlowGraph
+from .machine import ReactFlowMixin, _to_json
+
+# Picklable description of one graph: kind ('elements' or 'definition'), states,
+# transitions, hierarchical, separator, serialize and the options of get_graph
+_Job = Tuple[str, List[Any], List[Any], bool, str, bool, Dict[str, Any]]
+
+
+def generate_graphs(machines: Union[Mapping[Any, Any], Sequence[Any]], workers: Optional[int] = None,
+                    processes: bool = True, serialize: bool = False,
+                    **kwargs: Any) -> Union[Dict[Any, Any], List[Any]]:
+    """
+    Generate the graphs of many machines in parallel.
+
+    Machines are read in the calling process, and only their states and
+    transitions are sent to the workers, as plain lists and dictionaries that
+    can be pickled. The workers build, lay out and optionally serialize the
+    graphs without creating machines, see ReactFlowGraph.from_definition.
+    Graphs contain the nodes and edges of the machines, but no style overlay.
+
+    Args:
+        machines: Mapping or sequence of React Flow machines or machine
+                  definitions. Definitions are dictionaries with 'states',
+                  'transitions', 'hierarchical' and 'separator' keys like the
+                  arguments of ReactFlowGraph.from_definition; other keys such
+                  as 'initial' are ignored.
+        workers: Maximum number of workers, None for the executor's default.
+                 With 1 worker, the graphs are generated in the calling thread.
+        processes: Whether the graphs are generated in a process pool rather
+                   than a thread pool
+        serialize: Whether the graphs should be returned as JSON strings, only
+                   supported for the 'react-flow' and 'columnar' formats
+        **kwargs: Options passed to ReactFlowGraph.get_graph, e.g. 'format',
+                  'layout' or 'max_depth'
+
+    Returns:
+        The graphs in the order of a sequence, or keyed like a mapping
+
+    Raises:
+        ValueError: If a machine does not use the 'react-flow' graph engine or
+                    its definition is invalid, workers is less than 1,
+                    serialize is requested for a binary format or a graph
+                    cannot be generated
+    """
+    if workers is not None and workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    if serialize and kwargs.get("format", "react-flow") not in ("react-flow", "columnar"):
+        raise ValueError(f"The {kwargs['format']!r} format cannot be serialized to JSON")
+    kwargs.pop("title", None)
+
+    keys = list(machines) if isinstance(machines, Mapping) else None
+    entries = [machines[key] for key in keys] if keys is not None else list(machines)
+    jobs = [_create_job(entry, serialize, kwargs) for entry in entries]
+
+    if workers == 1 or len(jobs) <= 1:
+        results = [_render(job) for job in jobs]
+    else:
+        executor: Executor
+        if processes:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers)
+        with executor:
+            # Sending several jobs at once reduces the overhead of many small machines
+            chunksize = max(1, len(jobs) // (4 * (workers or 4)))
+            results = list(executor.map(_render, jobs, chunksize=chunksize))
+
+    return results if keys is None else dict(zip(keys, results))
+
+
+def _create_job(entry: Any, serialize: bool, options: Dict[str, Any]) -> _Job:
+    """Convert a machine or machine definition to a picklable job."""
+    if isinstance(entry, Mapping):
+        if "states" not in entry:
+            raise ValueError("Machine definitions require 'states'")
+        return ("definition", entry["states"], entry.get("transitions") or [], entry.get("hierarchical", False),
+                entry.get("separator", "_"), serialize, options)
+    if not isinstance(entry, ReactFlowMixin) or not entry._uses_react_flow_graphs():
+        raise ValueError(f"Cannot generate a React Flow graph for {entry!r}")
+
+    graph = entry._get_model_graph(entry.models[0])  # type: ignore
+    if graph._uses_snapshots():
+        states, transitions = entry._locked_method(graph._snapshot_elements)  # type: ignore
+    else:
+        states, transitions = graph._snapshot_elements()
+    options = dict(options)
+    # Nested names of Enums and parent states are resolved by the machine
+    for key in ("roi_state", "collapsed"):
+        if options.get(key) is not None:
+            options[key] = list(graph._get_node_names(options[key]))
+    separator = graph._get_separator() if graph._is_nested() else "_"
+    return ("elements", states, transitions, graph._is_nested(), separator, serialize, options)
+
+
+def _render(job: _Job) -> Any:
+    """Build and render the graph of a job, in a worker."""
+    kind, states, transitions, hierarchical, separator, serialize, options = job
+    if kind == "definition":
+        graph = ReactFlowGraph.from_definition(states, transitions, hierarchical, separator)
+    else:
+        graph = ReactFlowGraph._from_elements(states, transitions, hierarchical, separator)
+    result = graph.get_graph(**options)
+    return _to_json(result) if serialize else result
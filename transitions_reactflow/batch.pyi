@@ -0,0 +1,20 @@
+"""Type stubs for parallel graph generation."""
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+_Job = Tuple[str, List[Any], List[Any], bool, str, bool, Dict[str, Any]]
+
+
+def generate_graphs(
+    machines: Union[Mapping[Any, Any], Sequence[Any]],
+    workers: Optional[int] = ...,
+    processes: bool = ...,
+    serialize: bool = ...,
+    **kwargs: Any,
+) -> Union[Dict[Any, Any], List[Any]]: ...
+
+
+def _create_job(entry: Any, serialize: bool, options: Dict[str, Any]) -> _Job: ...
+
+
+def _render(job: _Job) -> Any: ...
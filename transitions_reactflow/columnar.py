@@ -0,0 +1,216 @@
+"""Columnar and binary encodings of React Flow graphs."""
+
+import struct
+from array import array
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .topology import EdgeRecord, NodeRecord
+
+# Version of the columnar layout, stored in both encodings
+COLUMNAR_VERSION = 3
+# Magic bytes at the start of every binary payload
+BINARY_MAGIC = b"RFG\x03"
+
+# magic, string count, node count, edge count, string table size
+_HEADER = struct.Struct("<4sIIII")
+# Node and edge columns in the order they are packed
+_NODE_COLUMNS = ("id", "label", "parent", "collapsed")
+_EDGE_COLUMNS = ("source", "target", "label", "index", "count")
+
+
+def to_columns(nodes: Iterable[NodeRecord], edges: Iterable[EdgeRecord]) -> Dict[str, Any]:
+    """
+    Encode node and edge records as a string table plus integer columns.
+
+    Every string (state names, labels and trigger names) is stored once in
+    'strings' and referenced by index. Parents are stored as index plus one,
+    so 0 marks top level states. Edge IDs are not stored; they follow the
+    EdgeRecord.make_id scheme and only the trailing counter is kept. The
+    triggers of merged edges are concatenated in the 'triggers' column, with
+    their number per edge in 'count' (0 for single edges).
+
+    Args:
+        nodes: Node records in output order
+        edges: Edge records in output order
+
+    Returns:
+        JSON serializable dictionary with 'version', 'strings', and 'nodes'
+        ('id', 'label', 'parent', 'collapsed') and 'edges' ('source', 'target',
+        'label', 'index', 'count', 'triggers') mappings of column name to list
+        of integers
+
+    Raises:
+        ValueError: If an edge ID does not follow the ReactFlowGraph scheme
+    """
+    strings: List[str] = []
+    lookup: Dict[str, int] = {}
+
+    def index(value: str) -> int:
+        position = lookup.get(value)
+        if position is None:
+            position = lookup[value] = len(strings)
+            strings.append(value)
+        return position
+
+    node_columns: Dict[str, List[int]] = {"id": [], "label": [], "parent": [], "collapsed": []}
+    for node in nodes:
+        node_columns["id"].append(index(node.id))
+        node_columns["label"].append(index(node.label))
+        node_columns["parent"].append(0 if node.parent is None else index(node.parent) + 1)
+        node_columns["collapsed"].append(int(node.collapsed))
+
+    edge_columns: Dict[str, List[int]] = {
+        "source": [], "target": [], "label": [], "index": [], "count": [], "triggers": []}
+    for edge in edges:
+        edge_columns["source"].append(index(edge.source))
+        edge_columns["target"].append(index(edge.target))
+        edge_columns["label"].append(index(edge.label))
+        edge_columns["index"].append(_edge_index(edge))
+        edge_columns["count"].append(len(edge.triggers))
+        edge_columns["triggers"].extend(index(trigger) for trigger in edge.triggers)
+
+    return {"version": COLUMNAR_VERSION, "strings": strings, "nodes": node_columns, "edges": edge_columns}
+
+
+def from_columns(columns: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Rebuild the React Flow graph from its columnar encoding.
+
+    Args:
+        columns: Dictionary as returned by to_columns
+
+    Returns:
+        Dictionary with 'nodes' and 'edges' keys as returned by ReactFlowGraph.get_graph
+
+    Raises:
+        ValueError: If the columnar data has an unsupported version or is malformed
+    """
+    if columns.get("version") != COLUMNAR_VERSION:
+        raise ValueError(f"Unsupported columnar graph version {columns.get('version')!r}")
+    try:
+        strings = columns["strings"]
+        node_columns, edge_columns = columns["nodes"], columns["edges"]
+        nodes = [
+            NodeRecord(
+                strings[name], strings[label], strings[parent - 1] if parent else None, bool(collapsed)
+            ).to_dict()
+            for name, label, parent, collapsed in zip(
+                node_columns["id"], node_columns["label"], node_columns["parent"], node_columns["collapsed"])
+        ]
+        edges = []
+        triggers = iter(edge_columns["triggers"])
+        for source, target, label, position, count in zip(*(edge_columns[key] for key in _EDGE_COLUMNS)):
+            source, target = strings[source], strings[target]
+            edges.append(EdgeRecord(
+                EdgeRecord.make_id(source, target, position),
+                source,
+                target,
+                strings[label],
+                tuple(strings[next(triggers)] for _ in range(count))
+            ).to_dict())
+    except (KeyError, IndexError, TypeError, RuntimeError) as e:
+        raise ValueError(f"Malformed columnar graph: {str(e)}") from e
+    return {"nodes": nodes, "edges": edges}
+
+
+def pack(nodes: Iterable[NodeRecord], edges: Iterable[EdgeRecord]) -> bytes:
+    """
+    Encode node and edge records in the binary columnar format.
+
+    The payload starts with a little-endian header (magic bytes, string count,
+    node count, edge count and string table size), followed by the UTF-8 byte
+    lengths of all strings, the concatenated strings and the node and edge
+    columns as unsigned 32 bit integers in the order of to_columns. The
+    length of the 'triggers' column is the sum of the 'count' column.
+
+    Args:
+        nodes: Node records in output order
+        edges: Edge records in output order
+
+    Returns:
+        The binary payload
+
+    Raises:
+        ValueError: If an edge ID does not follow the ReactFlowGraph scheme
+    """
+    columns = to_columns(nodes, edges)
+    encoded = [value.encode("utf-8") for value in columns["strings"]]
+    table = b"".join(encoded)
+    node_columns, edge_columns = columns["nodes"], columns["edges"]
+
+    parts = [
+        _HEADER.pack(BINARY_MAGIC, len(encoded), len(node_columns["id"]), len(edge_columns["source"]), len(table)),
+        _pack_ints(len(value) for value in encoded),
+        table,
+    ]
+    parts.extend(_pack_ints(node_columns[key]) for key in _NODE_COLUMNS)
+    parts.extend(_pack_ints(edge_columns[key]) for key in _EDGE_COLUMNS + ("triggers",))
+    return b"".join(parts)
+
+
+def unpack(data: bytes) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Rebuild the React Flow graph from a binary payload.
+
+    Args:
+        data: Payload as returned by pack
+
+    Returns:
+        Dictionary with 'nodes' and 'edges' keys as returned by ReactFlowGraph.get_graph
+
+    Raises:
+        ValueError: If the payload is not a supported binary graph or is truncated
+    """
+    try:
+        magic, string_count, node_count, edge_count, table_size = _HEADER.unpack_from(data)
+    except struct.error as e:
+        raise ValueError(f"Malformed binary graph: {str(e)}") from e
+    if magic != BINARY_MAGIC:
+        raise ValueError("Data is not a binary React Flow graph")
+
+    offset = _HEADER.size
+    lengths, offset = _unpack_ints(data, offset, string_count)
+    table = data[offset:offset + table_size]
+    if len(table) != table_size:
+        raise ValueError("Malformed binary graph: truncated string table")
+    offset += table_size
+
+    strings = []
+    position = 0
+    for length in lengths:
+        strings.append(table[position:position + length].decode("utf-8"))
+        position += length
+
+    columns: Dict[str, Any] = {"version": COLUMNAR_VERSION, "strings": strings, "nodes": {}, "edges": {}}
+    for key in _NODE_COLUMNS:
+        columns["nodes"][key], offset = _unpack_ints(data, offset, node_count)
+    for key in _EDGE_COLUMNS:
+        columns["edges"][key], offset = _unpack_ints(data, offset, edge_count)
+    columns["edges"]["triggers"], offset = _unpack_ints(data, offset, sum(columns["edges"]["count"]))
+    return from_columns(columns)
+
+
+def _edge_index(edge: EdgeRecord) -> int:
+    """Return the counter of an edge ID, 0 for the first edge between two states."""
+    count = edge.id_count()
+    if count is None:
+        raise ValueError(f"Edge ID {edge.id!r} cannot be encoded")
+    return count
+
+
+def _pack_ints(values: Iterable[int]) -> bytes:
+    """Pack integers as little-endian unsigned 32 bit values."""
+    packed = array("I", values)
+    if packed.itemsize != 4:
+        return struct.pack(f"<{len(packed)}I", *packed)
+    if struct.pack("=I", 1) != struct.pack("<I", 1):
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack_ints(data: bytes, offset: int, count: int) -> Tuple[List[int], int]:
+    """Unpack a column of little-endian unsigned 32 bit values."""
+    end = offset + 4 * count
+    if end > len(data):
+        raise ValueError("Malformed binary graph: truncated column")
+    return list(struct.unpack_from(f"<{count}I", data, offset)), end
@@ -0,0 +1,33 @@
+"""Type stubs for the columnar graph encodings."""
+
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .topology import EdgeRecord, NodeRecord
+
+COLUMNAR_VERSION: int
+BINARY_MAGIC: bytes
+
+
+def to_columns(
+    nodes: Iterable[NodeRecord], edges: Iterable[EdgeRecord]
+) -> Dict[str, Any]: ...
+
+
+def from_columns(columns: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]: ...
+
+
+def pack(nodes: Iterable[NodeRecord], edges: Iterable[EdgeRecord]) -> bytes: ...
+
+
+def unpack(data: bytes) -> Dict[str, List[Dict[str, Any]]]: ...
+
+
+def _edge_index(edge: EdgeRecord) -> int: ...
+
+
+def _pack_ints(values: Iterable[int]) -> bytes: ...
+
+
+def _unpack_ints(
+    data: bytes, offset: int, count: int
+) -> Tuple[List[int], int]: ...
@@ -0,0 +1,148 @@
+"""Conversion of machine definitions to graph elements without creating a machine."""
+
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+from transitions.core import listify
+
+# Wildcards of transitions.Machine for all states and the source state
+WILDCARD_ALL = "*"
+WILDCARD_SAME = "="
+
+
+def to_elements(states: Any, transitions: Optional[List[Any]] = None, hierarchical: bool = False,
+                separator: str = "_") -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Convert the states and transitions passed to a machine to graph elements.
+
+    The result equals what ReactFlowGraph._read_elements returns for a machine
+    created from the same definition: transitions are grouped by trigger and
+    source like the machine's events, '*' sources are expanded, '=' targets
+    are resolved, nested transitions are prefixed with the path of their
+    state and nested states with an initial state get an initial transition
+    with an empty trigger. Auto transitions are not part of the result.
+
+    Args:
+        states: States as passed to a machine: names, Enums, dictionaries with
+                'name' and, for hierarchical machines, 'children' (or 'states'),
+                'initial' and 'transitions', or lists of them
+        transitions: Transitions as passed to a machine, as dictionaries or lists
+        hierarchical: Whether the states are nested like in a HierarchicalMachine
+        separator: Separator of nested state names
+
+    Returns:
+        Top level state definitions with nested 'children' and flattened
+        transition definitions
+
+    Raises:
+        ValueError: If a state or transition cannot be converted
+    """
+    top_level = [_convert_state(state, hierarchical) for state in listify(states)]
+    elements: List[Dict[str, Any]] = []
+    queue = [([], top_level, transitions or [])]
+
+    while queue:
+        prefix, scope, scope_transitions = queue.pop(0)
+        for transition in _order_transitions(scope, scope_transitions, separator):
+            if prefix:
+                transition["source"] = separator.join(prefix + [transition["source"]])
+                if "dest" in transition:
+                    transition["dest"] = separator.join(prefix + [transition["dest"]])
+            elements.append(transition)
+        for state in scope:
+            initial = state.pop("initial", None)
+            path = prefix + [state["name"]]
+            if initial is not None:
+                elements.append({
+                    "trigger": "",
+                    "source": separator.join(path),
+                    "dest": separator.join(path + [initial]),
+                })
+            if state.get("children"):
+                queue.append((path, state["children"], state.pop("transitions")))
+            else:
+                state.pop("transitions", None)
+    return top_level, elements
+
+
+def _convert_state(state: Any, hierarchical: bool) -> Dict[str, Any]:
+    """Convert a state definition to a dictionary with 'name', 'label', 'children', 'initial' and 'transitions'."""
+    if isinstance(state, str):
+        return {"name": state}
+    if isinstance(state, Enum):
+        return {"name": state.name}
+    if not isinstance(state, dict) or "name" not in state:
+        raise ValueError(f"Cannot convert state {state!r}")
+
+    name = state["name"]
+    result: Dict[str, Any] = {"name": name.name if isinstance(name, Enum) else name}
+    label = state.get("label")
+    if label and isinstance(label, str):
+        result["label"] = label
+    # A list of parallel states is short for children that are all initial
+    children = state.get("parallel") or state.get("children", state.get("states"))
+    if children:
+        if not hierarchical:
+            raise ValueError(f"State {result['name']!r} has nested states, which require hierarchical=True")
+        result["children"] = [_convert_state(child, hierarchical) for child in listify(children)]
+        initial = None if state.get("parallel") else state.get("initial")
+        # Parallel states have a list of initial states and no initial transition
+        if initial is not None and not isinstance(initial, list):
+            result["initial"] = initial.name if isinstance(initial, Enum) else initial
+        result["transitions"] = state.get("transitions", [])
+    return result
+
+
+def _order_transitions(scope: List[Dict[str, Any]], transitions: List[Any],
+                       separator: str) -> List[Dict[str, str]]:
+    """
+    Expand the transitions of a scope and order them like the events of a machine.
+
+    Events are kept in the order their trigger was first used, and the
+    transitions of an event are grouped by source in the order the source was
+    first used.
+    """
+    events: Dict[str, Dict[str, List[Dict[str, str]]]] = {}
+    for transition in transitions:
+        if isinstance(transition, dict):
+            trigger, source, dest = transition.get("trigger"), transition.get("source"), transition.get("dest")
+        elif isinstance(transition, (list, tuple)) and len(transition) >= 3:
+            trigger, source, dest = transition[:3]
+        else:
+            raise ValueError(f"Cannot convert transition {transition!r}")
+
+        if source == WILDCARD_ALL:
+            # Hierarchical machines expand reflexive wildcards to all nested states
+            sources = _nested_names(scope, separator) if dest == WILDCARD_SAME else [state["name"] for state in scope]
+        else:
+            sources = [_name(name) for name in listify(source)]
+        sources_of_event = events.setdefault(trigger, {})
+        for name in sources:
+            definition = {"trigger": trigger, "source": name}
+            target = name if dest == WILDCARD_SAME else dest
+            # Internal transitions have no 'dest', like in the markup
+            if target:
+                definition["dest"] = _name(target)
+            sources_of_event.setdefault(name, []).append(definition)
+
+    return [
+        definition
+        for sources_of_event in events.values()
+        for definitions in sources_of_event.values()
+        for definition in definitions
+    ]
+
+
+def _nested_names(scope: List[Dict[str, Any]], separator: str, prefix: str = "") -> List[str]:
+    """Return the names of the states of a scope and all nested states, depth-first."""
+    names = []
+    for state in scope:
+        name = prefix + state["name"]
+        names.append(name)
+        names.extend(_nested_names(state.get("children", []), separator, name + separator))
+    return names
+
+
+def _name(state: Any) -> str:
+    """Return the name of a state given by name or Enum."""
+    return state.name if isinstance(state, Enum) else state
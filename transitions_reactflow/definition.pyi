@@ -0,0 +1,30 @@
+"""Type stubs for the conversion of machine definitions."""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+WILDCARD_ALL: str
+WILDCARD_SAME: str
+
+
+def to_elements(
+    states: Any,
+    transitions: Optional[List[Any]] = ...,
+    hierarchical: bool = ...,
+    separator: str = ...,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: ...
+
+
+def _convert_state(state: Any, hierarchical: bool) -> Dict[str, Any]: ...
+
+
+def _order_transitions(
+    scope: List[Dict[str, Any]], transitions: List[Any], separator: str
+) -> List[Dict[str, str]]: ...
+
+
+def _nested_names(
+    scope: List[Dict[str, Any]], separator: str, prefix: str = ...
+) -> List[str]: ...
+
+
+def _name(state: Any) -> str: ...
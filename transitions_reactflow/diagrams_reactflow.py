@@ -1,7 +1,19 @@
 """React Flow graph generation for pytransitions state machines."""
 
-from typing import Dict, List, Any, Optional, Set
+import json
+from time import perf_counter
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Set, Tuple, Union
+from transitions.core import listify
 from transitions.extensions.diagrams_base import BaseGraph
+from transitions.extensions.nesting import NestedTransition
+
+from . import columnar, definition
+from .layout import Layout, LayoutCache, resolve_layout
+from .stats import GraphStats
+from .topology import EdgeRecord, GraphTopology, NodeRecord
+
+# Output formats supported by ReactFlowGraph.get_graph
+GRAPH_FORMATS = ("react-flow", "compact", "columnar", "binary")
 
 
 class ReactFlowGraph(BaseGraph):
@@ -10,8 +22,121 @@ class ReactFlowGraph(BaseGraph):
 
     Generates graph data in React Flow format with nodes and edges
     that can be directly consumed by React Flow visualization library.
+
+    Generated graphs are cached and only rebuilt when the topology fingerprint
+    of the machine changes, so repeated calls to get_graph are cheap. For flat
+    machines, added states and added or removed transitions are applied to the
+    cached node/edge index as deltas instead of triggering a full rebuild.
+
+    Nested states of hierarchical machines are emitted as child nodes that
+    reference their parent with 'parentNode'. Views can hide nested states
+    below a depth or in given states, and the children of a collapsed state
+    can be fetched on demand with get_children.
+
+    The node/edge index is shared by the graphs of all models of a machine, so
+    every graph instance only holds its model's small style overlay. The current
+    and previous state are tracked in that overlay, which is updated in constant
+    time on every transition and can be fetched with get_overlay without
+    regenerating the graph.
+
+    Graphs of machine definitions can be built with from_definition without
+    creating a machine. The stages of the pipeline are timed and counted in
+    the machine's graph_stats, if it has one.
     """
 
+    def __init__(self, machine: Any) -> None:
+        """
+        Initialize the graph engine.
+
+        Args:
+            machine: The GraphMachine this graph belongs to
+        """
+        self._node_styles: Dict[str, str] = {}
+        self._previous_transition: Optional[Tuple[str, str, Optional[str]]] = None
+        self._next_trigger: Optional[str] = None
+        self.overlay_version = 0
+        self._hierarchical = False
+        self._separator = "_"
+        super().__init__(machine)
+
+    @classmethod
+    def from_definition(cls, states: Any, transitions: Optional[List[Any]] = None,
+                        hierarchical: bool = False, separator: str = "_") -> "ReactFlowGraph":
+        """
+        Build the graph of a machine definition without creating the machine.
+
+        The graph has the same nodes and edges as the graph of a machine created
+        with the same states and transitions, but skips creating states, events
+        and callbacks and reading them back through the markup. It has no
+        machine, so it only provides graph data and queries, not styling.
+
+        Args:
+            states: States as passed to a machine, including nested 'children'
+                    of hierarchical machines
+            transitions: Transitions as passed to a machine, as dictionaries or lists
+            hierarchical: Whether the states are nested like in a HierarchicalMachine
+            separator: Separator of nested state names
+
+        Returns:
+            Graph with an up to date node/edge index
+
+        Raises:
+            ValueError: If a state or transition cannot be converted
+        """
+        states, transitions = definition.to_elements(states, transitions, hierarchical, separator)
+        return cls._from_elements(states, transitions, hierarchical, separator)
+
+    @classmethod
+    def _from_elements(cls, states: List[Dict[str, Any]], transitions: List[Dict[str, Any]],
+                       hierarchical: bool = False, separator: str = "_") -> "ReactFlowGraph":
+        """
+        Build a graph without machine from state and transition definitions as returned by _read_elements.
+
+        Raises:
+            ValueError: If graph data is malformed or missing required fields
+        """
+        graph = cls(None)
+        graph._hierarchical = hierarchical
+        graph._separator = separator
+        graph._install_topology(graph._build_topology(graph._topology_fingerprint(), states, transitions))
+        return graph
+
+    @property
+    def graph_version(self) -> int:
+        """
+        Topology version of the associated machine.
+
+        The version increases whenever states or transitions are added or
+        transitions are removed and can be used by clients as an ETag for graph data.
+        """
+        return getattr(self.machine, 'graph_version', 0)
+
+    @property
+    def _topology(self) -> Optional[GraphTopology]:
+        """Node/edge index shared by all graphs of the machine."""
+        return getattr(self._topology_owner, '_graph_topology', None)
+
+    @_topology.setter
+    def _topology(self, topology: Optional[GraphTopology]) -> None:
+        setattr(self._topology_owner, '_graph_topology', topology)
+
+    @property
+    def _topology_owner(self) -> Any:
+        """Object the shared index is stored on, the graph itself if there is no machine."""
+        return self if self.machine is None else self.machine
+
+    @property
+    def stats(self) -> Optional[GraphStats]:
+        """GraphStats recording the pipeline, the graph_stats of the machine or of the graph if there is no machine."""
+        machine = self.machine
+        return getattr(self if machine is None else machine, 'graph_stats', None)
+
+    def invalidate(self) -> None:
+        """Force the shared node/edge index to be rebuilt on its next use."""
+        topology = self._topology
+        if topology is not None:
+            topology.fingerprint = (topology.version, None)
+
     def generate(self) -> None:
         """
         Required by BaseGraph interface.
@@ -19,43 +144,938 @@ class ReactFlowGraph(BaseGraph):
         """
         pass
 
-    def get_graph(self, title: Optional[str] = None, roi_state: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    def get_graph(self, title: Optional[str] = None, roi_state: Optional[Any] = None,
+                  format: str = "react-flow", layout: Optional[Union[str, Layout]] = None,
+                  radius: int = 1, max_nodes: Optional[int] = None,
+                  max_depth: Optional[int] = None, collapsed: Optional[Any] = None,
+                  bundle_sources: Optional[int] = None, merge_parallel: bool = False) -> Any:
         """
         Generate React Flow compatible graph data.
 
         Args:
             title: Optional graph title (not used in React Flow output)
-            roi_state: Optional region of interest state (not implemented)
+            roi_state: Optional region of interest state(s). If given, only states
+                       within radius edges of it are included, in either direction.
+                       Nested states that are not nodes are represented by their parent.
+            format: 'react-flow' (default) for React Flow node and edge dictionaries,
+                    'compact' for NodeRecord/EdgeRecord tuples that are not
+                    converted to dictionaries at all, 'columnar' for a string table
+                    with integer columns (see columnar.to_columns) or 'binary' for
+                    the struct-packed columnar payload (see columnar.pack)
+            layout: Name of a layout ('layered') or a Layout instance used to
+                    compute node positions, only supported for the 'react-flow'
+                    format. By default, all nodes are placed at (0, 0).
+            radius: Maximum distance of included states from roi_state (default 1)
+            max_nodes: Maximum number of nodes included for roi_state, None for no limit
+            max_depth: Deepest nesting level of nested states that is shown, 0 for
+                       top level states only. Deeper states are hidden in their
+                       ancestor and their transitions are rolled up to it.
+            collapsed: State(s) whose nested states are hidden like those below max_depth
+            bundle_sources: If given, the edges of a trigger into one state from at
+                            least this many states, e.g. of transitions with source
+                            '*', are replaced by one edge from a virtual source node.
+                            The bundled edges can be fetched with get_bundled_edges.
+            merge_parallel: Whether edges between the same source and target are
+                            merged into one edge listing their triggers. The merged
+                            edges can be fetched with get_parallel_edges.
+
+        Returns:
+            Dictionary with 'nodes' and 'edges' keys containing React Flow compatible data,
+            or the columnar dictionary or bytes for the columnar formats.
+            Every call returns new containers, while the underlying
+            conversions are cached on the machine's index. Edge IDs are kept across deltas and rebuilds of the machine's
+            index. After transitions were removed, they can therefore differ
+            from the IDs of a new graph of the same machine, and nodes added
+            by deltas follow the existing nodes instead of the state order.
+
+        Raises:
+            ValueError: If graph data is malformed or missing required fields,
+                        or if the format, layout, radius, max_nodes, max_depth or
+                        bundle_sources is invalid or roi_state is combined with a
+                        collapsed view
+        """
+        layout = self._validate_options(
+            format=format, layout=layout, roi_state=roi_state, radius=radius, max_nodes=max_nodes,
+            max_depth=max_depth, collapsed=collapsed, bundle_sources=bundle_sources
+        )
+        stats = self.stats
+        if stats is None:
+            return _copy_output(format, self._render_view(
+                self._get_topology(), None, roi_state=roi_state, format=format, layout=layout, radius=radius,
+                max_nodes=max_nodes, max_depth=max_depth, collapsed=collapsed, bundle_sources=bundle_sources,
+                merge_parallel=merge_parallel
+            ))
+
+        start = perf_counter()
+        topology = self._topology
+        stats.count("index_hits" if topology is not None and topology.fingerprint == self._topology_fingerprint()
+                    else "index_misses")
+        result = self._render_graph(
+            self._get_topology(), roi_state=roi_state, format=format, layout=layout, radius=radius,
+            max_nodes=max_nodes, max_depth=max_depth, collapsed=collapsed, bundle_sources=bundle_sources,
+            merge_parallel=merge_parallel
+        )
+        result = _copy_output(format, result)
+        stats.add_time("get_graph", perf_counter() - start)
+        return result
+
+    def _render_graph(self, topology: GraphTopology, **kwargs: Any) -> Any:
+        """
+        Render graph data from a given node/edge index.
+
+        The options are those of get_graph, checked by _validate_options. Only the index is used and the
+        machine is not read, except to resolve Enums in roi_state and
+        collapsed, so an index can be rendered outside of the thread that runs
+        the machine.
+
+        Args:
+            topology: Node/edge index to render
+            **kwargs: Options of get_graph except title
+
+        Returns:
+            Graph data as returned by get_graph
+
+        Raises:
+            ValueError: If the layout fails
+        """
+        stats = self.stats
+        if stats is None:
+            return self._render_view(topology, None, **kwargs)
+        start = perf_counter()
+        result = self._render_view(topology, stats, **kwargs)
+        stats.add_time("render", perf_counter() - start)
+        return result
+
+    def _render_view(self, topology: GraphTopology, stats: Optional[GraphStats], roi_state: Optional[Any] = None,
+                     format: str = "react-flow", layout: Optional[Layout] = None,
+                     radius: int = 1, max_nodes: Optional[int] = None,
+                     max_depth: Optional[int] = None, collapsed: Optional[Any] = None,
+                     bundle_sources: Optional[int] = None, merge_parallel: bool = False) -> Any:
+        """Render graph data from a node/edge index like _render_graph, counting cache hits in stats."""
+        view = max_depth is not None or collapsed is not None
+
+        records = None
+        if roi_state is not None:
+            records = self._get_region(topology, roi_state, radius, max_nodes)
+        elif view:
+            records = topology.collapse(max_depth, self._get_collapsed_names(collapsed))
+        elif bundle_sources is not None or merge_parallel:
+            key = f"bundle:{bundle_sources}:{merge_parallel}"
+            _count_output(stats, topology, key)
+            bundled = topology.cached(
+                key, lambda: self._bundle(topology, topology.get_records(), bundle_sources, merge_parallel))
+            if layout is not None:
+                return self._format_records(topology, bundled, format, layout)
+            _count_output(stats, topology, f"{key}:{format}")
+            return topology.cached(f"{key}:{format}", lambda: self._format_records(topology, bundled, format, None))
+
+        if records is not None:
+            records = self._bundle(topology, records, bundle_sources, merge_parallel)
+            return self._format_records(topology, records, format, layout)
+
+        if layout is not None:
+            return self._get_layouted_graph(topology, layout)
+        if format == "compact":
+            return topology.get_records()
+        if format in ("columnar", "binary"):
+            _count_output(stats, topology, format)
+            return topology.cached(format, lambda: self._encode(format, topology.get_records()))
+        _count_output(stats, topology, "react-flow")
+        return topology.get_graph()
+
+    @staticmethod
+    def _validate_options(format: str = "react-flow", layout: Optional[Union[str, Layout]] = None,
+                          roi_state: Optional[Any] = None, radius: int = 1, max_nodes: Optional[int] = None,
+                          max_depth: Optional[int] = None, collapsed: Optional[Any] = None,
+                          bundle_sources: Optional[int] = None) -> Optional[Layout]:
+        """
+        Check the options of get_graph and the views derived from it.
+
+        Every public entry point calls this once before rendering anything.
+
+        Args:
+            format: Output format, see get_graph
+            layout: Name of a layout or a Layout instance
+            roi_state: Region of interest state(s)
+            radius: Maximum distance of included states from roi_state
+            max_nodes: Maximum number of nodes included for roi_state
+            max_depth: Deepest nesting level of nested states that is shown
+            collapsed: State(s) whose nested states are hidden
+            bundle_sources: Minimum number of sources of bundled edges
+
+        Returns:
+            The Layout instance of the layout, None without a layout
+
+        Raises:
+            ValueError: If the format, layout, radius, max_nodes, max_depth or
+                        bundle_sources is invalid or roi_state is combined with
+                        a collapsed view
+        """
+        if format not in GRAPH_FORMATS:
+            raise ValueError(f"Unknown graph format {format!r}, expected one of {GRAPH_FORMATS}")
+        if layout is not None and format != "react-flow":
+            raise ValueError(f"Layouts are not supported for the {format!r} format")
+        if max_depth is not None and max_depth < 0:
+            raise ValueError("max_depth must not be negative")
+        if bundle_sources is not None and bundle_sources < 2:
+            raise ValueError("bundle_sources must be at least 2")
+        if roi_state is not None:
+            if max_depth is not None or collapsed is not None:
+                raise ValueError("roi_state cannot be combined with max_depth or collapsed")
+            if radius < 0 or (max_nodes is not None and max_nodes < 1):
+                raise ValueError("radius must not be negative and max_nodes must be positive")
+        return None if layout is None else resolve_layout(layout)
+
+    def _get_region(self, topology: GraphTopology, roi_state: Any, radius: int,
+                    max_nodes: Optional[int]) -> Dict[str, List[Any]]:
+        """
+        Return the neighbourhood of the region of interest.
+
+        The region is extracted with a breadth-first search over the adjacency
+        index, so its cost depends on the size of the region rather than the
+        whole graph.
+
+        Args:
+            topology: Current node/edge index
+            roi_state: Region of interest state(s)
+            radius: Maximum distance of included states from roi_state
+            max_nodes: Maximum number of included nodes, None for no limit
+
+        Returns:
+            Dictionary with 'nodes' and 'edges' record lists of the region
+        """
+        roots = []
+        for name in self._get_node_names(roi_state):
+            # Fall back to the closest ancestor that is a node
+            while not topology.has_node(name) and self._is_nested() and self._get_separator() in name:
+                name = name.rsplit(self._get_separator(), 1)[0]
+            roots.append(name)
+
+        return topology.subgraph(roots, radius, max_nodes)
+
+    def get_children(self, state: Any, max_depth: Optional[int] = None, collapsed: Optional[Any] = None,
+                     format: str = "react-flow") -> Any:
+        """
+        Return the nested states of a collapsed state, to expand it on demand.
+
+        The view is the one of get_graph(max_depth=..., collapsed=...) with the
+        state expanded by one level. Its children are shown, collapsed in turn
+        if they have nested states, and the transitions of the state are split
+        up between them. Only the nested states and transitions of the state are
+        visited, not the whole graph.
+
+        Args:
+            state: Name or Enum of the state to expand
+            max_depth: max_depth of the view the state is expanded in
+            collapsed: collapsed state(s) of the view the state is expanded in
+            format: Output format, see get_graph. Layouts are not supported.
 
         Returns:
-            Dictionary with 'nodes' and 'edges' keys containing React Flow compatible data
+            Graph data of the children of the state and of every edge of the
+            view incident to the state or its children. Clients replace the
+            edges of the collapsed state with these edges.
+
+        Raises:
+            ValueError: If the state is not a node of the view, or the format or
+                        max_depth is invalid
+        """
+        self._validate_options(format=format, max_depth=max_depth, collapsed=collapsed)
+        topology = self._get_topology()
+        records = topology.expand(self._get_node_name(state), max_depth, self._get_collapsed_names(collapsed))
+        return _copy_output(format, self._format_records(topology, records, format, None))
+
+    def get_bundled_edges(self, trigger: str, target: Any, max_depth: Optional[int] = None,
+                          collapsed: Optional[Any] = None, format: str = "react-flow") -> Any:
+        """
+        Return the edges a bundled edge of get_graph(bundle_sources=...) stands for.
+
+        Without max_depth and collapsed, only the edges entering the target are
+        visited. Otherwise the edges are taken from the same collapsed view.
+
+        Args:
+            trigger: Label of the bundled edge
+            target: Name or Enum of the target state of the bundled edge
+            max_depth: max_depth of the view the edge was bundled in
+            collapsed: collapsed state(s) of the view the edge was bundled in
+            format: Output format, see get_graph. Layouts are not supported.
+
+        Returns:
+            Graph data without nodes and with every edge of the trigger into the
+            target. Clients replace the bundled edge with these edges.
+
+        Raises:
+            ValueError: If graph data is malformed or the format or max_depth is invalid
+        """
+        self._validate_options(format=format, max_depth=max_depth, collapsed=collapsed)
+        topology = self._get_topology()
+        name = self._get_node_name(target)
+        if max_depth is None and collapsed is None:
+            edges = topology.in_edges(name)
+        else:
+            edges = topology.collapse(max_depth, self._get_collapsed_names(collapsed))["edges"]
+        edges = [edge for edge in edges if edge.label == trigger and edge.target == name]
+        return _copy_output(format, self._format_records(topology, {"nodes": [], "edges": edges}, format, None))
+
+    def get_parallel_edges(self, source: Any, target: Any, max_depth: Optional[int] = None,
+                           collapsed: Optional[Any] = None, bundle_sources: Optional[int] = None,
+                           format: str = "react-flow") -> Any:
+        """
+        Return the edges a merged edge of get_graph(merge_parallel=True) stands for.
+
+        Without further options, only the edges entering the target are
+        visited. Otherwise the edges are taken from the same view.
+
+        Args:
+            source: Name or Enum of the source state, or the ID of a virtual node
+            target: Name or Enum of the target state
+            max_depth: max_depth of the view the edges were merged in
+            collapsed: collapsed state(s) of the view the edges were merged in
+            bundle_sources: bundle_sources of the view the edges were merged in
+            format: Output format, see get_graph. Layouts are not supported.
+
+        Returns:
+            Graph data without nodes and with every edge from source to target.
+            Clients replace the merged edge with these edges.
+
+        Raises:
+            ValueError: If graph data is malformed or the format, max_depth or
+                        bundle_sources is invalid
+        """
+        self._validate_options(format=format, max_depth=max_depth, collapsed=collapsed,
+                               bundle_sources=bundle_sources)
+        topology = self._get_topology()
+        source, target = self._get_node_name(source), self._get_node_name(target)
+        if max_depth is None and collapsed is None and bundle_sources is None:
+            edges = topology.in_edges(target)
+        else:
+            if max_depth is None and collapsed is None:
+                records = topology.get_records()
+            else:
+                records = topology.collapse(max_depth, self._get_collapsed_names(collapsed))
+            edges = self._bundle(topology, records, bundle_sources, False)["edges"]
+        edges = [edge for edge in edges if edge.source == source and edge.target == target]
+        return _copy_output(format, self._format_records(topology, {"nodes": [], "edges": edges}, format, None))
+
+    def get_out_edges(self, state: Any) -> List[Dict[str, Any]]:
+        """
+        Return the edges leaving a state, using the adjacency index of the graph.
+
+        Args:
+            state: Name or Enum of the state
+
+        Returns:
+            New React Flow edge dictionaries, empty for an unknown state
+
+        Raises:
+            ValueError: If no state is given, e.g. an empty list
+        """
+        return [edge.to_dict() for edge in self._get_topology().out_edges(self._get_node_name(state))]
+
+    def get_in_edges(self, state: Any) -> List[Dict[str, Any]]:
+        """
+        Return the edges entering a state, using the adjacency index of the graph.
+
+        Args:
+            state: Name or Enum of the state
+
+        Returns:
+            New React Flow edge dictionaries, empty for an unknown state
+
+        Raises:
+            ValueError: If no state is given, e.g. an empty list
+        """
+        return [edge.to_dict() for edge in self._get_topology().in_edges(self._get_node_name(state))]
+
+    def get_triggers(self, state: Any) -> List[str]:
+        """
+        Return the triggers of the edges leaving a state.
+
+        Args:
+            state: Name or Enum of the state
+
+        Returns:
+            Names of the triggers without duplicates, empty for an unknown state
+
+        Raises:
+            ValueError: If no state is given, e.g. an empty list
+        """
+        return self._get_topology().triggers(self._get_node_name(state))
+
+    def get_reachable(self, state: Any, max_distance: Optional[int] = None) -> List[str]:
+        """
+        Return the states that can be reached from a state in the graph.
+
+        Args:
+            state: Name or Enum of the state to start from
+            max_distance: Maximum number of transitions to follow, None for no limit
+
+        Returns:
+            Names of the reachable states by increasing distance. The state
+            itself is only included if it is part of a cycle. Empty for an
+            unknown state.
+
+        Raises:
+            ValueError: If no state is given, e.g. an empty list
+        """
+        return list(self._get_topology().reachable(self._get_node_name(state), max_distance))
+
+    def can_reach(self, source: Any, target: Any) -> bool:
+        """
+        Check whether a state can be reached from another one in the graph.
+
+        The search stops as soon as the target is found.
+
+        Args:
+            source: Name or Enum of the state to start from
+            target: Name or Enum of the state to reach
+
+        Returns:
+            True if a path of at least one transition leads from source to target,
+            False if either state is unknown
+
+        Raises:
+            ValueError: If no state is given, e.g. an empty list
+        """
+        name = self._get_node_name(target)
+        return any(state == name for state in self._get_topology().reachable(self._get_node_name(source)))
+
+    @staticmethod
+    def _bundle(topology: GraphTopology, records: Dict[str, List[Any]], bundle_sources: Optional[int],
+                merge_parallel: bool) -> Dict[str, List[Any]]:
+        """Bundle edges of many sources first, then merge parallel edges, as requested."""
+        if bundle_sources is not None:
+            records = topology.bundle(records, bundle_sources)
+        if merge_parallel:
+            records = topology.merge_parallel(records)
+        return records
+
+    def _format_records(self, topology: GraphTopology, records: Dict[str, List[Any]], format: str,
+                        layout: Optional[Layout]) -> Any:
+        """
+        Convert records of a partial graph or view to the requested format.
+
+        Partial graphs are not cached. Incremental layouts place the nodes
+        where they are in the latest layout of the whole graph.
+
+        Args:
+            topology: Node/edge index the records belong to
+            records: Dictionary with 'nodes' and 'edges' record lists
+            format: Output format, see get_graph
+            layout: Layout computing the node positions, if any
+
+        Returns:
+            Graph data in the requested format
+        """
+        if format == "compact":
+            return records
+        if format in ("columnar", "binary"):
+            return self._encode(format, records)
+
+        graph = topology.to_dicts(records)
+        if layout is not None:
+            key = layout.key
+            previous = topology.layouts.get(f"layout:{key!r}") if key is not None and layout.incremental else None
+            graph["nodes"] = _place(graph["nodes"], self._lay_out(records, layout, previous))
+        return graph
+
+    def _get_layouted_graph(self, topology: GraphTopology, layout: Layout) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Return the graph with node properties computed by a layout.
+
+        Results of layouts with a key are cached on the node/edge index, so
+        all models and clients share them until the topology changes. The
+        latest result of every layout is kept across topology changes and
+        passed to Layout.update for the next version.
+
+        Args:
+            topology: Current node/edge index
+            layout: Layout computing the node properties
+
+        Returns:
+            Dictionary with 'nodes' and 'edges' keys, where nodes carry the computed properties
+
+        Raises:
+            ValueError: If the layout fails
+        """
+        key = layout.key
+        name = None if key is None else f"layout:{key!r}"
+
+        def build() -> Dict[str, List[Dict[str, Any]]]:
+            graph = topology.get_graph()
+            previous = topology.layouts.get(name) if name is not None else None
+            properties = self._lay_out(topology.get_records(), layout, previous)
+            if name is not None:
+                topology.layouts[name] = properties
+
+            return {"nodes": _place(graph["nodes"], properties), "edges": graph["edges"]}
+
+        if name is None:
+            return build()
+        _count_output(self.stats, topology, name)
+        return topology.cached(name, build)
+
+    def _encode(self, format: str, records: Dict[str, List[Any]]) -> Any:
+        """Encode node and edge records in the 'columnar' or 'binary' format."""
+        encode = columnar.to_columns if format == "columnar" else columnar.pack
+        stats = self.stats
+        if stats is None:
+            return encode(**records)
+        start = perf_counter()
+        result = encode(**records)
+        stats.add_time("encode", perf_counter() - start)
+        return result
+
+    def _lay_out(self, records: Dict[str, List[Any]], layout: Layout,
+                 previous: Optional[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Compute the node properties of a graph with a layout.
+
+        If the machine has a layout_cache, results are looked up in and stored
+        to it, so they survive topology changes back to a known graph and
+        process restarts. Graphs with nested nodes are laid out with
+        Layout.compute_nested, from scratch.
+
+        Args:
+            records: Dictionary with 'nodes' and 'edges' record lists
+            layout: Layout computing the node properties
+            previous: Earlier result of the layout passed to Layout.update, if any
+
+        Returns:
+            Dictionary mapping node IDs to React Flow node properties
+
+        Raises:
+            ValueError: If the layout fails
+        """
+        nodes = [node.id for node in records["nodes"]]
+        edges = [(edge.source, edge.target) for edge in records["edges"]]
+        known = set(nodes)
+        parents = {node.id: node.parent for node in records["nodes"] if node.parent in known}
+
+        cache: Optional[LayoutCache] = getattr(self.machine, 'layout_cache', None)
+        # Layouts continuing an earlier result depend on more than the graph
+        shared = bool(parents) or previous is None or not layout.incremental
+        cache_key = cache.key(layout, nodes, edges, parents) if cache is not None and shared else None
+        properties = cache.get(cache_key) if cache is not None and cache_key is not None else None
+        stats = self.stats
+        if stats is not None and cache_key is not None:
+            stats.count("layout_cache_misses" if properties is None else "layout_cache_hits")
+        if properties is None:
+            start = perf_counter() if stats is not None else 0.0
+            try:
+                if parents:
+                    properties = layout.compute_nested(nodes, edges, parents)
+                elif previous is None:
+                    properties = layout.compute(nodes, edges)
+                else:
+                    properties = layout.update(nodes, edges, previous)
+            except Exception as e:
+                raise ValueError(f"Failed to lay out React Flow graph: {str(e)}") from e
+            if stats is not None:
+                stats.add_time("layout", perf_counter() - start)
+            if cache is not None and cache_key is not None:
+                cache.put(cache_key, properties)
+        return properties
+
+    def diff(self, since_version: int) -> Dict[str, Any]:
+        """
+        Return React Flow patches that bring a graph of an earlier version up to date.
+
+        Args:
+            since_version: graph_version of the graph the client currently has
+
+        Returns:
+            Dictionary with the current 'version', a 'reset' flag and 'nodes'/'edges'
+            lists of NodeChange/EdgeChange style patches ('add', 'remove', 'replace').
+            If 'reset' is True, the changes since the given version are unknown and
+            the lists add the complete current graph instead.
 
         Raises:
             ValueError: If graph data is malformed or missing required fields
         """
+        return self._get_topology().diff(since_version)
+
+    def iter_json(self, chunk_size: int = 1000) -> Iterator[str]:
+        """
+        Serialize the graph to JSON in chunks.
+
+        If the node/edge index is up to date, it is streamed as is. Otherwise
+        flat machines are serialized directly from their states and events
+        without building the index, and only the names of referenced states and
+        a counter per state pair are kept in memory. Edges are emitted before
+        nodes in that case, since a state is only a node if an edge references
+        it. Hierarchical machines and machines with graph snapshots build the
+        index first.
+
+        Args:
+            chunk_size: Number of nodes or edges serialized per chunk
+
+        Yields:
+            Pieces of a JSON object with 'nodes' and 'edges' keys that, joined,
+            equal the JSON of get_graph() up to the order of both keys
+
+        Raises:
+            ValueError: If graph data is malformed or missing required fields
+        """
+        chunks = self._iter_json(chunk_size)
+        stats = self.stats
+        return chunks if stats is None else _timed_chunks(chunks, stats, "serialize")
+
+    def _iter_json(self, chunk_size: int) -> Iterator[str]:
+        """Generate the chunks of iter_json."""
+        topology = self._topology
+        if self._uses_snapshots():
+            topology = self._get_topology()
+        elif topology is None or topology.fingerprint != self._topology_fingerprint():
+            topology = self._get_topology() if self._is_nested() else None
+
+        if topology is not None:
+            records = topology.get_records()
+            sections: Iterable[Tuple[str, Iterable[Any]]] = (
+                ("nodes", records["nodes"]), ("edges", records["edges"]))
+        else:
+            sections = self._iter_machine_records()
+
+        separator = "{"
+        for key, records in sections:
+            yield f'{separator}"{key}": ['
+            separator = ", "
+            chunk: List[Dict[str, Any]] = []
+            first = True
+            for record in records:
+                chunk.append(record.to_dict())
+                if len(chunk) >= chunk_size:
+                    yield ("" if first else ", ") + json.dumps(chunk)[1:-1]
+                    first = False
+                    chunk = []
+            if chunk:
+                yield ("" if first else ", ") + json.dumps(chunk)[1:-1]
+            yield "]"
+        yield "}"
+
+    def _iter_machine_records(self) -> Iterator[Tuple[str, Iterable[Any]]]:
+        """
+        Generate edge and node records of a flat machine without building the index.
+
+        Yields:
+            ('edges', records) and ('nodes', records) pairs. The nodes are only
+            known once all edges have been consumed.
+        """
+        machine = self.machine
+        edge_counter: Dict[Tuple[str, str], int] = {}
+        used: Set[str] = set()
+
+        def edges() -> Iterator[EdgeRecord]:
+            for event in list(machine.events.values()):
+                if machine._omit_auto_transitions(event):
+                    continue
+                for source_transitions in list(event.transitions.values()):
+                    for transition in source_transitions:
+                        source = transition.source
+                        target = transition.dest or source
+                        used.update((source, target))
+                        # Same IDs as _build_edges, which numbers edges per source and target
+                        edge_count = edge_counter.get((source, target), 0)
+                        edge_counter[(source, target)] = edge_count + 1
+                        yield EdgeRecord.create(
+                            EdgeRecord.make_id(source, target, edge_count), source, target, event.name)
+
+        def nodes() -> Iterator[NodeRecord]:
+            for name, state in list(machine.states.items()):
+                if name in used:
+                    yield NodeRecord.create(name, getattr(state, 'label', None))
+
+        yield "edges", edges()
+        yield "nodes", nodes()
+
+    def update_states(self, names: Iterable[str], previous_version: int) -> None:
+        """
+        Apply added states to the node/edge index.
+
+        Args:
+            names: Names of the added states
+            previous_version: Graph version of the machine before the states were added
+        """
+        # Visible auto transitions connect the new states to every other state
+        if self.machine.auto_transitions and self.machine.auto_transitions_markup:
+            return
+        stats = self.stats
+        start = perf_counter() if stats is not None else 0.0
+        topology = self._get_updatable_topology(previous_version)
+        if topology is None:
+            return
+
+        for name in names:
+            state = self.machine.states[name]
+            topology.add_node(NodeRecord.create(name, getattr(state, 'label', None)))
+        topology.commit(self._topology_fingerprint())
+        self._topology = topology
+        if stats is not None:
+            stats.add_time("delta", perf_counter() - start)
+
+    def update_trigger(self, trigger: str, previous_version: int) -> None:
+        """
+        Apply added or removed transitions of a trigger to the node/edge index.
+
+        Args:
+            trigger: Name of the changed trigger
+            previous_version: Graph version of the machine before the change
+        """
+        stats = self.stats
+        start = perf_counter() if stats is not None else 0.0
+        topology = self._get_updatable_topology(previous_version)
+        if topology is None:
+            return
+
+        event = self.machine.events.get(trigger)
+        pairs: List[Tuple[str, str]] = []
+        if event is not None and not self.machine._omit_auto_transitions(event):
+            pairs = [
+                (transition.source, transition.dest or transition.source)
+                for source_transitions in event.transitions.values()
+                for transition in source_transitions
+            ]
+        topology.sync_trigger(trigger, pairs)
+        topology.commit(self._topology_fingerprint())
+        self._topology = topology
+        if stats is not None:
+            stats.add_time("delta", perf_counter() - start)
+
+    def _get_topology(self) -> GraphTopology:
+        """
+        Return the node/edge index, rebuilding it if it is out of date.
+
+        Machines with graph snapshots only read their state while holding the
+        machine lock, so an index that is up to date is returned without it.
+        It is shared, so later deltas are applied to a copy.
+
+        Returns:
+            Index matching the current topology fingerprint of the machine
+
+        Raises:
+            ValueError: If graph data is malformed or missing required fields
+        """
+        fingerprint = self._topology_fingerprint()
+        topology = self._topology
+        if topology is not None and topology.fingerprint == fingerprint:
+            if not self._uses_snapshots() or topology.share():
+                return topology
+        if self._uses_snapshots():
+            # Threads waiting for the lock find the index built by the first one
+            return self.machine._locked_method(self._share_topology)
+        return self._rebuild_topology()
+
+    def _share_topology(self) -> GraphTopology:
+        """Rebuild the node/edge index unless it is up to date and share it, while holding the machine lock."""
+        topology = self._rebuild_topology()
+        topology.share()
+        return topology
+
+    def _rebuild_topology(self) -> GraphTopology:
+        """
+        Rebuild the node/edge index unless it is up to date.
+
+        Returns:
+            Index matching the current topology fingerprint of the machine
+
+        Raises:
+            ValueError: If graph data is malformed or missing required fields
+        """
+        fingerprint = self._topology_fingerprint()
+        topology = self._topology
+        if topology is not None and topology.fingerprint == fingerprint:
+            return topology
+
+        states, transitions = self._read_elements()
+        topology = self._build_topology(fingerprint, states, transitions)
+        self._install_topology(topology)
+        return topology
+
+    def _read_elements(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Read the states and transitions of the machine from its markup.
+
+        This is the only step of building the index that reads the machine.
+        The returned lists are not modified by later changes of the machine.
+
+        Returns:
+            Top level state and flattened transition definitions
+
+        Raises:
+            ValueError: If graph data is malformed or missing required fields
+        """
+        stats = self.stats
+        start = perf_counter() if stats is not None else 0.0
         try:
             # _get_elements() handles the complex state/transition resolution
             states, transitions = self._get_elements()
 
             if not isinstance(states, list) or not isinstance(transitions, list):
                 raise ValueError("Invalid states or transitions data from _get_elements()")
+        except Exception as e:
+            # Re-raise with more context
+            raise ValueError(f"Failed to generate React Flow graph: {str(e)}") from e
+        if stats is not None:
+            _record_read(stats, perf_counter() - start, states, transitions)
+        return states, transitions
 
-            # Build edges first to determine which states are actually used
-            edges = self._build_edges(transitions)
+    def _snapshot_elements(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Read the states and transitions of the machine like _read_elements, but faster.
+
+        Flat machines are read directly from their states and events, which
+        skips converting callbacks and conditions to markup. Hierarchical
+        machines are read through their markup.
+
+        Returns:
+            Top level state and flattened transition definitions
+
+        Raises:
+            ValueError: If graph data is malformed or missing required fields
+        """
+        if self._is_nested():
+            return self._read_elements()
+
+        stats = self.stats
+        start = perf_counter() if stats is not None else 0.0
+        machine = self.machine
+        states = []
+        for name, state in machine.states.items():
+            definition = {"name": getattr(name, 'name', name)}
+            label = getattr(state, 'label', None)
+            if label and isinstance(label, str):
+                definition["label"] = label
+            states.append(definition)
+        # Internal transitions have no 'dest', like in the markup
+        transitions = [
+            {"trigger": event.name, "source": transition.source, "dest": transition.dest}
+            if transition.dest else {"trigger": event.name, "source": transition.source}
+            for event in machine.events.values() if not machine._omit_auto_transitions(event)
+            for source_transitions in event.transitions.values()
+            for transition in source_transitions
+        ]
+        if stats is not None:
+            _record_read(stats, perf_counter() - start, states, transitions)
+        return states, transitions
 
-            # Get all states that are actually used in transitions
-            used_state_ids = self._get_used_state_ids(edges)
+    def _build_topology(self, fingerprint: Tuple[Any, ...], states: List[Dict[str, Any]],
+                        transitions: List[Dict[str, Any]]) -> GraphTopology:
+        """
+        Build a node/edge index from state and transition definitions.
+
+        Args:
+            fingerprint: Topology fingerprint the definitions were read for
+            states: Top level state definitions as returned by _read_elements
+            transitions: Transition definitions as returned by _read_elements
+
+        Returns:
+            New index that has not been installed yet
+
+        Raises:
+            ValueError: If graph data is malformed or missing required fields
+        """
+        stats = self.stats
+        try:
+            start = perf_counter() if stats is not None else 0.0
+            edges = self._build_edges(transitions)
+            if stats is not None:
+                edges_built = perf_counter()
+                stats.add_time("edges", edges_built - start)
 
-            # Only include states that are used in transitions
-            nodes = self._build_nodes(states, used_state_ids)
+            # Keep unused states in the index so later deltas can reference them
+            nodes = self._build_nodes(states)
+            if stats is not None:
+                nodes_built = perf_counter()
+                stats.add_time("nodes", nodes_built - edges_built)
 
-            return {"nodes": nodes, "edges": edges}
+            topology = GraphTopology(fingerprint)
+            topology.load(nodes, edges)
+            if stats is not None:
+                stats.add_time("index", perf_counter() - nodes_built)
+                stats.count("edges_built", len(edges))
+                stats.count("nodes_built", len(nodes))
 
         except Exception as e:
             # Re-raise with more context
             raise ValueError(f"Failed to generate React Flow graph: {str(e)}") from e
+        return topology
 
-    def _build_edges(self, transitions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _install_topology(self, topology: GraphTopology) -> None:
+        """Replace the shared node/edge index, continuing the change log of the previous one."""
+        if self._topology is not None:
+            topology.inherit(self._topology)
+        self._topology = topology
+
+    def _get_updatable_topology(self, previous_version: int) -> Optional[GraphTopology]:
+        """
+        Return the index if a delta can be applied to it.
+
+        Deltas are only applied to indices that were up to date before the
+        change. Hierarchical machines resolve nested names and initial
+        transitions through their markup and are always rebuilt instead.
+        Machines with graph snapshots apply deltas to a copy once the index
+        was shared, which replaces the index once they are committed, so
+        readers never see a partial change.
+
+        Args:
+            previous_version: Graph version of the machine before the change
+
+        Returns:
+            The index or its copy, or None if it has to be rebuilt on the next request
+        """
+        topology = self._topology
+        if topology is None or topology.fingerprint != self._topology_fingerprint(previous_version):
+            return None
+        if self._is_nested():
+            return None
+        return topology.for_update() if self._uses_snapshots() else topology
+
+    def _uses_snapshots(self) -> bool:
+        """Whether the index is replaced rather than changed, so it can be read without the machine lock."""
+        return getattr(self.machine, '_graph_snapshots', False)
+
+    def _get_node_names(self, state: Any) -> Iterable[str]:
+        """Resolve state names, Enums or lists of them to node IDs."""
+        if self._is_nested() and self.machine is not None:
+            return self._get_state_names(state)
+        return (getattr(name, 'name', name) for name in listify(state))
+
+    def _get_node_name(self, state: Any) -> str:
+        """Resolve a single state name or Enum to its node ID, raising ValueError if there is none."""
+        name = next(iter(self._get_node_names(state)), None)
+        if name is None:
+            raise ValueError(f"Invalid state {state!r}")
+        return name
+
+    def _get_collapsed_names(self, collapsed: Any) -> Set[str]:
+        """Resolve the collapsed state(s) of a view to node IDs."""
+        return set() if collapsed is None else set(self._get_node_names(collapsed))
+
+    def _is_nested(self) -> bool:
+        """Whether the machine is a hierarchical machine with nested states."""
+        if self.machine is None:
+            return self._hierarchical
+        return issubclass(self.machine.transition_cls, NestedTransition)
+
+    def _get_separator(self) -> str:
+        """Return the separator of nested state names."""
+        return self._separator if self.machine is None else self.machine.state_cls.separator
+
+    def _topology_fingerprint(self, version: Optional[int] = None) -> Tuple[Any, ...]:
+        """
+        Compute the fingerprint used to validate the node/edge index.
+
+        Args:
+            version: Graph version to use instead of the machine's current one
+
+        Returns:
+            Tuple of the machine's graph version and the markup options
+            that influence which transitions are rendered
+        """
+        if version is None:
+            version = self.graph_version
+        return (version, getattr(self.machine, 'auto_transitions_markup', False))
+
+    def _build_edges(self, transitions: List[Dict[str, Any]]) -> List[EdgeRecord]:
         """
         Build React Flow edges from transition data.
 
@@ -63,10 +1083,10 @@ class ReactFlowGraph(BaseGraph):
             transitions: List of transition dictionaries
 
         Returns:
-            List of edge dictionaries with unique IDs
+            List of edge records with unique IDs
         """
         edges = []
-        edge_counter: Dict[str, int] = {}  # Track duplicate edges
+        edge_counter: Dict[Tuple[str, str], int] = {}  # Track duplicate edges
 
         for transition in transitions:
             source = transition.get('source')
@@ -77,81 +1097,236 @@ class ReactFlowGraph(BaseGraph):
                 continue  # Skip invalid transitions
 
             # Create unique edge ID even for duplicate source->target pairs
-            edge_key = f"{source}-{target}"
-            edge_count = edge_counter.get(edge_key, 0)
-            edge_counter[edge_key] = edge_count + 1
-
-            edge_id = f"e-{edge_key}-{edge_count}" if edge_count > 0 else f"e-{edge_key}"
+            edge_count = edge_counter.get((source, target), 0)
+            edge_counter[(source, target)] = edge_count + 1
 
-            edges.append({
-                "id": edge_id,
-                "source": source,
-                "target": target,
-                "label": trigger
-            })
+            edges.append(EdgeRecord.create(EdgeRecord.make_id(source, target, edge_count), source, target, trigger))
 
         return edges
 
-    def _get_used_state_ids(self, edges: List[Dict[str, Any]]) -> Set[str]:
+    def _build_nodes(self, states: List[Dict[str, Any]], parent: Optional[str] = None) -> List[NodeRecord]:
         """
-        Extract all state IDs that are referenced in edges.
+        Build React Flow nodes from state data.
+
+        Nested states are added depth-first after their parent, with IDs
+        joined by the state separator like the names of their transitions.
 
         Args:
-            edges: List of edge dictionaries
+            states: List of state dictionaries
+            parent: ID of the node the states are nested in, None for top level states
 
         Returns:
-            Set of state IDs that appear in transitions
+            List of node records
         """
-        used_state_ids: Set[str] = set()
+        nodes = []
+
+        for state in states:
+            state_name = state.get('name')
+
+            if not state_name:
+                continue  # Skip states without names
 
-        for edge in edges:
-            if 'source' in edge:
-                used_state_ids.add(edge['source'])
-            if 'target' in edge:
-                used_state_ids.add(edge['target'])
+            node_id = state_name if parent is None else f"{parent}{self._get_separator()}{state_name}"
+            nodes.append(NodeRecord.create(node_id, state.get('label', state_name), parent))
+            nodes.extend(self._build_nodes(state.get('children', []), node_id))
 
-        return used_state_ids
+        return nodes
 
-    def _build_nodes(self, states: List[Dict[str, Any]], used_state_ids: Set[str]) -> List[Dict[str, Any]]:
+    def get_overlay(self, merge_parallel: bool = False) -> Dict[str, Any]:
         """
-        Build React Flow nodes from state data.
+        Return the style overlay for the graph.
+
+        The overlay is independent of the graph topology and can be fetched or
+        streamed separately, e.g. to highlight the active state.
 
         Args:
-            states: List of state dictionaries
-            used_state_ids: Set of state IDs that should be included
+            merge_parallel: Whether the overlay is applied to a graph with merged
+                            parallel edges, whose IDs are marked instead
 
         Returns:
-            List of node dictionaries
+            Dictionary with the overlay 'version' and 'nodes'/'edges' mappings from
+            element ID to React Flow properties ('className'). The previous
+            transition marks the edge of its trigger between its source and
+            destination, or all of them if the trigger is unknown.
+
+        Raises:
+            ValueError: If graph data is malformed or missing required fields
         """
-        nodes = []
+        nodes = {name: {"className": style} for name, style in self._node_styles.items()}
+        edges: Dict[str, Dict[str, Any]] = {}
+        if self._previous_transition is not None:
+            topology = self._get_topology()
+            edge_ids = topology.edge_ids(*self._previous_transition)
+            if merge_parallel and edge_ids:
+                # Merged edges take the ID of the first edge between both states
+                edge_ids = topology.edge_ids(*self._previous_transition[:2])[:1]
+            for edge_id in edge_ids:
+                edges[edge_id] = {"className": "previous"}
+        return {"version": self.overlay_version, "nodes": nodes, "edges": edges}
 
-        for state in states:
-            state_name = state.get('name')
+    def expect_trigger(self, trigger: str) -> None:
+        """
+        Set the trigger of the transition the next set_previous_transition call marks.
 
-            if not state_name:
-                continue  # Skip states without names
+        Args:
+            trigger: Name of the trigger
+        """
+        self._next_trigger = trigger
 
-            # Only include states that are actually used in transitions
-            if state_name not in used_state_ids:
-                continue
+    def set_previous_transition(self, src: str, dst: Optional[str]) -> None:
+        """
+        Mark the previous transition and its source state.
 
-            nodes.append({
-                "id": state_name,
-                "data": {"label": state.get('label', state_name)},
-                "position": {"x": 0, "y": 0}
-            })
+        Args:
+            src: Name of the source state
+            dst: Name of the destination state, None for internal transitions
+        """
+        self._previous_transition = (src, dst or src, self._next_trigger)
+        self._next_trigger = None
+        self.set_node_style(src, "previous")
 
-        return nodes
+    def set_node_style(self, state: Any, style: str) -> None:
+        """
+        Set the className of the node(s) associated with a model state.
 
-    # Abstract requirements for BaseGraph - not used for React Flow
-    def set_previous_transition(self, src: str, dst: str) -> None:
-        """Set styling for previous transition (not implemented for React Flow)."""
-        pass
+        Args:
+            state: Name of the state(s) or Enum(s)
+            style: Name of the style, 'default' and 'inactive' remove the styling
+        """
+        for name in self._get_node_names(state):
+            if style in ('default', 'inactive'):
+                self._node_styles.pop(name, None)
+            else:
+                self._node_styles[name] = style
+        self.overlay_version += 1
 
-    def set_node_style(self, state: str, style: str) -> None:
-        """Set node styling (not implemented for React Flow)."""
-        pass
+    def set_active_state(self, state: Any) -> None:
+        """
+        Mark only the given state(s) as active.
+
+        Used by lazy machines, whose transitions do not update the overlay.
+        The overlay version only changes if the active state did.
+
+        Args:
+            state: Name of the state(s) or Enum(s)
+        """
+        names = list(self._get_node_names(state))
+        if self._previous_transition is None and self._node_styles == dict.fromkeys(names, "active"):
+            return
+        self._node_styles = dict.fromkeys(names, "active")
+        self._previous_transition = None
+        self.overlay_version += 1
+
+    def mark_active_state(self, state: Any) -> None:
+        """
+        Mark the given state(s) as active, keeping the other styles.
+
+        Used by async machines, whose transitions reset the styling and mark
+        the previous transition, but do not mark the state they entered.
+        The overlay version only changes if a node was not marked yet.
+
+        Args:
+            state: Name of the state(s) or Enum(s)
+        """
+        names = [name for name in self._get_node_names(state) if self._node_styles.get(name) != "active"]
+        if not names:
+            return
+        self._node_styles.update(dict.fromkeys(names, "active"))
+        self.overlay_version += 1
 
     def reset_styling(self) -> None:
-        """Reset graph styling (not implemented for React Flow)."""
-        pass
+        """Remove all node styles and the previous transition."""
+        self._node_styles = {}
+        self._previous_transition = None
+        self.overlay_version += 1
+
+
+def _record_read(stats: GraphStats, seconds: float, states: List[Dict[str, Any]],
+                 transitions: List[Dict[str, Any]]) -> None:
+    """Record reading states, including nested ones, and transitions from the machine."""
+    stats.add_time("read", seconds)
+    count = 0
+    pending = list(states)
+    while pending:
+        state = pending.pop()
+        count += 1
+        pending.extend(state.get('children', []))
+    stats.count("states_read", count)
+    stats.count("transitions_read", len(transitions))
+
+
+def _count_output(stats: Optional[GraphStats], topology: GraphTopology, key: str) -> None:
+    """Count whether graph data is found in the cache of the index."""
+    if stats is not None:
+        stats.count("output_hits" if topology.is_cached(key) else "output_misses")
+
+
+def _timed_chunks(chunks: Iterator[str], stats: GraphStats, stage: str) -> Iterator[str]:
+    """Pass on chunks, recording the time spent generating them, but not consuming them, as stage."""
+    elapsed = 0.0
+    start = perf_counter()
+    for chunk in chunks:
+        elapsed += perf_counter() - start
+        yield chunk
+        start = perf_counter()
+    stats.add_time(stage, elapsed + perf_counter() - start)
+
+
+def _copy_output(format: str, result: Any) -> Any:
+    """
+    Copy graph data before it is handed out by a public method.
+
+    Rendered graphs are cached on the shared index and reused by all models,
+    so callers get their own containers and element dictionaries instead.
+
+    Args:
+        format: Format of the graph data, see get_graph
+        result: Graph data as rendered for the format
+
+    Returns:
+        Graph data that can be modified without affecting the caches
+    """
+    if format == "react-flow":
+        return {key: [_copy_element(item) for item in items] for key, items in result.items()}
+    if format == "columnar":
+        return {
+            **result,
+            "strings": list(result["strings"]),
+            "nodes": {name: list(column) for name, column in result["nodes"].items()},
+            "edges": {name: list(column) for name, column in result["edges"].items()},
+        }
+    if format == "compact":
+        return {key: list(items) for key, items in result.items()}
+    return result
+
+
+def _copy_element(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a React Flow node or edge dictionary including its nested dictionaries and lists."""
+    return {key: _copy_element(value) if isinstance(value, dict) else list(value) if isinstance(value, list)
+            else value for key, value in item.items()}
+
+
+def _place(nodes: List[Dict[str, Any]], properties: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merge layout properties into React Flow nodes.
+
+    Layouts compute absolute positions, while React Flow positions nested
+    nodes relative to their parent node. Parent nodes are sized by the
+    'style' a layout computes for them.
+
+    Args:
+        nodes: React Flow node dictionaries, which are not modified
+        properties: Node properties by node ID as computed by a layout
+
+    Returns:
+        New node dictionaries with the properties
+    """
+    placed = []
+    for node in nodes:
+        item = {**node, **properties.get(node["id"], {})}
+        parent = properties.get(node.get("parentNode"), {}).get("position")
+        if parent is not None and "position" in item:
+            position = item["position"]
+            item["position"] = {"x": position["x"] - parent["x"], "y": position["y"] - parent["y"]}
+        placed.append(item)
+    return placed
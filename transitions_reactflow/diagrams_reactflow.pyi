@@ -1,28 +1,274 @@
 """Type stubs for ReactFlowGraph."""
 
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 from transitions.extensions.diagrams_base import BaseGraph
 
+from .layout import Layout
+from .stats import GraphStats
+from .topology import EdgeRecord, GraphTopology, NodeRecord
+
+GRAPH_FORMATS: Tuple[str, ...]
+
 
 class ReactFlowGraph(BaseGraph):
+    _topology: Optional[GraphTopology]
+    overlay_version: int
+    _hierarchical: bool
+    graph_stats: Optional[GraphStats]
+    _separator: str
+
+    def __init__(self, machine: Any) -> None: ...
+
+    @classmethod
+    def from_definition(
+        cls,
+        states: Any,
+        transitions: Optional[List[Any]] = ...,
+        hierarchical: bool = ...,
+        separator: str = ...,
+    ) -> "ReactFlowGraph": ...
+
+    @classmethod
+    def _from_elements(
+        cls,
+        states: List[Dict[str, Any]],
+        transitions: List[Dict[str, Any]],
+        hierarchical: bool = ...,
+        separator: str = ...,
+    ) -> "ReactFlowGraph": ...
+
+    @property
+    def graph_version(self) -> int: ...
+
+    @property
+    def _topology_owner(self) -> Any: ...
+
+    @property
+    def stats(self) -> Optional[GraphStats]: ...
+
+    def invalidate(self) -> None: ...
+
     def generate(self) -> None: ...
 
     def get_graph(
-        self, title: Optional[str] = ..., roi_state: Optional[str] = ...
+        self,
+        title: Optional[str] = ...,
+        roi_state: Optional[Any] = ...,
+        format: str = ...,
+        layout: Optional[Union[str, Layout]] = ...,
+        radius: int = ...,
+        max_nodes: Optional[int] = ...,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        bundle_sources: Optional[int] = ...,
+        merge_parallel: bool = ...,
+    ) -> Any: ...
+
+    def _render_graph(self, topology: GraphTopology, **kwargs: Any) -> Any: ...
+
+    def _render_view(
+        self,
+        topology: GraphTopology,
+        stats: Optional[GraphStats],
+        roi_state: Optional[Any] = ...,
+        format: str = ...,
+        layout: Optional[Layout] = ...,
+        radius: int = ...,
+        max_nodes: Optional[int] = ...,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        bundle_sources: Optional[int] = ...,
+        merge_parallel: bool = ...,
+    ) -> Any: ...
+
+    @staticmethod
+    def _validate_options(
+        format: str = ...,
+        layout: Optional[Union[str, Layout]] = ...,
+        roi_state: Optional[Any] = ...,
+        radius: int = ...,
+        max_nodes: Optional[int] = ...,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        bundle_sources: Optional[int] = ...,
+    ) -> Optional[Layout]: ...
+
+    def _get_region(
+        self,
+        topology: GraphTopology,
+        roi_state: Any,
+        radius: int,
+        max_nodes: Optional[int],
+    ) -> Dict[str, List[Any]]: ...
+
+    def get_children(
+        self,
+        state: Any,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        format: str = ...,
+    ) -> Any: ...
+
+    def get_bundled_edges(
+        self,
+        trigger: str,
+        target: Any,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        format: str = ...,
+    ) -> Any: ...
+
+    def get_parallel_edges(
+        self,
+        source: Any,
+        target: Any,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        bundle_sources: Optional[int] = ...,
+        format: str = ...,
+    ) -> Any: ...
+
+    def get_out_edges(self, state: Any) -> List[Dict[str, Any]]: ...
+
+    def get_in_edges(self, state: Any) -> List[Dict[str, Any]]: ...
+
+    def get_triggers(self, state: Any) -> List[str]: ...
+
+    def get_reachable(
+        self, state: Any, max_distance: Optional[int] = ...
+    ) -> List[str]: ...
+
+    def can_reach(self, source: Any, target: Any) -> bool: ...
+
+    @staticmethod
+    def _bundle(
+        topology: GraphTopology,
+        records: Dict[str, List[Any]],
+        bundle_sources: Optional[int],
+        merge_parallel: bool,
+    ) -> Dict[str, List[Any]]: ...
+
+    def _format_records(
+        self,
+        topology: GraphTopology,
+        records: Dict[str, List[Any]],
+        format: str,
+        layout: Optional[Layout],
+    ) -> Any: ...
+
+    def _get_layouted_graph(
+        self, topology: GraphTopology, layout: Layout
     ) -> Dict[str, List[Dict[str, Any]]]: ...
 
+    def _encode(self, format: str, records: Dict[str, List[Any]]) -> Any: ...
+
+    def _lay_out(
+        self,
+        records: Dict[str, List[Any]],
+        layout: Layout,
+        previous: Optional[Dict[str, Dict[str, Any]]],
+    ) -> Dict[str, Dict[str, Any]]: ...
+
+    def diff(self, since_version: int) -> Dict[str, Any]: ...
+
+    def iter_json(self, chunk_size: int = ...) -> Iterator[str]: ...
+
+    def _iter_json(self, chunk_size: int) -> Iterator[str]: ...
+
+    def _iter_machine_records(
+        self,
+    ) -> Iterator[Tuple[str, Iterable[Any]]]: ...
+
+    def update_states(
+        self, names: Iterable[str], previous_version: int
+    ) -> None: ...
+
+    def update_trigger(self, trigger: str, previous_version: int) -> None: ...
+
+    def _get_topology(self) -> GraphTopology: ...
+
+    def _share_topology(self) -> GraphTopology: ...
+
+    def _rebuild_topology(self) -> GraphTopology: ...
+
+    def _read_elements(
+        self,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: ...
+
+    def _snapshot_elements(
+        self,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: ...
+
+    def _build_topology(
+        self,
+        fingerprint: Tuple[Any, ...],
+        states: List[Dict[str, Any]],
+        transitions: List[Dict[str, Any]],
+    ) -> GraphTopology: ...
+
+    def _install_topology(self, topology: GraphTopology) -> None: ...
+
+    def _get_updatable_topology(
+        self, previous_version: int
+    ) -> Optional[GraphTopology]: ...
+
+    def _uses_snapshots(self) -> bool: ...
+
+    def _get_node_names(self, state: Any) -> Iterable[str]: ...
+
+    def _get_node_name(self, state: Any) -> str: ...
+
+    def _get_collapsed_names(self, collapsed: Any) -> Set[str]: ...
+
+    def _is_nested(self) -> bool: ...
+
+    def _get_separator(self) -> str: ...
+
+    def _topology_fingerprint(
+        self, version: Optional[int] = ...
+    ) -> Tuple[Any, ...]: ...
+
     def _build_edges(
         self, transitions: List[Dict[str, Any]]
-    ) -> List[Dict[str, Any]]: ...
-
-    def _get_used_state_ids(self, edges: List[Dict[str, Any]]) -> Set[str]: ...
+    ) -> List[EdgeRecord]: ...
 
     def _build_nodes(
-        self, states: List[Dict[str, Any]], used_state_ids: Set[str]
-    ) -> List[Dict[str, Any]]: ...
+        self, states: List[Dict[str, Any]], parent: Optional[str] = ...
+    ) -> List[NodeRecord]: ...
+
+    def get_overlay(self, merge_parallel: bool = ...) -> Dict[str, Any]: ...
 
-    def set_previous_transition(self, src: str, dst: str) -> None: ...
+    def expect_trigger(self, trigger: str) -> None: ...
 
-    def set_node_style(self, state: str, style: str) -> None: ...
+    def set_previous_transition(self, src: str, dst: Optional[str]) -> None: ...
+
+    def set_node_style(self, state: Any, style: str) -> None: ...
+
+    def set_active_state(self, state: Any) -> None: ...
+
+    def mark_active_state(self, state: Any) -> None: ...
 
     def reset_styling(self) -> None: ...
+
+
+def _record_read(
+    stats: GraphStats,
+    seconds: float,
+    states: List[Dict[str, Any]],
+    transitions: List[Dict[str, Any]],
+) -> None: ...
+
+
+def _count_output(
+    stats: Optional[GraphStats], topology: GraphTopology, key: str
+) -> None: ...
+
+
+def _timed_chunks(
+    chunks: Iterator[str], stats: GraphStats, stage: str
+) -> Iterator[str]: ...
+
+
+def _place(
+    nodes: List[Dict[str, Any]], properties: Dict[str, Dict[str, Any]]
+) -> List[Dict[str, Any]]: ...
@@ -0,0 +1,703 @@
+"""Server-side layout algorithms for React Flow graphs."""
+
+import hashlib
+import json
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+# React Flow handle positions (sourcePosition, targetPosition) per layout direction
+HANDLE_POSITIONS = {
+    "TB": ("bottom", "top"),
+    "BT": ("top", "bottom"),
+    "LR": ("right", "left"),
+    "RL": ("left", "right"),
+}
+
+
+class Layout(ABC):
+    """
+    Base class for layout algorithms used by ReactFlowGraph.get_graph(layout=...).
+
+    Subclasses must implement compute, which receives the node IDs and the
+    (source, target) pairs of all edges and returns the React Flow properties
+    of every node, at least its 'position'.
+
+    Attributes:
+        incremental: Whether update results depend on earlier results, in
+            which case they are not shared through a LayoutCache
+    """
+
+    incremental = False
+
+    @property
+    def key(self) -> Optional[Tuple[Any, ...]]:
+        """
+        Identify the layout and its options.
+
+        Graphs laid out by layouts with equal keys are cached and shared.
+        None (the default) disables caching.
+        """
+        return None
+
+    @abstractmethod
+    def compute(self, nodes: Sequence[str], edges: Sequence[Tuple[str, str]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Compute the node properties for a graph.
+
+        Args:
+            nodes: IDs of all nodes
+            edges: (source, target) pairs of all edges
+
+        Returns:
+            Dictionary mapping node IDs to React Flow node properties
+        """
+
+    def update(self, nodes: Sequence[str], edges: Sequence[Tuple[str, str]],
+               previous: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Compute the node properties for a graph that was laid out before.
+
+        Layouts that can keep earlier positions stable override this method,
+        the default lays out the graph from scratch.
+
+        Args:
+            nodes: IDs of all nodes
+            edges: (source, target) pairs of all edges
+            previous: Result of this layout for an earlier version of the graph
+
+        Returns:
+            Dictionary mapping node IDs to React Flow node properties
+        """
+        return self.compute(nodes, edges)
+
+    def compute_nested(self, nodes: Sequence[str], edges: Sequence[Tuple[str, str]],
+                       parents: Mapping[str, str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Compute the node properties for a graph with nested nodes.
+
+        Layouts that can place nested nodes within their parent override this
+        method. The default lays out nested nodes like all others, so they
+        are not guaranteed to lie within their parent.
+
+        Args:
+            nodes: IDs of all nodes
+            edges: (source, target) pairs of all edges
+            parents: IDs of the parent nodes of nested nodes
+
+        Returns:
+            Dictionary mapping node IDs to React Flow node properties with
+            absolute positions
+        """
+        return self.compute(nodes, edges)
+
+
+class LayeredLayout(Layout):
+    """
+    Layered (Sugiyama-style) layout for directed graphs.
+
+    Cycles are broken by reversing the back edges of a depth-first search,
+    nodes are assigned to layers by their longest path from a source, the
+    order within layers is improved with barycenter sweeps and coordinates
+    are pulled towards the nodes' neighbours while keeping a minimum spacing.
+    Edges spanning several layers are not routed through dummy nodes.
+
+    The defaults match the dagre settings of the demo application.
+
+    In incremental mode, nodes that were laid out before keep their positions
+    when the graph changes. New nodes are placed one layer after their
+    placed predecessors (or before their placed successors) near the mean
+    position of those neighbours, and only nodes of the same layer that would
+    overlap are moved aside. If more than half of the nodes are new, the
+    graph is laid out from scratch.
+
+    Nested nodes are laid out within their parent node. The children of
+    every parent are laid out first and the parent is sized to enclose them,
+    so it takes up more space in the layout of its own level. Graphs with
+    nested nodes are always laid out from scratch.
+
+    Attributes:
+        direction: Direction of the edges, 'TB', 'BT', 'LR' or 'RL'
+        node_width: Width reserved for every node
+        node_height: Height reserved for every node
+        node_sep: Space between neighbouring nodes of a layer
+        rank_sep: Space between layers
+        sweeps: Number of ordering and alignment sweeps
+        incremental: Whether positions of an earlier layout are kept
+        group_padding: Space between a parent node's border and its nested nodes
+    """
+
+    def __init__(self, direction: str = "TB", node_width: float = 150, node_height: float = 60,
+                 node_sep: float = 80, rank_sep: float = 120, sweeps: int = 4,
+                 incremental: bool = False, group_padding: float = 40) -> None:
+        """
+        Initialize the layout.
+
+        Args:
+            direction: Direction of the edges, 'TB' (default), 'BT', 'LR' or 'RL'
+            node_width: Width reserved for every node
+            node_height: Height reserved for every node
+            node_sep: Space between neighbouring nodes of a layer
+            rank_sep: Space between layers
+            sweeps: Number of ordering and alignment sweeps
+            incremental: Whether positions of an earlier layout are kept (default False)
+            group_padding: Space between a parent node's border and its nested nodes
+
+        Raises:
+            ValueError: If the direction is unknown
+        """
+        if direction not in HANDLE_POSITIONS:
+            raise ValueError(f"Unknown layout direction {direction!r}, expected one of {tuple(HANDLE_POSITIONS)}")
+        self.direction = direction
+        self.node_width = node_width
+        self.node_height = node_height
+        self.node_sep = node_sep
+        self.rank_sep = rank_sep
+        self.sweeps = sweeps
+        self.incremental = incremental
+        self.group_padding = group_padding
+
+    @property
+    def key(self) -> Optional[Tuple[Any, ...]]:
+        """Identify the layout by its class and options."""
+        return (type(self).__name__, self.direction, self.node_width, self.node_height,
+                self.node_sep, self.rank_sep, self.sweeps, self.incremental, self.group_padding)
+
+    def compute(self, nodes: Sequence[str], edges: Sequence[Tuple[str, str]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Compute positions and handle sides for all nodes.
+
+        Args:
+            nodes: IDs of all nodes
+            edges: (source, target) pairs of all edges
+
+        Returns:
+            Dictionary mapping node IDs to 'position', 'sourcePosition' and
+            'targetPosition' properties. Positions are top-left corners.
+        """
+        return self._compute(nodes, edges, {})
+
+    def compute_nested(self, nodes: Sequence[str], edges: Sequence[Tuple[str, str]],
+                       parents: Mapping[str, str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Compute positions and handle sides for all nodes, and sizes for parent nodes.
+
+        The children of every parent node are laid out on their own, with
+        edges between their descendants attributed to them. Every edge is
+        attributed once, to the children of the lowest common ancestor of its
+        nodes. The parent node is then sized to enclose them and laid out with
+        its siblings.
+
+        Args:
+            nodes: IDs of all nodes
+            edges: (source, target) pairs of all edges
+            parents: IDs of the parent nodes of nested nodes, parents that are
+                     not among the nodes are ignored
+
+        Returns:
+            Dictionary mapping node IDs to 'position', 'sourcePosition' and
+            'targetPosition' properties, and 'style' with the 'width' and
+            'height' of parent nodes. Positions are absolute top-left corners.
+        """
+        known = set(nodes)
+        parents = {name: parent for name, parent in parents.items() if name in known and parent in known}
+        children: Dict[Optional[str], List[str]] = {}
+        # Every node followed by its ancestors
+        ancestors: Dict[str, List[str]] = {}
+        for name in nodes:
+            children.setdefault(parents.get(name), []).append(name)
+            chain = [name]
+            while chain[-1] in parents:
+                chain.append(parents[chain[-1]])
+            ancestors[name] = chain
+        # Deeper parents first, since their size is needed to lay out their own parent
+        groups = sorted((name for name in children if name is not None), key=lambda name: -len(ancestors[name]))
+        group_edges: Dict[Optional[str], List[Tuple[str, str]]] = {}
+        for source, target in edges:
+            if source in ancestors and target in ancestors:
+                split = _split_edge(ancestors[source], ancestors[target])
+                if split is not None:
+                    group_edges.setdefault(split[0], []).append(split[1:])
+
+        local: Dict[str, Dict[str, Any]] = {}
+        sizes: Dict[str, Tuple[float, float]] = {}
+        for group in groups + [None]:
+            members = children[group]
+            local.update(self._compute(members, group_edges.get(group, []), sizes))
+            if group is not None:
+                width = max(local[name]["position"]["x"] + self._size(name, sizes)[0] for name in members)
+                height = max(local[name]["position"]["y"] + self._size(name, sizes)[1] for name in members)
+                sizes[group] = (width + 2 * self.group_padding, height + 2 * self.group_padding)
+
+        result: Dict[str, Dict[str, Any]] = {}
+        for name in sorted(nodes, key=lambda name: len(ancestors[name])):
+            properties = dict(local[name])
+            parent = parents.get(name)
+            if parent is not None:
+                origin = result[parent]["position"]
+                position = properties["position"]
+                properties["position"] = {"x": origin["x"] + self.group_padding + position["x"],
+                                          "y": origin["y"] + self.group_padding + position["y"]}
+            if name in sizes:
+                properties["style"] = {"width": sizes[name][0], "height": sizes[name][1]}
+            result[name] = properties
+        return {name: result[name] for name in nodes}
+
+    def _compute(self, nodes: Sequence[str], edges: Sequence[Tuple[str, str]],
+                 sizes: Dict[str, Tuple[float, float]]) -> Dict[str, Dict[str, Any]]:
+        """Lay out nodes whose (width, height) is given in sizes, or node_width and node_height otherwise."""
+        successors, predecessors = self._acyclic_adjacency(nodes, edges)
+        ranks = self._assign_ranks(successors, predecessors)
+        layers = self._order_layers(ranks, successors, predecessors)
+
+        horizontal = self.direction in ("LR", "RL")
+        # Extent of every node along the edges (depth) and across them (breadth)
+        depths, breadths = [], []
+        for name in nodes:
+            width, height = self._size(name, sizes)
+            depths.append(width if horizontal else height)
+            breadths.append(height if horizontal else width)
+        offsets = self._assign_offsets(layers, successors, predecessors, breadths)
+
+        # Every layer is as deep as its deepest node
+        layer_starts = [0.0] * len(layers)
+        layer_depths = [max((depths[node] for node in layer), default=0.0) for layer in layers]
+        start = 0.0
+        for rank in (range(len(layers)) if self.direction in ("TB", "LR") else range(len(layers) - 1, -1, -1)):
+            layer_starts[rank] = start
+            start += layer_depths[rank] + self.rank_sep
+        source_position, target_position = HANDLE_POSITIONS[self.direction]
+
+        result = {}
+        for index, name in enumerate(nodes):
+            rank = ranks[index]
+            depth = layer_starts[rank] + (layer_depths[rank] - depths[index]) / 2
+            offset = offsets[index]
+            result[name] = {
+                "position": {"x": depth, "y": offset} if horizontal else {"x": offset, "y": depth},
+                "sourcePosition": source_position,
+                "targetPosition": target_position,
+            }
+        return result
+
+    def _size(self, name: str, sizes: Dict[str, Tuple[float, float]]) -> Tuple[float, float]:
+        """Return the (width, height) of a node."""
+        return sizes.get(name, (self.node_width, self.node_height))
+
+    def update(self, nodes: Sequence[str], edges: Sequence[Tuple[str, str]],
+               previous: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Place new nodes around the positions of an earlier layout.
+
+        Args:
+            nodes: IDs of all nodes
+            edges: (source, target) pairs of all edges
+            previous: Result of this layout for an earlier version of the graph
+
+        Returns:
+            Dictionary mapping node IDs to 'position', 'sourcePosition' and
+            'targetPosition' properties. Without incremental mode, or if more
+            than half of the nodes are new, the graph is laid out from scratch.
+        """
+        known = [name for name in nodes if "position" in previous.get(name, {})]
+        if not self.incremental or 2 * len(known) < len(nodes):
+            return self.compute(nodes, edges)
+
+        horizontal = self.direction in ("LR", "RL")
+        depth_axis, offset_axis = ("x", "y") if horizontal else ("y", "x")
+        # Depth coordinates grow along the edges for TB/LR and shrink for BT/RL
+        sign = 1 if self.direction in ("TB", "LR") else -1
+        rank_step = (self.node_width if horizontal else self.node_height) + self.rank_sep
+        step = (self.node_height if horizontal else self.node_width) + self.node_sep
+
+        depths: Dict[str, float] = {}
+        offsets: Dict[str, float] = {}
+        rows: Dict[float, List[str]] = {}
+        for name in known:
+            position = previous[name]["position"]
+            depths[name], offsets[name] = position[depth_axis], position[offset_axis]
+            rows.setdefault(round(depths[name], 6), []).append(name)
+
+        predecessors: Dict[str, List[str]] = {name: [] for name in nodes}
+        successors: Dict[str, List[str]] = {name: [] for name in nodes}
+        for source, target in edges:
+            if source != target and source in successors and target in predecessors:
+                successors[source].append(target)
+                predecessors[target].append(source)
+
+        origin = min((depth * sign for depth in depths.values()), default=0.0) * sign
+        remaining = [name for name in nodes if name not in depths]
+        while remaining:
+            deferred = []
+            for name in remaining:
+                sources = [other for other in predecessors[name] if other in depths]
+                targets = [other for other in successors[name] if other in depths]
+                if sources:
+                    depth = (max(depths[other] * sign for other in sources) + rank_step) * sign
+                elif targets:
+                    depth = (min(depths[other] * sign for other in targets) - rank_step) * sign
+                else:
+                    deferred.append(name)
+                    continue
+                self._insert(name, depth, _mean(offsets[other] for other in sources or targets),
+                             step, depths, offsets, rows)
+
+            if len(deferred) == len(remaining):
+                # Nothing connects the remaining nodes to placed ones, start a new
+                # component at the end of the first layer.
+                name = deferred.pop(0)
+                row = rows.get(round(origin, 6), [])
+                self._insert(name, origin, max((offsets[other] for other in row), default=-step) + step,
+                             step, depths, offsets, rows)
+            remaining = deferred
+
+        source_position, target_position = HANDLE_POSITIONS[self.direction]
+        return {
+            name: {
+                "position": ({"x": depths[name], "y": offsets[name]} if horizontal
+                             else {"x": offsets[name], "y": depths[name]}),
+                "sourcePosition": source_position,
+                "targetPosition": target_position,
+            }
+            for name in nodes
+        }
+
+    @staticmethod
+    def _insert(name: str, depth: float, offset: float, step: float, depths: Dict[str, float],
+                offsets: Dict[str, float], rows: Dict[float, List[str]]) -> None:
+        """Add a node to a layer and move overlapping nodes of that layer aside."""
+        row = rows.setdefault(round(depth, 6), [])
+        depths[name], offsets[name] = depth, offset
+        row.append(name)
+        row.sort(key=lambda other: offsets[other])
+        for other, spread in zip(row, _spread([offsets[other] for other in row], step)):
+            offsets[other] = spread
+
+    @staticmethod
+    def _acyclic_adjacency(nodes: Sequence[str],
+                           edges: Iterable[Tuple[str, str]]) -> Tuple[List[List[int]], List[List[int]]]:
+        """
+        Build successor and predecessor lists with all cycles removed.
+
+        Self-loops and duplicate edges are dropped, back edges of a depth-first
+        search in node order are reversed.
+        """
+        index = {name: position for position, name in enumerate(nodes)}
+        adjacency: List[List[int]] = [[] for _ in nodes]
+        seen = set()
+        for source, target in edges:
+            pair = (index.get(source), index.get(target))
+            if None in pair or pair[0] == pair[1] or pair in seen:
+                continue
+            seen.add(pair)
+            adjacency[pair[0]].append(pair[1])
+
+        successors: List[List[int]] = [[] for _ in nodes]
+        predecessors: List[List[int]] = [[] for _ in nodes]
+        # 0: not visited, 1: on the DFS stack, 2: finished
+        status = [0] * len(nodes)
+        for root in range(len(nodes)):
+            if status[root]:
+                continue
+            status[root] = 1
+            stack = [(root, iter(adjacency[root]))]
+            while stack:
+                node, children = stack[-1]
+                for child in children:
+                    source, target = (child, node) if status[child] == 1 else (node, child)
+                    successors[source].append(target)
+                    predecessors[target].append(source)
+                    if status[child] == 0:
+                        status[child] = 1
+                        stack.append((child, iter(adjacency[child])))
+                        break
+                else:
+                    status[node] = 2
+                    stack.pop()
+        return successors, predecessors
+
+    @staticmethod
+    def _assign_ranks(successors: List[List[int]], predecessors: List[List[int]]) -> List[int]:
+        """Assign every node the length of the longest path from a source to it."""
+        ranks = [0] * len(successors)
+        pending = [len(sources) for sources in predecessors]
+        queue = [node for node, count in enumerate(pending) if count == 0]
+        for node in queue:
+            for child in successors[node]:
+                ranks[child] = max(ranks[child], ranks[node] + 1)
+                pending[child] -= 1
+                if pending[child] == 0:
+                    queue.append(child)
+        return ranks
+
+    def _order_layers(self, ranks: List[int], successors: List[List[int]],
+                      predecessors: List[List[int]]) -> List[List[int]]:
+        """Group nodes by rank and reduce crossings with barycenter sweeps."""
+        layers: List[List[int]] = [[] for _ in range(max(ranks, default=-1) + 1)]
+        for node, rank in enumerate(ranks):
+            layers[rank].append(node)
+
+        # Relative position of every node within its layer
+        positions = [0.0] * len(ranks)
+
+        def update(layer: List[int]) -> None:
+            for position, node in enumerate(layer):
+                positions[node] = position / len(layer)
+
+        for layer in layers:
+            update(layer)
+
+        for sweep in range(self.sweeps):
+            downward = sweep % 2 == 0
+            neighbours = predecessors if downward else successors
+            order = range(1, len(layers)) if downward else range(len(layers) - 2, -1, -1)
+            for rank in order:
+                layer = layers[rank]
+                layer.sort(key=lambda node: _mean(positions[other] for other in neighbours[node])
+                           if neighbours[node] else positions[node])
+                update(layer)
+        return layers
+
+    def _assign_offsets(self, layers: List[List[int]], successors: List[List[int]],
+                        predecessors: List[List[int]], breadths: List[float]) -> List[float]:
+        """Compute the coordinate of every node's top-left corner across the rank axis."""
+        # Nodes are aligned by their centers, which are kept apart by half of both breadths
+        centers = [0.0] * len(breadths)
+        for layer in layers:
+            gaps = self._gaps(layer, breadths)
+            position = -sum(gaps) / 2
+            for node, gap in zip(layer, [0.0] + gaps):
+                position += gap
+                centers[node] = position
+
+        for sweep in range(self.sweeps):
+            downward = sweep % 2 == 0
+            neighbours = predecessors if downward else successors
+            order = layers[1:] if downward else layers[-2::-1]
+            for layer in order:
+                desired = [
+                    _mean(centers[other] for other in neighbours[node]) if neighbours[node] else centers[node]
+                    for node in layer
+                ]
+                for node, center in zip(layer, _spread(desired, self._gaps(layer, breadths))):
+                    centers[node] = center
+
+        offsets = [center - breadth / 2 for center, breadth in zip(centers, breadths)]
+        minimum = min(offsets, default=0.0)
+        return [offset - minimum for offset in offsets]
+
+    def _gaps(self, layer: List[int], breadths: List[float]) -> List[float]:
+        """Return the minimum distances between the centers of neighbouring nodes of a layer."""
+        return [(breadths[first] + breadths[second]) / 2 + self.node_sep for first, second in zip(layer, layer[1:])]
+
+
+class LayoutCache:
+    """
+    Cache of computed layouts, keyed by a hash of the graph and layout options.
+
+    Results are kept in an in-memory LRU tier and, if a directory is given,
+    also stored as one JSON file per key. Processes sharing the directory
+    (worker restarts, replicas) reuse each other's layouts instead of
+    recomputing them. Only layouts with a key are cached.
+
+    Attributes:
+        max_size: Maximum number of layouts kept in memory
+        directory: Directory of the on-disk tier, None to keep layouts in memory only
+    """
+
+    def __init__(self, max_size: int = 128, directory: Optional[str] = None) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of layouts kept in memory
+            directory: Directory of the on-disk tier, created if it does not exist
+        """
+        self.max_size = max_size
+        self.directory = directory
+        self._entries: "OrderedDict[str, Dict[str, Dict[str, Any]]]" = OrderedDict()
+        self._lock = Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(layout: Layout, nodes: Sequence[str], edges: Sequence[Tuple[str, str]],
+            parents: Optional[Mapping[str, str]] = None) -> Optional[str]:
+        """
+        Compute the cache key of a layout for a graph.
+
+        Args:
+            layout: Layout to compute
+            nodes: IDs of all nodes
+            edges: (source, target) pairs of all edges
+            parents: IDs of the parent nodes of nested nodes, if any
+
+        Returns:
+            Hex SHA-256 digest of the layout options, nodes, edges and parents,
+            or None if the layout cannot be cached
+        """
+        if layout.key is None:
+            return None
+        digest = hashlib.sha256(repr(layout.key).encode("utf-8"))
+        digest.update(json.dumps([list(nodes), [list(edge) for edge in edges]]).encode("utf-8"))
+        if parents:
+            digest.update(json.dumps(sorted(parents.items())).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Return a cached layout.
+
+        Args:
+            key: Cache key as returned by key()
+
+        Returns:
+            The node properties computed by the layout, or None if the key is unknown
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as handle:
+                value = json.load(handle)
+        except (OSError, ValueError):
+            return None  # Missing or unreadable files are cache misses
+        self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Store a layout.
+
+        Args:
+            key: Cache key as returned by key()
+            value: Node properties computed by the layout, must be JSON serializable
+                   to be stored on disk
+        """
+        self._remember(key, value)
+        if self.directory is None:
+            return
+        path = None
+        try:
+            handle, path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(handle, "w", encoding="utf-8") as file:
+                json.dump(value, file)
+            # Readers only ever see complete files
+            os.replace(path, self._path(key))
+        except (OSError, TypeError, ValueError):
+            # The on-disk tier is best effort, the layout stays cached in memory
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle the cache without its lock."""
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore a pickled cache with a new lock."""
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def clear(self) -> None:
+        """Remove all layouts from the in-memory tier."""
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key: str, value: Dict[str, Dict[str, Any]]) -> None:
+        """Add a layout to the in-memory tier, evicting the least recently used one."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        """Return the file of a key in the on-disk tier."""
+        return os.path.join(self.directory or "", f"{key}.json")
+
+
+# Layouts that can be selected by name
+LAYOUTS = {
+    "layered": LayeredLayout,
+}
+
+
+def resolve_layout(layout: Union[str, Layout]) -> Layout:
+    """
+    Return the layout instance for a layout name or instance.
+
+    Args:
+        layout: Name of a layout in LAYOUTS, using its default options, or a Layout instance
+
+    Returns:
+        The layout instance
+
+    Raises:
+        ValueError: If the layout is unknown
+    """
+    if isinstance(layout, Layout):
+        return layout
+    if isinstance(layout, str) and layout in LAYOUTS:
+        return LAYOUTS[layout]()
+    raise ValueError(f"Unknown layout {layout!r}, expected a Layout or one of {tuple(LAYOUTS)}")
+
+
+def _mean(values: Iterable[float]) -> float:
+    """Return the arithmetic mean of non-empty values."""
+    total = 0.0
+    count = 0
+    for value in values:
+        total += value
+        count += 1
+    return total / count
+
+
+def _split_edge(source: List[str], target: List[str]) -> Optional[Tuple[Optional[str], str, str]]:
+    """
+    Find the group an edge between two nested nodes is laid out in.
+
+    Args:
+        source: Source node followed by its ancestors
+        target: Target node followed by its ancestors
+
+    Returns:
+        The lowest common ancestor of both nodes (None for the top level) and
+        its children containing source and target, or None if the edge stays
+        within one node
+    """
+    common = set(target)
+    for index, name in enumerate(source):
+        if name in common:
+            if index == 0 or name == target[0]:
+                return None
+            return name, source[index - 1], target[target.index(name) - 1]
+    return None, source[-1], target[-1]
+
+
+def _spread(desired: List[float], step: Union[float, Sequence[float]]) -> List[float]:
+    """
+    Move ordered coordinates as little as possible so neighbours are at least step apart.
+
+    Averages a left-to-right and a right-to-left placement, both of which
+    keep the minimum distance and thus so does their mean.
+
+    Args:
+        desired: Ordered coordinates
+        step: Minimum distance of all neighbours, or of every pair of neighbours
+    """
+    gaps = [step] * (len(desired) - 1) if isinstance(step, (int, float)) else list(step)
+    left = list(desired)
+    for position in range(1, len(left)):
+        left[position] = max(left[position], left[position - 1] + gaps[position - 1])
+    right = list(desired)
+    for position in range(len(right) - 2, -1, -1):
+        right[position] = min(right[position], right[position + 1] - gaps[position])
+    return [(first + second) / 2 for first, second in zip(left, right)]
@@ -0,0 +1,171 @@
+"""Type stubs for the layout algorithms."""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Type, Union
+
+HANDLE_POSITIONS: Dict[str, Tuple[str, str]]
+
+
+class Layout(ABC):
+    incremental: bool
+
+    @property
+    def key(self) -> Optional[Tuple[Any, ...]]: ...
+
+    @abstractmethod
+    def compute(
+        self, nodes: Sequence[str], edges: Sequence[Tuple[str, str]]
+    ) -> Dict[str, Dict[str, Any]]: ...
+
+    def update(
+        self,
+        nodes: Sequence[str],
+        edges: Sequence[Tuple[str, str]],
+        previous: Dict[str, Dict[str, Any]],
+    ) -> Dict[str, Dict[str, Any]]: ...
+
+    def compute_nested(
+        self,
+        nodes: Sequence[str],
+        edges: Sequence[Tuple[str, str]],
+        parents: Mapping[str, str],
+    ) -> Dict[str, Dict[str, Any]]: ...
+
+
+class LayeredLayout(Layout):
+    direction: str
+    node_width: float
+    node_height: float
+    node_sep: float
+    rank_sep: float
+    sweeps: int
+    incremental: bool
+    group_padding: float
+
+    def __init__(
+        self,
+        direction: str = ...,
+        node_width: float = ...,
+        node_height: float = ...,
+        node_sep: float = ...,
+        rank_sep: float = ...,
+        sweeps: int = ...,
+        incremental: bool = ...,
+        group_padding: float = ...,
+    ) -> None: ...
+
+    @property
+    def key(self) -> Optional[Tuple[Any, ...]]: ...
+
+    def compute(
+        self, nodes: Sequence[str], edges: Sequence[Tuple[str, str]]
+    ) -> Dict[str, Dict[str, Any]]: ...
+
+    def update(
+        self,
+        nodes: Sequence[str],
+        edges: Sequence[Tuple[str, str]],
+        previous: Dict[str, Dict[str, Any]],
+    ) -> Dict[str, Dict[str, Any]]: ...
+
+    def compute_nested(
+        self,
+        nodes: Sequence[str],
+        edges: Sequence[Tuple[str, str]],
+        parents: Mapping[str, str],
+    ) -> Dict[str, Dict[str, Any]]: ...
+
+    def _compute(
+        self,
+        nodes: Sequence[str],
+        edges: Sequence[Tuple[str, str]],
+        sizes: Dict[str, Tuple[float, float]],
+    ) -> Dict[str, Dict[str, Any]]: ...
+
+    def _size(self, name: str, sizes: Dict[str, Tuple[float, float]]) -> Tuple[float, float]: ...
+
+    @staticmethod
+    def _insert(
+        name: str,
+        depth: float,
+        offset: float,
+        step: float,
+        depths: Dict[str, float],
+        offsets: Dict[str, float],
+        rows: Dict[float, List[str]],
+    ) -> None: ...
+
+    @staticmethod
+    def _acyclic_adjacency(
+        nodes: Sequence[str], edges: Iterable[Tuple[str, str]]
+    ) -> Tuple[List[List[int]], List[List[int]]]: ...
+
+    @staticmethod
+    def _assign_ranks(
+        successors: List[List[int]], predecessors: List[List[int]]
+    ) -> List[int]: ...
+
+    def _order_layers(
+        self,
+        ranks: List[int],
+        successors: List[List[int]],
+        predecessors: List[List[int]],
+    ) -> List[List[int]]: ...
+
+    def _assign_offsets(
+        self,
+        layers: List[List[int]],
+        successors: List[List[int]],
+        predecessors: List[List[int]],
+        breadths: List[float],
+    ) -> List[float]: ...
+
+    def _gaps(self, layer: List[int], breadths: List[float]) -> List[float]: ...
+
+
+class LayoutCache:
+    max_size: int
+    directory: Optional[str]
+
+    def __init__(
+        self, max_size: int = ..., directory: Optional[str] = ...
+    ) -> None: ...
+
+    @staticmethod
+    def key(
+        layout: Layout,
+        nodes: Sequence[str],
+        edges: Sequence[Tuple[str, str]],
+        parents: Optional[Mapping[str, str]] = ...,
+    ) -> Optional[str]: ...
+
+    def get(self, key: str) -> Optional[Dict[str, Dict[str, Any]]]: ...
+
+    def put(self, key: str, value: Dict[str, Dict[str, Any]]) -> None: ...
+
+    def __getstate__(self) -> Dict[str, Any]: ...
+
+    def __setstate__(self, state: Dict[str, Any]) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def _remember(self, key: str, value: Dict[str, Dict[str, Any]]) -> None: ...
+
+    def _path(self, key: str) -> str: ...
+
+
+LAYOUTS: Dict[str, Type[Layout]]
+
+
+def resolve_layout(layout: Union[str, Layout]) -> Layout: ...
+
+
+def _mean(values: Iterable[float]) -> float: ...
+
+
+def _split_edge(
+    source: List[str], target: List[str]
+) -> Optional[Tuple[Optional[str], str, str]]: ...
+
+
+def _spread(desired: List[float], step: Union[float, Sequence[float]]) -> List[float]: ...
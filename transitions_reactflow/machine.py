@@ -1,6 +1,13 @@
 """React Flow state machine extensions."""
 
-from typing import Any
+import asyncio
+import copyreg
+import json
+from concurrent.futures import Executor
+from functools import partial
+from time import perf_counter
+from typing import Any, Dict, Optional
+from transitions.core import Transition, listify
 from transitions.extensions import (
     GraphMachine,
     HierarchicalGraphMachine,
@@ -9,7 +16,9 @@ from transitions.extensions import (
     AsyncGraphMachine,
     HierarchicalAsyncGraphMachine,
 )
-from .diagrams_reactflow import ReactFlowGraph
+from transitions.extensions.diagrams import TransitionGraphSupport
+from transitions.extensions.nesting import NestedTransition
+from .diagrams_reactflow import ReactFlowGraph, _copy_output
 
 
 class ReactFlowMixin:
@@ -17,9 +26,62 @@ class ReactFlowMixin:
     Mixin to add React Flow graph generation support to state machines.
 
     This mixin provides the core functionality for integrating ReactFlowGraph
-    with any transitions machine type. It handles the graph engine initialization.
+    with any transitions machine type. It handles the graph engine initialization
+    and tracks a graph version that changes whenever the machine topology changes.
+    Added states and added or removed transitions are passed on to the model
+    graphs as deltas rather than regenerating every graph from scratch. All
+    model graphs share one node/edge index and only differ in their style overlay.
+
+    With lazy_graph=True, model graphs are neither created nor updated during
+    transitions. A model's graph is only materialized on its first get_graph()
+    call and its active state is synchronized whenever the graph is read.
     """
 
+    # The shared node/edge index is rebuilt after unpickling
+    _pickle_blacklist = GraphMachine._pickle_blacklist + ["_graph_topology"]
+    # Whether the node/edge index is replaced by a changed copy instead of being changed in place
+    _graph_snapshots = False
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Initialize the graph version before the machine adds its states and transitions.
+
+        Args:
+            *args: Positional arguments passed to the machine
+            **kwargs: Keyword arguments passed to the machine.
+                     'lazy_graph' (default False) disables all graph bookkeeping
+                     during transitions. 'layout_cache' (default None) is a
+                     LayoutCache for layouts computed by get_graph(layout=...).
+                     'graph_stats' (default None) is a GraphStats that records
+                     timings and counters of graph generation. 'telemetry'
+                     (default None) is a TransitionRecorder that counts
+                     executed transitions and their durations per edge.
+        """
+        self._graph_version = 0
+        self._graph_updates_suspended = 0
+        self.lazy_graph = kwargs.pop('lazy_graph', False)
+        self.layout_cache = kwargs.pop('layout_cache', None)
+        self.graph_stats = kwargs.pop('graph_stats', None)
+        self.telemetry = kwargs.pop('telemetry', None)
+        if self.lazy_graph:
+            # Transitions of the plain transition class do not style the model graph
+            self.transition_cls = _without_graph_support(self.transition_cls)  # type: ignore
+        else:
+            self.transition_cls = _with_overlay_trigger(self.transition_cls)  # type: ignore
+        if self.telemetry is not None:
+            self.transition_cls = _with_telemetry(self.transition_cls)  # type: ignore
+        super().__init__(*args, **kwargs)
+
+    @property
+    def graph_version(self) -> int:
+        """
+        Version of the machine topology.
+
+        Incremented by add_states, add_transition and remove_transition.
+        Cached graphs are invalidated whenever it changes, and clients can use it as an ETag.
+        """
+        return self._graph_version
+
     def _init_graphviz_engine(self, graph_engine: str) -> type:
         """
         Initialize the graph engine.
@@ -34,6 +96,530 @@ class ReactFlowMixin:
             return ReactFlowGraph
         return super()._init_graphviz_engine(graph_engine)  # type: ignore
 
+    def add_states(self, states: Any, on_enter: Any = None, on_exit: Any = None,
+                   ignore_invalid_triggers: Any = None, **kwargs: Any) -> None:
+        """Add new state(s) and apply them to the model graphs."""
+        if not self._uses_react_flow_graphs():
+            self._graph_version += 1
+            super().add_states(  # type: ignore
+                states, on_enter=on_enter, on_exit=on_exit,
+                ignore_invalid_triggers=ignore_invalid_triggers, **kwargs
+            )
+            return
+
+        previous_version = self._graph_version
+        # Auto transitions are added while the states are registered and
+        # must not be applied one by one.
+        self._graph_updates_suspended += 1
+        try:
+            # Skip GraphMachine, which regenerates every model graph from scratch
+            super(GraphMachine, self).add_states(  # type: ignore
+                states, on_enter=on_enter, on_exit=on_exit,
+                ignore_invalid_triggers=ignore_invalid_triggers, **kwargs
+            )
+        finally:
+            self._graph_updates_suspended -= 1
+        self._graph_version += 1
+
+        if not self._graph_updates_suspended:
+            # Enum names are stored by their name, whether they are passed directly or in a dict
+            names = [state['name'] if isinstance(state, dict) else state for state in listify(states)]
+            names = [getattr(name, 'name', name) for name in names]
+            graph = self._any_model_graph()
+            if graph is not None:
+                graph.update_states(names, previous_version)
+
+    def add_transition(self, trigger: str, source: Any, dest: Any = None, conditions: Any = None,
+                       unless: Any = None, before: Any = None, after: Any = None,
+                       prepare: Any = None, **kwargs: Any) -> None:
+        """Add a new transition and apply it to the model graphs."""
+        if not self._uses_react_flow_graphs():
+            self._graph_version += 1
+            super().add_transition(  # type: ignore
+                trigger, source, dest, conditions=conditions, unless=unless,
+                before=before, after=after, prepare=prepare, **kwargs
+            )
+            return
+
+        previous_version = self._graph_version
+        super(GraphMachine, self).add_transition(  # type: ignore
+            trigger, source, dest, conditions=conditions, unless=unless,
+            before=before, after=after, prepare=prepare, **kwargs
+        )
+        self._graph_version += 1
+        self._update_graph_trigger(trigger, previous_version)
+
+    def remove_transition(self, trigger: str, source: Any = "*", dest: Any = "*") -> None:
+        """Remove transition(s) and apply the removal to the model graphs."""
+        if not self._uses_react_flow_graphs():
+            self._graph_version += 1
+            super().remove_transition(trigger, source, dest)  # type: ignore
+            return
+
+        previous_version = self._graph_version
+        super(GraphMachine, self).remove_transition(trigger, source, dest)  # type: ignore
+        self._graph_version += 1
+        self._update_graph_trigger(trigger, previous_version)
+
+    def add_model(self, model: Any, initial: Any = None, **kwargs: Any) -> None:
+        """Add model(s) to the machine, whose graphs reuse the machine's node/edge index."""
+        if not (self.lazy_graph or self._uses_react_flow_graphs()):
+            super().add_model(model, initial, **kwargs)  # type: ignore
+            return
+
+        models = listify(model)
+        # Skip GraphMachine, which generates the graph of every added model
+        super(GraphMachine, self).add_model(models, initial, **kwargs)  # type: ignore
+        for mod in models:
+            mod = self if mod is self.self_literal else mod  # type: ignore
+            if hasattr(mod, "get_graph"):
+                raise AttributeError(
+                    "Model already has a get_graph attribute. Graph retrieval cannot be bound."
+                )
+            setattr(mod, "get_graph", partial(self._get_graph, mod))
+            if not self.lazy_graph:
+                # Build the index, unless another model already did, without converting
+                # it to React Flow dictionaries
+                _ = mod.get_graph(title=self.title, format="compact")  # type: ignore
+
+    def get_graph_overlay(self, model: Any = None, merge_parallel: bool = False) -> Dict[str, Any]:
+        """
+        Return the style overlay (active state, previous transition) of a model's graph.
+
+        Args:
+            model: Model whose overlay should be returned, defaults to the first model
+            merge_parallel: Whether the overlay is applied to get_graph(merge_parallel=True)
+
+        Returns:
+            Overlay dictionary as returned by ReactFlowGraph.get_overlay
+        """
+        model = self.models[0] if model is None else model  # type: ignore
+        return self._get_model_graph(model).get_overlay(merge_parallel)
+
+    def get_telemetry_overlay(self) -> Dict[str, Any]:
+        """
+        Return the transitions recorded by the machine's telemetry as an overlay of graph edges.
+
+        Returns:
+            Overlay dictionary as returned by TransitionRecorder.to_overlay,
+            keyed by the edge IDs of get_graph()
+
+        Raises:
+            ValueError: If the machine has no telemetry
+        """
+        if self.telemetry is None:
+            raise ValueError("The machine has no telemetry, pass telemetry=TransitionRecorder()")
+        graph = self._get_model_graph(self.models[0])  # type: ignore
+        return self.telemetry.to_overlay(graph._get_topology().get_records()["edges"])
+
+    def get_graph_children(self, state: Any, model: Any = None, **kwargs: Any) -> Any:
+        """
+        Return the nested states of a collapsed state of a model's graph.
+
+        Args:
+            state: Name or Enum of the state to expand
+            model: Model whose graph should be used, defaults to the first model
+            **kwargs: Options of the view passed to ReactFlowGraph.get_children
+
+        Returns:
+            Graph data as returned by ReactFlowGraph.get_children
+        """
+        model = self.models[0] if model is None else model  # type: ignore
+        return self._get_model_graph(model).get_children(state, **kwargs)
+
+    def _create_transition(self, *args: Any, **kwargs: Any) -> Any:
+        """Create transitions from the instance's transition class, which differs for lazy machines."""
+        return self.transition_cls(*args, **kwargs)  # type: ignore
+
+    def _get_graph(self, model: Any, title: Any = None, force_new: bool = False,
+                   show_roi: bool = False, **kwargs: Any) -> Any:
+        """
+        Return the graph data of a model, creating its graph if necessary.
+
+        Args:
+            model: The model this method is bound to
+            title: Title of the graph
+            force_new: Whether the graph should be regenerated
+            show_roi: Whether only the region of interest should be rendered
+            **kwargs: Additional options passed to ReactFlowGraph.get_graph, e.g. 'format',
+                      'roi_state' for an explicit region of interest or 'radius'
+
+        Returns:
+            The graph data of the model
+        """
+        if not self._uses_react_flow_graphs():
+            return super()._get_graph(model, title, force_new, show_roi)  # type: ignore
+        if force_new:
+            graph = self.model_graphs.pop(id(model), None)  # type: ignore
+            if graph is not None:
+                # Regenerating an existing graph also rebuilds the shared index,
+                # while graphs of newly added models reuse it.
+                graph.invalidate()
+        graph = self._get_model_graph(model)
+        if show_roi:
+            kwargs["roi_state"] = getattr(model, self.model_attribute, None)  # type: ignore
+        return graph.get_graph(title=title, **kwargs)
+
+    def _get_model_graph(self, model: Any) -> ReactFlowGraph:
+        """
+        Return the graph of a model, creating it if it does not exist yet.
+
+        Args:
+            model: Model whose graph should be returned
+
+        Returns:
+            The model's graph with an up-to-date active state
+        """
+        graph = self.model_graphs.get(id(model))  # type: ignore
+        if graph is None:
+            graph = self.model_graphs[id(model)] = self.graph_cls(self)  # type: ignore
+            if not self.lazy_graph:
+                try:
+                    graph.set_node_style(getattr(model, self.model_attribute), "active")  # type: ignore
+                except AttributeError:
+                    pass  # The model has not entered its initial state yet
+        if self.lazy_graph:
+            graph.set_active_state(getattr(model, self.model_attribute))  # type: ignore
+        return graph
+
+    def _uses_react_flow_graphs(self) -> bool:
+        """Whether model graphs are ReactFlowGraphs that can be updated incrementally."""
+        return issubclass(self.graph_cls, ReactFlowGraph)  # type: ignore
+
+    def _update_graph_trigger(self, trigger: str, previous_version: int) -> None:
+        """Apply a changed trigger to all model graphs."""
+        if self._graph_updates_suspended:
+            return
+        graph = self._any_model_graph()
+        if graph is not None:
+            graph.update_trigger(trigger, previous_version)
+
+    def _any_model_graph(self) -> Any:
+        """Return any model graph; since they share their node/edge index, updating one updates all."""
+        return next(iter(self.model_graphs.values()), None)  # type: ignore
+
+
+def _without_graph_support(transition_cls: type) -> type:
+    """
+    Return the closest base of a transition class that does not update graphs.
+
+    Args:
+        transition_cls: Transition class of a graph machine
+
+    Returns:
+        The class itself if it has no graph support, otherwise its first
+        base class that is a Transition without graph support
+    """
+    if not issubclass(transition_cls, TransitionGraphSupport):
+        return transition_cls
+    return next(
+        base for base in transition_cls.__mro__
+        if issubclass(base, Transition) and not issubclass(base, TransitionGraphSupport)
+    )
+
+
+def _with_overlay_trigger(transition_cls: type) -> type:
+    """
+    Return a subclass of a transition class that passes its trigger to the model graph.
+
+    Transitions mark the previous transition on the graph by its source and
+    destination only. The subclass names the trigger first, so only its edge
+    is marked when several triggers connect both states.
+
+    Args:
+        transition_cls: Transition class of the machine
+
+    Returns:
+        Subclass with the same name whose _change_state names the trigger
+    """
+    overlay = _OVERLAY_TRANSITION_CLASSES.get(transition_cls)
+    if overlay is not None:
+        return overlay
+    if asyncio.iscoroutinefunction(transition_cls._change_state):  # type: ignore
+        async def _change_state(self: Any, event_data: Any) -> None:
+            _expect_trigger(event_data)
+            await super(overlay, self)._change_state(event_data)
+    else:
+        def _change_state(self: Any, event_data: Any) -> None:  # type: ignore
+            _expect_trigger(event_data)
+            super(overlay, self)._change_state(event_data)
+
+    overlay = _DerivedTransitionType(transition_cls.__name__, (transition_cls,), {
+        "_change_state": _change_state, "_derive": staticmethod(_with_overlay_trigger), "__module__": __name__})
+    _OVERLAY_TRANSITION_CLASSES[transition_cls] = overlay
+    return overlay
+
+
+_OVERLAY_TRANSITION_CLASSES: Dict[type, type] = {}
+
+
+def _expect_trigger(event_data: Any) -> None:
+    """Name the trigger of a transition to the React Flow graph of its model, if it has one."""
+    graph = event_data.machine.model_graphs.get(id(event_data.model))
+    if isinstance(graph, ReactFlowGraph):
+        graph.expect_trigger(event_data.event.name)
+
+
+def _with_telemetry(transition_cls: type) -> type:
+    """
+    Return a subclass of a transition class that records executed transitions.
+
+    Successful transitions are passed to the machine's telemetry with the
+    node IDs of their source and destination and the time their execution took.
+
+    Args:
+        transition_cls: Transition class of the machine
+
+    Returns:
+        Subclass with the same name whose execute records the transition
+    """
+    recorded = _RECORDED_TRANSITION_CLASSES.get(transition_cls)
+    if recorded is not None:
+        return recorded
+    if asyncio.iscoroutinefunction(transition_cls.execute):  # type: ignore
+        async def execute(self: Any, event_data: Any) -> bool:
+            start = perf_counter()
+            result = await super(recorded, self).execute(event_data)
+            if result:
+                _record_transition(self, event_data, perf_counter() - start)
+            return result
+    else:
+        def execute(self: Any, event_data: Any) -> bool:  # type: ignore
+            start = perf_counter()
+            result = super(recorded, self).execute(event_data)
+            if result:
+                _record_transition(self, event_data, perf_counter() - start)
+            return result
+
+    recorded = _DerivedTransitionType(transition_cls.__name__, (transition_cls,), {
+        "execute": execute, "_derive": staticmethod(_with_telemetry), "__module__": __name__})
+    _RECORDED_TRANSITION_CLASSES[transition_cls] = recorded
+    return recorded
+
+
+class _DerivedTransitionType(type):
+    """
+    Metaclass of the classes created by _with_overlay_trigger and _with_telemetry.
+
+    They are pickled as a call of the function in their _derive attribute with their base class.
+    """
+
+
+_RECORDED_TRANSITION_CLASSES: Dict[type, type] = {}
+copyreg.pickle(_DerivedTransitionType, lambda cls: (cls._derive, (cls.__bases__[0],)))
+
+
+def _record_transition(transition: Any, event_data: Any, seconds: float) -> None:
+    """Pass an executed transition to the machine's telemetry."""
+    machine = event_data.machine
+    source = transition.source
+    target = transition.dest or source
+    if isinstance(transition, NestedTransition):
+        # Nested transitions are named relative to the scope they are executed in, like in the markup
+        scope = machine.get_global_name()
+        if scope:
+            separator = machine.state_cls.separator
+            source = f"{scope}{separator}{source}"
+            target = f"{scope}{separator}{target}"
+    machine.telemetry.record(source, target, event_data.event.name, seconds)
+
+
+class _DetachedGraph:
+    """Stand-in for the model graphs of lazy async machines, which ignores styling."""
+
+    def reset_styling(self) -> None:
+        pass
+
+    def set_previous_transition(self, src: str, dst: Optional[str]) -> None:
+        pass
+
+
+class _LazyModelGraphs(dict):
+    """
+    Model graphs of lazy async machines.
+
+    Async transitions style the graph they look up by model ID, regardless of
+    the transition class. Item access therefore always returns a detached
+    graph, and the actual graphs are only looked up with get().
+    """
+
+    def __getitem__(self, key: int) -> _DetachedGraph:
+        return _DETACHED_GRAPH
+
+
+_DETACHED_GRAPH = _DetachedGraph()
+
+
+class LockedReactFlowMixin(ReactFlowMixin):
+    """
+    Mixin to add graph snapshots that can be read without the machine lock to locked machines.
+
+    The node/edge index is never changed once it was read. Topology changes
+    are then applied to a copy while holding the machine lock, and the copy
+    is published by replacing a single reference. get_graph() therefore reads
+    an immutable snapshot from any thread without taking the lock and without
+    waiting for transitions. Only when the snapshot is out of date, e.g. after
+    a change of a hierarchical machine, the first reader rebuilds it while
+    holding the lock.
+    """
+
+    _graph_snapshots = True
+
+
+class AsyncReactFlowMixin(ReactFlowMixin):
+    """
+    Mixin to add graph generation that does not block the event loop to async machines.
+
+    The machine is only read on the event loop, where no transition can run
+    at the same time. Building the node/edge index from that snapshot,
+    rendering it and encoding it as JSON happen in an executor.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Initialize the machine.
+
+        Args:
+            *args: Positional arguments passed to the machine
+            **kwargs: Keyword arguments passed to the machine
+        """
+        super().__init__(*args, **kwargs)
+        if self.lazy_graph:
+            # Async transitions style the graph of their model themselves, regardless of the transition class
+            self.model_graphs = _LazyModelGraphs(self.model_graphs)  # type: ignore
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore the machine, whose model graphs are recreated as a plain dict."""
+        super().__setstate__(state)  # type: ignore
+        if self.lazy_graph:
+            self.model_graphs = _LazyModelGraphs(self.model_graphs)  # type: ignore
+
+    def _get_model_graph(self, model: Any) -> ReactFlowGraph:
+        """
+        Return the graph of a model with its current state marked as active.
+
+        Async transitions reset the styling and mark the previous transition,
+        but never mark the state they entered, so it is marked when the graph is read.
+
+        Args:
+            model: Model whose graph should be returned
+
+        Returns:
+            The model's graph with an up-to-date active state
+        """
+        graph = super()._get_model_graph(model)
+        state = getattr(model, self.model_attribute, None)  # type: ignore
+        if not self.lazy_graph and state is not None:
+            graph.mark_active_state(state)
+        return graph
+
+    async def get_graph_async(self, model: Any = None, show_roi: bool = False, serialize: bool = False,
+                              executor: Optional[Executor] = None, **kwargs: Any) -> Any:
+        """
+        Return the graph data of a model without blocking the event loop.
+
+        The states and transitions are read on the event loop, since
+        hierarchical machines change their scope while converting nested
+        states to markup. Until the graph is rendered, topology changes
+        are not applied to the node/edge index as deltas; the index is rebuilt
+        on its next use instead. The result therefore reflects the topology at
+        the time of the call, even if transitions run or states and transitions
+        are added in the meantime.
+
+        Args:
+            model: Model whose graph should be returned, defaults to the first model
+            show_roi: Whether only the region of interest around the model's state should be rendered
+            serialize: Whether the graph should be returned as a JSON string, only
+                       supported for the 'react-flow' and 'columnar' formats
+            executor: Executor that builds and renders the graph, None for the
+                      event loop's default executor
+            **kwargs: Options passed to ReactFlowGraph.get_graph, e.g. 'format',
+                      'layout' or 'max_depth'
+
+        Returns:
+            The graph data as returned by get_graph, or its JSON if serialize is True
+
+        Raises:
+            ValueError: If the machine does not use the 'react-flow' graph engine,
+                        serialize is requested for a binary format or the graph
+                        cannot be generated
+        """
+        if not self._uses_react_flow_graphs():
+            raise ValueError("Asynchronous graph generation requires the 'react-flow' graph engine")
+        if serialize and kwargs.get("format", "react-flow") not in ("react-flow", "columnar"):
+            raise ValueError(f"The {kwargs['format']!r} format cannot be serialized to JSON")
+
+        model = self.models[0] if model is None else model  # type: ignore
+        graph = self._get_model_graph(model)
+        if show_roi:
+            kwargs["roi_state"] = getattr(model, self.model_attribute, None)  # type: ignore
+        kwargs.pop("title", None)
+        # Resolving Enums reads the machine and has to happen on the event loop as well
+        for key in ("roi_state", "collapsed"):
+            if kwargs.get(key) is not None:
+                kwargs[key] = list(graph._get_node_names(kwargs[key]))
+        options = {key: value for key, value in kwargs.items() if key != "merge_parallel"}
+        kwargs["layout"] = graph._validate_options(**options)
+
+        loop = asyncio.get_running_loop()
+        self._graph_updates_suspended += 1
+        try:
+            fingerprint = graph._topology_fingerprint()
+            topology = graph._topology
+            stats = graph.stats
+            if stats is not None:
+                stats.count("index_hits" if topology is not None and topology.fingerprint == fingerprint
+                            else "index_misses")
+            if topology is None or topology.fingerprint != fingerprint:
+                states, transitions = graph._snapshot_elements()
+                topology = await loop.run_in_executor(
+                    executor, graph._build_topology, fingerprint, states, transitions)
+                current = graph._topology
+                # Another call may have built the index in the meantime
+                if graph._topology_fingerprint() == fingerprint and (
+                        current is None or current.fingerprint != fingerprint):
+                    graph._install_topology(topology)
+
+            def render() -> Any:
+                result = graph._render_graph(topology, **kwargs)
+                if not serialize:
+                    return _copy_output(kwargs.get("format", "react-flow"), result)
+                start = perf_counter()
+                body = _to_json(result)
+                if stats is not None:
+                    stats.add_time("serialize", perf_counter() - start)
+                return body
+
+            return await loop.run_in_executor(executor, render)
+        finally:
+            self._graph_updates_suspended -= 1
+
+
+def _to_json(data: Dict[str, Any], chunk_size: int = 1000) -> str:
+    """
+    Encode graph data as JSON in chunks.
+
+    A single json.dumps call holds the GIL until the whole graph is encoded,
+    which would block the event loop thread. Encoding lists in chunks lets it
+    run in between. The result equals json.dumps(data).
+
+    Args:
+        data: Dictionary with list or scalar values
+        chunk_size: Number of list items encoded per call
+
+    Returns:
+        The JSON string
+    """
+    parts = []
+    for key, value in data.items():
+        if isinstance(value, list):
+            chunks = (json.dumps(value[i:i + chunk_size])[1:-1] for i in range(0, len(value), chunk_size))
+            encoded = "[" + ", ".join(chunks) + "]"
+        else:
+            encoded = json.dumps(value)
+        parts.append(f"{json.dumps(key)}: {encoded}")
+    return "{" + ", ".join(parts) + "}"
+
 
 class ReactFlowMachine(ReactFlowMixin, GraphMachine):
     """
@@ -95,7 +681,7 @@ class HierarchicalReactFlowMachine(ReactFlowMixin, HierarchicalGraphMachine):
         super().__init__(*args, **kwargs)
 
 
-class LockedReactFlowMachine(ReactFlowMixin, LockedGraphMachine):
+class LockedReactFlowMachine(LockedReactFlowMixin, LockedGraphMachine):
     """
     Thread-safe state machine with React Flow graph generation support.
 
@@ -127,7 +713,7 @@ class LockedReactFlowMachine(ReactFlowMixin, LockedGraphMachine):
         super().__init__(*args, **kwargs)
 
 
-class LockedHierarchicalReactFlowMachine(ReactFlowMixin, LockedHierarchicalGraphMachine):
+class LockedHierarchicalReactFlowMachine(LockedReactFlowMixin, LockedHierarchicalGraphMachine):
     """
     Thread-safe hierarchical state machine with React Flow graph generation.
 
@@ -158,7 +744,7 @@ class LockedHierarchicalReactFlowMachine(ReactFlowMixin, LockedHierarchicalGraph
         super().__init__(*args, **kwargs)
 
 
-class AsyncReactFlowMachine(ReactFlowMixin, AsyncGraphMachine):
+class AsyncReactFlowMachine(AsyncReactFlowMixin, AsyncGraphMachine):
     """
     Async state machine with React Flow graph generation support.
 
@@ -177,7 +763,7 @@ class AsyncReactFlowMachine(ReactFlowMixin, AsyncGraphMachine):
         ... )
         >>> async def main():
         ...     await machine.start()
-        ...     graph_data = machine.get_graph()
+        ...     graph_data = await machine.get_graph_async()
         >>> asyncio.run(main())
     """
 
@@ -194,7 +780,7 @@ class AsyncReactFlowMachine(ReactFlowMixin, AsyncGraphMachine):
         super().__init__(*args, **kwargs)
 
 
-class HierarchicalAsyncReactFlowMachine(ReactFlowMixin, HierarchicalAsyncGraphMachine):
+class HierarchicalAsyncReactFlowMachine(AsyncReactFlowMixin, HierarchicalAsyncGraphMachine):
     """
     Async hierarchical state machine with React Flow graph generation.
 
@@ -212,7 +798,7 @@ class HierarchicalAsyncReactFlowMachine(ReactFlowMixin, HierarchicalAsyncGraphMa
         ... )
         >>> async def main():
         ...     await machine.start()
-        ...     graph_data = machine.get_graph()
+        ...     graph_data = await machine.get_graph_async()
         >>> asyncio.run(main())
     """
 
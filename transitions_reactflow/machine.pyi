@@ -1,6 +1,7 @@
 """Type stubs for ReactFlow machine classes."""
 
-from typing import Any, Dict, List, Optional
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Union
 from transitions.extensions import (
     GraphMachine,
     HierarchicalGraphMachine,
@@ -10,58 +11,188 @@ from transitions.extensions import (
     HierarchicalAsyncGraphMachine,
 )
 
+from .layout import Layout, LayoutCache
+from .stats import GraphStats
+from .telemetry import TransitionRecorder
+
 
 class ReactFlowMixin:
+    lazy_graph: bool
+    layout_cache: Optional[LayoutCache]
+    graph_stats: Optional[GraphStats]
+    telemetry: Optional[TransitionRecorder]
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None: ...
+
+    @property
+    def graph_version(self) -> int: ...
+
     def _init_graphviz_engine(self, graph_engine: str) -> type: ...
 
+    def add_states(
+        self,
+        states: Any,
+        on_enter: Any = ...,
+        on_exit: Any = ...,
+        ignore_invalid_triggers: Any = ...,
+        **kwargs: Any
+    ) -> None: ...
+
+    def add_transition(
+        self,
+        trigger: str,
+        source: Any,
+        dest: Any = ...,
+        conditions: Any = ...,
+        unless: Any = ...,
+        before: Any = ...,
+        after: Any = ...,
+        prepare: Any = ...,
+        **kwargs: Any
+    ) -> None: ...
+
+    def remove_transition(
+        self, trigger: str, source: Any = ..., dest: Any = ...
+    ) -> None: ...
+
+    def add_model(self, model: Any, initial: Any = ..., **kwargs: Any) -> None: ...
+
+    def get_graph_overlay(
+        self, model: Any = ..., merge_parallel: bool = ...
+    ) -> Dict[str, Any]: ...
+
+    def get_telemetry_overlay(self) -> Dict[str, Any]: ...
+
+    def get_graph_children(
+        self, state: Any, model: Any = ..., **kwargs: Any
+    ) -> Any: ...
+
+
+class LockedReactFlowMixin(ReactFlowMixin):
+    def add_model(
+        self, model: Any, initial: Any = ..., model_context: Any = ..., **kwargs: Any
+    ) -> None: ...
+
+class AsyncReactFlowMixin(ReactFlowMixin):
+    def __init__(self, *args: Any, **kwargs: Any) -> None: ...
+
+    async def get_graph_async(
+        self,
+        model: Any = ...,
+        show_roi: bool = ...,
+        serialize: bool = ...,
+        executor: Optional[Executor] = ...,
+        **kwargs: Any
+    ) -> Any: ...
+
 
 class ReactFlowMachine(ReactFlowMixin, GraphMachine):
     def __init__(self, *args: Any, **kwargs: Any) -> None: ...
 
     def get_graph(
-        self, title: Optional[str] = ..., roi_state: Optional[str] = ...
-    ) -> Dict[str, List[Dict[str, Any]]]: ...
+        self,
+        title: Optional[str] = ...,
+        roi_state: Optional[Any] = ...,
+        format: str = ...,
+        layout: Optional[Union[str, Layout]] = ...,
+        radius: int = ...,
+        max_nodes: Optional[int] = ...,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        bundle_sources: Optional[int] = ...,
+        merge_parallel: bool = ...,
+    ) -> Any: ...
 
 
 class HierarchicalReactFlowMachine(ReactFlowMixin, HierarchicalGraphMachine):
     def __init__(self, *args: Any, **kwargs: Any) -> None: ...
 
     def get_graph(
-        self, title: Optional[str] = ..., roi_state: Optional[str] = ...
-    ) -> Dict[str, List[Dict[str, Any]]]: ...
-
-
-class LockedReactFlowMachine(ReactFlowMixin, LockedGraphMachine):
+        self,
+        title: Optional[str] = ...,
+        roi_state: Optional[Any] = ...,
+        format: str = ...,
+        layout: Optional[Union[str, Layout]] = ...,
+        radius: int = ...,
+        max_nodes: Optional[int] = ...,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        bundle_sources: Optional[int] = ...,
+        merge_parallel: bool = ...,
+    ) -> Any: ...
+
+
+class LockedReactFlowMachine(LockedReactFlowMixin, LockedGraphMachine):
     def __init__(self, *args: Any, **kwargs: Any) -> None: ...
 
     def get_graph(
-        self, title: Optional[str] = ..., roi_state: Optional[str] = ...
-    ) -> Dict[str, List[Dict[str, Any]]]: ...
+        self,
+        title: Optional[str] = ...,
+        roi_state: Optional[Any] = ...,
+        format: str = ...,
+        layout: Optional[Union[str, Layout]] = ...,
+        radius: int = ...,
+        max_nodes: Optional[int] = ...,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        bundle_sources: Optional[int] = ...,
+        merge_parallel: bool = ...,
+    ) -> Any: ...
 
 
 class LockedHierarchicalReactFlowMachine(
-    ReactFlowMixin, LockedHierarchicalGraphMachine
+    LockedReactFlowMixin, LockedHierarchicalGraphMachine
 ):
     def __init__(self, *args: Any, **kwargs: Any) -> None: ...
 
     def get_graph(
-        self, title: Optional[str] = ..., roi_state: Optional[str] = ...
-    ) -> Dict[str, List[Dict[str, Any]]]: ...
-
-
-class AsyncReactFlowMachine(ReactFlowMixin, AsyncGraphMachine):
+        self,
+        title: Optional[str] = ...,
+        roi_state: Optional[Any] = ...,
+        format: str = ...,
+        layout: Optional[Union[str, Layout]] = ...,
+        radius: int = ...,
+        max_nodes: Optional[int] = ...,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        bundle_sources: Optional[int] = ...,
+        merge_parallel: bool = ...,
+    ) -> Any: ...
+
+
+class AsyncReactFlowMachine(AsyncReactFlowMixin, AsyncGraphMachine):
     def __init__(self, *args: Any, **kwargs: Any) -> None: ...
 
     def get_graph(
-        self, title: Optional[str] = ..., roi_state: Optional[str] = ...
-    ) -> Dict[str, List[Dict[str, Any]]]: ...
+        self,
+        title: Optional[str] = ...,
+        roi_state: Optional[Any] = ...,
+        format: str = ...,
+        layout: Optional[Union[str, Layout]] = ...,
+        radius: int = ...,
+        max_nodes: Optional[int] = ...,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        bundle_sources: Optional[int] = ...,
+        merge_parallel: bool = ...,
+    ) -> Any: ...
 
 
 class HierarchicalAsyncReactFlowMachine(
-    ReactFlowMixin, HierarchicalAsyncGraphMachine
+    AsyncReactFlowMixin, HierarchicalAsyncGraphMachine
 ):
     def __init__(self, *args: Any, **kwargs: Any) -> None: ...
 
     def get_graph(
-        self, title: Optional[str] = ..., roi_state: Optional[str] = ...
-    ) -> Dict[str, List[Dict[str, Any]]]: ...
+        self,
+        title: Optional[str] = ...,
+        roi_state: Optional[Any] = ...,
+        format: str = ...,
+        layout: Optional[Union[str, Layout]] = ...,
+        radius: int = ...,
+        max_nodes: Optional[int] = ...,
+        max_depth: Optional[int] = ...,
+        collapsed: Optional[Any] = ...,
+        bundle_sources: Optional[int] = ...,
+        merge_parallel: bool = ...,
+    ) -> Any: ...
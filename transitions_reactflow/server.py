@@ -0,0 +1,264 @@
+"""WSGI application serving the graphs of registered machines."""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+try:
+    import brotli  # type: ignore
+except ImportError:
+    brotli = None
+
+from .machine import ReactFlowMixin
+
+# Content encodings in order of preference, 'identity' is always available
+ENCODINGS: Tuple[str, ...] = ("br", "gzip", "identity") if brotli is not None else ("gzip", "identity")
+
+_ETAG_SUFFIXES = {"br": "-br", "gzip": "-gz", "identity": ""}
+_STATUS = {
+    200: "200 OK",
+    304: "304 Not Modified",
+    404: "404 Not Found",
+    405: "405 Method Not Allowed",
+}
+
+StartResponse = Callable[..., Any]
+
+
+class _Entry:
+    """A registered machine with its graph options and the encodings of its current graph."""
+
+    def __init__(self, machine: Any, model: Any, options: Dict[str, Any]) -> None:
+        self.machine = machine
+        self.model = model
+        self.options = options
+        # Differs for every registration, so ETags are not reused by a restarted
+        # server or another machine registered under the same name
+        self.token = os.urandom(4).hex()
+        self.lock = threading.Lock()
+        # Key of the graph (see key) and its encoded bodies
+        self.bodies: Tuple[str, Dict[str, bytes]] = ("", {})
+
+    def key(self) -> str:
+        """
+        Return a key that changes whenever the graph of the machine does.
+
+        The graph depends on the graph version and, with show_roi, on the
+        state of the model, since only the region around it is rendered.
+        """
+        key = str(self.machine.graph_version)
+        if self.options.get("show_roi"):
+            state = getattr(self.model, self.machine.model_attribute, None)
+            key += "-" + hashlib.sha1(repr(state).encode("utf-8")).hexdigest()[:8]
+        return key
+
+
+class GraphServer:
+    """
+    WSGI application serving the graphs of React Flow machines.
+
+    Serves the following routes below the prefix:
+
+        GET <prefix>/<name>: Graph data of a machine as JSON
+        GET <prefix>/<name>/overlay: Style overlay of the machine's model, see get_graph_overlay
+
+    Graphs are generated once per graph version of the machine and kept in
+    memory, encoded with every supported content encoding (gzip, and brotli
+    if the 'brotli' package is installed). Responses carry an ETag derived
+    from the graph version, and requests whose If-None-Match matches it are
+    answered with 304 Not Modified without touching the machine's graph.
+    Polling clients therefore only download the graph after the machine's
+    topology changed. With the show_roi option, only the region around the
+    model's state is served, so its graph and ETag also change with the
+    state. Overlays are small and change with every transition, so they are
+    generated per request and tagged by their content.
+
+    Requests for other paths are passed to the wrapped application, e.g. a
+    Flask app serving the frontend, or answered with 404 Not Found.
+
+    Args:
+        machines: Optional mapping of names to machines to register
+        app: Optional WSGI application handling all other requests
+        prefix: Path below which graphs are served
+        compresslevel: gzip compression level
+        **kwargs: Options passed to get_graph for all machines, e.g. 'layout'
+    """
+
+    def __init__(self, machines: Optional[Mapping[str, Any]] = None, app: Optional[Callable[..., Any]] = None,
+                 prefix: str = "/graph-data", compresslevel: int = 9, **kwargs: Any) -> None:
+        self.app = app
+        self.prefix = prefix.rstrip("/")
+        self.compresslevel = compresslevel
+        self.options = kwargs
+        self._entries: Dict[str, _Entry] = {}
+        for name, machine in (machines or {}).items():
+            self.register(name, machine)
+
+    def register(self, name: str, machine: Any, model: Any = None, **kwargs: Any) -> None:
+        """
+        Serve the graph of a machine, replacing any machine of the same name.
+
+        Args:
+            name: Name of the machine in the URL
+            machine: React Flow machine
+            model: Model whose graph and overlay are served, defaults to the first model
+            **kwargs: Options passed to get_graph, overriding those of the server
+
+        Raises:
+            ValueError: If the machine is not a React Flow machine or the name contains a slash
+        """
+        if not isinstance(machine, ReactFlowMixin):
+            raise ValueError(f"{machine!r} is not a React Flow machine")
+        if not name or "/" in name:
+            raise ValueError(f"Invalid machine name {name!r}")
+        model = machine.models[0] if model is None else model  # type: ignore
+        self._entries[name] = _Entry(machine, model, {**self.options, **kwargs})
+
+    def unregister(self, name: str) -> None:
+        """
+        Stop serving the graph of a machine.
+
+        Args:
+            name: Name the machine was registered with
+
+        Raises:
+            ValueError: If no machine is registered with that name
+        """
+        if self._entries.pop(name, None) is None:
+            raise ValueError(f"No machine is registered as {name!r}")
+
+    def __call__(self, environ: Dict[str, Any], start_response: StartResponse) -> Iterable[bytes]:
+        """Handle a WSGI request."""
+        path = environ.get("PATH_INFO", "")
+        entry = None
+        overlay = False
+        if path.startswith(self.prefix + "/"):
+            name = path[len(self.prefix) + 1:]
+            if name.endswith("/overlay"):
+                name = name[:-len("/overlay")]
+                overlay = True
+            entry = self._entries.get(name)
+        if entry is None:
+            if self.app is not None:
+                return self.app(environ, start_response)
+            return _respond(start_response, 404, [("Content-Type", "application/json")], b'{"error": "Not found"}')
+
+        method = environ.get("REQUEST_METHOD", "GET")
+        if method not in ("GET", "HEAD"):
+            return _respond(start_response, 405, [("Allow", "GET, HEAD")], b"")
+        if overlay:
+            status, headers, body = self._overlay_response(entry, environ)
+        else:
+            status, headers, body = self._graph_response(entry, environ)
+        return _respond(start_response, status, headers, body, head=method == "HEAD")
+
+    def _graph_response(self, entry: _Entry, environ: Dict[str, Any]) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        """Return the status, headers and body of a graph request."""
+        key = entry.key()
+        encoding = _negotiate(environ.get("HTTP_ACCEPT_ENCODING", ""))
+        # Representations only differ by their encoding, so any of them is still valid
+        etags = {f"{entry.token}-{key}{suffix}" for suffix in _ETAG_SUFFIXES.values()}
+        if _matches(environ.get("HTTP_IF_NONE_MATCH"), etags):
+            return 304, _graph_headers(entry, key, encoding), b""
+
+        # The machine may have changed since the key was read, so the body is tagged with its own key
+        key, bodies = self._get_bodies(entry, key)
+        headers = _graph_headers(entry, key, encoding)
+        headers.append(("Content-Type", "application/json"))
+        if encoding != "identity":
+            headers.append(("Content-Encoding", encoding))
+        return 200, headers, bodies[encoding]
+
+    def _get_bodies(self, entry: _Entry, key: str) -> Tuple[str, Dict[str, bytes]]:
+        """Return the key and encoded graph of a machine, generating the graph if its key changed."""
+        if entry.bodies[0] == key:
+            return entry.bodies
+        with entry.lock:
+            # Another thread may have generated the graph while this one waited
+            if entry.bodies[0] == key:
+                return entry.bodies
+            key = entry.key()
+            graph = entry.machine._get_graph(entry.model, **entry.options)
+            entry.bodies = (key, self._encode(json.dumps(graph).encode("utf-8")))
+        return entry.bodies
+
+    def _encode(self, data: bytes) -> Dict[str, bytes]:
+        """Return a body in every supported content encoding."""
+        bodies = {"identity": data, "gzip": gzip.compress(data, self.compresslevel, mtime=0)}
+        if brotli is not None:
+            bodies["br"] = brotli.compress(data)
+        return bodies
+
+    def _overlay_response(self, entry: _Entry, environ: Dict[str, Any]) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        """Return the status, headers and body of an overlay request."""
+        overlay = entry.machine.get_graph_overlay(entry.model, entry.options.get("merge_parallel", False))
+        # The version of lazy machines changes whenever the overlay is read, so only the styles are tagged
+        body = json.dumps({"nodes": overlay["nodes"], "edges": overlay["edges"]}, sort_keys=True).encode("utf-8")
+        etag = f"{entry.token}-{hashlib.sha1(body).hexdigest()[:16]}"
+        headers = [("Cache-Control", "no-cache"), ("ETag", f'"{etag}"')]
+        if _matches(environ.get("HTTP_IF_NONE_MATCH"), {etag}):
+            return 304, headers, b""
+        return 200, headers + [("Content-Type", "application/json")], body
+
+
+def create_app(machines: Optional[Mapping[str, Any]] = None, app: Optional[Callable[..., Any]] = None,
+               **kwargs: Any) -> GraphServer:
+    """
+    Create a WSGI application serving the graphs of machines.
+
+    Args:
+        machines: Optional mapping of names to machines to register
+        app: Optional WSGI application handling all other requests
+        **kwargs: Arguments of GraphServer, e.g. 'prefix', and options passed to get_graph
+
+    Returns:
+        The GraphServer, on which further machines can be registered
+    """
+    return GraphServer(machines, app=app, **kwargs)
+
+
+def _respond(start_response: StartResponse, status: int, headers: List[Tuple[str, str]],
+             body: bytes, head: bool = False) -> List[bytes]:
+    """Start a response with a Content-Length and return its body, which HEAD responses omit."""
+    if status != 304:
+        headers = headers + [("Content-Length", str(len(body)))]
+    start_response(_STATUS[status], headers)
+    return [body] if body and not head else []
+
+
+def _graph_headers(entry: _Entry, key: str, encoding: str) -> List[Tuple[str, str]]:
+    """Return the caching headers of a graph response, tagged with the graph's key and encoding."""
+    return [("Cache-Control", "no-cache"), ("Vary", "Accept-Encoding"),
+            ("ETag", f'"{entry.token}-{key}{_ETAG_SUFFIXES[encoding]}"')]
+
+
+def _matches(if_none_match: Optional[str], etags: Iterable[str]) -> bool:
+    """Whether an If-None-Match header matches any of the ETags, compared weakly."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().replace("W/", "", 1).strip('"') for tag in if_none_match.split(",")}
+    return not tags.isdisjoint(etags)
+
+
+def _negotiate(accept_encoding: str) -> str:
+    """Return the preferred supported content encoding of an Accept-Encoding header."""
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for encoding in ENCODINGS[:-1]:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return "identity"
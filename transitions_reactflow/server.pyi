@@ -0,0 +1,72 @@
+"""Type stubs for the graph server."""
+
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+ENCODINGS: Tuple[str, ...]
+StartResponse = Callable[..., Any]
+
+
+class _Entry:
+    machine: Any
+    model: Any
+    options: Dict[str, Any]
+    token: str
+    lock: threading.Lock
+    bodies: Tuple[str, Dict[str, bytes]]
+
+    def __init__(self, machine: Any, model: Any, options: Dict[str, Any]) -> None: ...
+
+    def key(self) -> str: ...
+
+
+class GraphServer:
+    app: Optional[Callable[..., Any]]
+    prefix: str
+    compresslevel: int
+    options: Dict[str, Any]
+    _entries: Dict[str, _Entry]
+
+    def __init__(
+        self,
+        machines: Optional[Mapping[str, Any]] = ...,
+        app: Optional[Callable[..., Any]] = ...,
+        prefix: str = ...,
+        compresslevel: int = ...,
+        **kwargs: Any
+    ) -> None: ...
+
+    def register(self, name: str, machine: Any, model: Any = ..., **kwargs: Any) -> None: ...
+
+    def unregister(self, name: str) -> None: ...
+
+    def __call__(self, environ: Dict[str, Any], start_response: StartResponse) -> Iterable[bytes]: ...
+
+    def _graph_response(
+        self, entry: _Entry, environ: Dict[str, Any]
+    ) -> Tuple[int, List[Tuple[str, str]], bytes]: ...
+
+    def _get_bodies(self, entry: _Entry, key: str) -> Tuple[str, Dict[str, bytes]]: ...
+
+    def _encode(self, data: bytes) -> Dict[str, bytes]: ...
+
+    def _overlay_response(
+        self, entry: _Entry, environ: Dict[str, Any]
+    ) -> Tuple[int, List[Tuple[str, str]], bytes]: ...
+
+
+def create_app(
+    machines: Optional[Mapping[str, Any]] = ...,
+    app: Optional[Callable[..., Any]] = ...,
+    **kwargs: Any
+) -> GraphServer: ...
+
+def _respond(
+    start_response: StartResponse, status: int, headers: List[Tuple[str, str]], body: bytes, head: bool = ...
+) -> List[bytes]: ...
+
+def _graph_headers(entry: _Entry, key: str, encoding: str) -> List[Tuple[str, str]]: ...
+
+def _matches(if_none_match: Optional[str], etags: Iterable[str]) -> bool: ...
+
+def _negotiate(accept_encoding: str) -> str: ...
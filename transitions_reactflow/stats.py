@@ -0,0 +1,98 @@
+"""Timings and counters of the graph pipeline."""
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class GraphStats:
+    """
+    Collects per-stage timings and counters of graph generation.
+
+    Pass an instance as 'graph_stats' to a machine, or assign it to the
+    graph_stats attribute of a graph built with ReactFlowGraph.from_definition,
+    to record how long each stage of the pipeline takes. Without it, the
+    pipeline only checks for its absence.
+
+    Stages (in seconds, with the number of calls):
+        get_graph: Whole get_graph calls
+        read: Reading states and transitions from the machine
+        edges, nodes, index: Building edge records, node records and the index
+        delta: Applying added states and changed triggers to the index
+        render: Rendering graph data from the index
+        layout: Computing node positions
+        encode: Encoding the columnar and binary formats
+        serialize: Encoding JSON with iter_json or get_graph_async
+
+    Counters:
+        states_read, transitions_read: Elements read from the machine
+        edges_built, nodes_built: Records created when building the index
+        index_hits, index_misses: get_graph calls with an up to date or outdated index
+        output_hits, output_misses: Graph data found in or added to the cache of the index
+        layout_cache_hits, layout_cache_misses: Lookups in the machine's LayoutCache
+
+    Args:
+        callback: Optional callable invoked with the stage and its duration in
+                  seconds every time a stage completes, e.g. to feed a metrics
+                  system. It is called in the thread that ran the stage.
+    """
+
+    def __init__(self, callback: Optional[Callable[[str, float], None]] = None) -> None:
+        self.callback = callback
+        self.timings: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        """
+        Record one completed stage.
+
+        Args:
+            stage: Name of the stage
+            seconds: Duration of the stage
+        """
+        with self._lock:
+            self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+            self.calls[stage] = self.calls.get(stage, 0) + 1
+        if self.callback is not None:
+            self.callback(stage, seconds)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """
+        Increase a counter.
+
+        Args:
+            name: Name of the counter
+            value: Amount to add
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return a copy of all statistics.
+
+        Returns:
+            Dictionary with 'timings' (total seconds per stage), 'calls'
+            (completions per stage) and 'counters'
+        """
+        with self._lock:
+            return {"timings": dict(self.timings), "calls": dict(self.calls), "counters": dict(self.counters)}
+
+    def reset(self) -> None:
+        """Clear all statistics."""
+        with self._lock:
+            self.timings.clear()
+            self.calls.clear()
+            self.counters.clear()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle the statistics without their lock."""
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore pickled statistics with a new lock."""
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
@@ -0,0 +1,28 @@
+"""Type stubs for graph pipeline statistics."""
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class GraphStats:
+    callback: Optional[Callable[[str, float], None]]
+    timings: Dict[str, float]
+    calls: Dict[str, int]
+    counters: Dict[str, int]
+    _lock: threading.Lock
+
+    def __init__(
+        self, callback: Optional[Callable[[str, float], None]] = ...
+    ) -> None: ...
+
+    def add_time(self, stage: str, seconds: float) -> None: ...
+
+    def count(self, name: str, value: int = ...) -> None: ...
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]: ...
+
+    def reset(self) -> None: ...
+
+    def __getstate__(self) -> Dict[str, Any]: ...
+
+    def __setstate__(self, state: Dict[str, Any]) -> None: ...
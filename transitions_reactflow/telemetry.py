@@ -0,0 +1,180 @@
+"""Recording of executed transitions for usage overlays."""
+
+import threading
+import weakref
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from .topology import EdgeRecord
+
+# Upper bounds of the duration histogram buckets in seconds
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Source, target and trigger of an executed transition
+TransitionKey = Tuple[str, str, str]
+
+
+class TransitionRecorder:
+    """
+    Counts executed transitions and their durations per edge.
+
+    Pass an instance as 'telemetry' to a machine to record every successful
+    transition with the time it took, including its prepare, condition,
+    before, exit, enter and after callbacks. Durations are collected in
+    histograms with fixed bucket bounds.
+
+    Every thread records into its own counters, so recording takes no lock
+    and threads of a LockedReactFlowMachine do not contend for them. Reading
+    merges the counters of all threads. When a thread ends, its counters are
+    merged into a shared total, so short-lived threads do not accumulate.
+
+    Args:
+        buckets: Ascending upper bounds of the histogram buckets in seconds.
+                 Durations above the last bound are counted in an extra bucket.
+
+    Raises:
+        ValueError: If buckets is empty or not ascending
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        if not buckets or any(upper <= lower for lower, upper in zip(buckets, buckets[1:])):
+            raise ValueError("buckets must be a non-empty ascending sequence")
+        self.buckets = tuple(buckets)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Counters of all running threads by their ID, each mapping keys to [count, sum, *bucket counts]
+        self._threads: Dict[int, Dict[TransitionKey, List[float]]] = {}
+        # Merged counters of threads that ended
+        self._retired: Dict[TransitionKey, List[float]] = {}
+        self._generation = 0
+
+    def record(self, source: str, target: str, trigger: str, seconds: float) -> None:
+        """
+        Record one executed transition.
+
+        Args:
+            source: Node ID of the source state
+            target: Node ID of the destination state, the source for internal transitions
+            trigger: Name of the trigger
+            seconds: Duration of the transition
+        """
+        local = self._local
+        if getattr(local, 'generation', None) != self._generation:
+            self._register()
+        counters = local.counters
+        key = (source, target, trigger)
+        entry = counters.get(key)
+        if entry is None:
+            entry = counters[key] = [0] * (len(self.buckets) + 3)
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2 + bisect_left(self.buckets, seconds)] += 1
+
+    def _register(self) -> None:
+        """Create the counters of the current thread, which are retired when the thread ends."""
+        counters: Dict[TransitionKey, List[float]] = {}
+        # Only referenced by the thread-local state, which is dropped when the thread ends
+        sentinel = _ThreadSentinel()
+        with self._lock:
+            self._local.counters = counters
+            self._local.generation = self._generation
+            self._local.sentinel = sentinel
+            self._threads[id(counters)] = counters
+            finalizer = weakref.finalize(sentinel, _retire_thread, weakref.ref(self), counters, self._generation)
+        finalizer.atexit = False
+
+    def _retire(self, counters: Dict[TransitionKey, List[float]], generation: int) -> None:
+        """Merge the counters of an ended thread into the shared total."""
+        with self._lock:
+            if generation != self._generation:
+                return  # Discarded by reset
+            del self._threads[id(counters)]
+            _merge(self._retired, counters)
+
+    def get_histograms(self) -> Dict[TransitionKey, Dict[str, Any]]:
+        """
+        Return the merged counters of all threads.
+
+        Returns:
+            Dictionary mapping (source, target, trigger) to a dictionary with
+            'count', 'sum' (total seconds) and 'histogram' (counts per bucket,
+            plus one for durations above the last bound)
+        """
+        merged: Dict[TransitionKey, List[float]] = {}
+        with self._lock:
+            threads = list(self._threads.values())
+            _merge(merged, self._retired)
+        for counters in threads:
+            # Copying is atomic, so the owning thread may keep recording
+            _merge(merged, counters.copy())
+        return {
+            key: {"count": int(entry[0]), "sum": entry[1], "histogram": [int(count) for count in entry[2:]]}
+            for key, entry in merged.items()
+        }
+
+    def to_overlay(self, edges: Iterable[EdgeRecord]) -> Dict[str, Any]:
+        """
+        Return the recorded transitions as an overlay of graph edges.
+
+        Transitions are matched to edges by source, target and trigger. If
+        several edges share all three, the first one receives the counts.
+        Transitions without an edge, e.g. hidden auto transitions, are omitted.
+
+        Args:
+            edges: Edge records of the graph, e.g. from get_graph(format='compact')
+
+        Returns:
+            Dictionary with 'buckets' (the bucket bounds), 'max' (the highest
+            count of an edge, to scale heatmaps) and 'edges', which maps edge
+            IDs to dictionaries with 'count', 'sum' and 'histogram'
+        """
+        histograms = self.get_histograms()
+        overlay: Dict[str, Dict[str, Any]] = {}
+        for edge in edges:
+            entry = histograms.pop((edge.source, edge.target, edge.label), None)
+            if entry is not None:
+                overlay[edge.id] = entry
+        return {
+            "buckets": list(self.buckets),
+            "max": max((entry["count"] for entry in overlay.values()), default=0),
+            "edges": overlay,
+        }
+
+    def reset(self) -> None:
+        """Discard all recorded transitions."""
+        with self._lock:
+            self._generation += 1
+            self._threads = {}
+            self._retired = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle the merged counters without the thread-local state and lock."""
+        merged = {
+            key: [entry["count"], entry["sum"]] + entry["histogram"] for key, entry in self.get_histograms().items()
+        }
+        return {"buckets": self.buckets, "counters": merged}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore pickled counters as those of ended threads."""
+        self.__init__(state["buckets"])  # type: ignore
+        self._retired = state["counters"]
+
+
+class _ThreadSentinel:
+    """Object whose collection signals that the thread owning it ended."""
+
+
+def _retire_thread(recorder: "weakref.ref[TransitionRecorder]", counters: Dict[TransitionKey, List[float]],
+                   generation: int) -> None:
+    """Retire the counters of an ended thread, unless the recorder is gone."""
+    instance = recorder()
+    if instance is not None:
+        instance._retire(counters, generation)
+
+
+def _merge(total: Dict[TransitionKey, List[float]], counters: Dict[TransitionKey, List[float]]) -> None:
+    """Add counters to a total."""
+    for key, entry in counters.items():
+        current = total.get(key)
+        total[key] = list(entry) if current is None else [a + b for a, b in zip(current, entry)]
@@ -0,0 +1,48 @@
+"""Type stubs for transition telemetry."""
+
+import threading
+import weakref
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from .topology import EdgeRecord
+
+DEFAULT_BUCKETS: Tuple[float, ...]
+TransitionKey = Tuple[str, str, str]
+
+
+class TransitionRecorder:
+    buckets: Tuple[float, ...]
+    _local: threading.local
+    _lock: threading.Lock
+    _threads: Dict[int, Dict[TransitionKey, List[float]]]
+    _retired: Dict[TransitionKey, List[float]]
+    _generation: int
+
+    def __init__(self, buckets: Sequence[float] = ...) -> None: ...
+
+    def record(self, source: str, target: str, trigger: str, seconds: float) -> None: ...
+
+    def _register(self) -> None: ...
+
+    def _retire(self, counters: Dict[TransitionKey, List[float]], generation: int) -> None: ...
+
+    def get_histograms(self) -> Dict[TransitionKey, Dict[str, Any]]: ...
+
+    def to_overlay(self, edges: Iterable[EdgeRecord]) -> Dict[str, Any]: ...
+
+    def reset(self) -> None: ...
+
+    def __getstate__(self) -> Dict[str, Any]: ...
+
+    def __setstate__(self, state: Dict[str, Any]) -> None: ...
+
+
+class _ThreadSentinel: ...
+
+
+def _retire_thread(
+    recorder: weakref.ref[TransitionRecorder], counters: Dict[TransitionKey, List[float]], generation: int
+) -> None: ...
+
+
+def _merge(total: Dict[TransitionKey, List[float]], counters: Dict[TransitionKey, List[float]]) -> None: ...
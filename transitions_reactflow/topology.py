@@ -0,0 +1,1081 @@
+"""Incrementally maintained node/edge index for React Flow graphs."""
+
+import sys
+from collections import Counter, deque
+from threading import Lock
+from typing import (
+    Any, Callable, Collection, Deque, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple,
+    Union
+)
+
+# Upper bound for the number of node/edge changes kept for diff()
+MAX_CHANGES = 10000
+
+
+class NodeRecord(NamedTuple):
+    """
+    Compact node of a state, converted to a React Flow node only for output.
+
+    Attributes:
+        id: Name of the state
+        label: Label of the state
+        parent: ID of the node of the parent state, None for top level states
+        collapsed: Whether the nested states are hidden in the node
+    """
+
+    id: str
+    label: str
+    parent: Optional[str] = None
+    collapsed: bool = False
+
+    @classmethod
+    def create(cls, name: str, label: Optional[str] = None, parent: Optional[str] = None) -> "NodeRecord":
+        """
+        Create a record with interned strings.
+
+        Args:
+            name: Name of the state
+            label: Label of the state, defaults to its name
+            parent: ID of the node of the parent state, None for top level states
+
+        Returns:
+            The node record
+        """
+        name = _intern(name)
+        return cls(name, _intern(label) if label else name, _intern(parent))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Return the React Flow node dictionary.
+
+        Nested states reference their parent with 'parentNode', collapsed
+        states are marked with a 'collapsed' flag in their data.
+        """
+        node: Dict[str, Any] = {"id": self.id, "data": {"label": self.label}, "position": {"x": 0, "y": 0}}
+        if self.collapsed:
+            node["data"]["collapsed"] = True
+        if self.parent is not None:
+            node["parentNode"] = self.parent
+        return node
+
+
+class EdgeRecord(NamedTuple):
+    """
+    Compact edge of a transition, converted to a React Flow edge only for output.
+
+    Attributes:
+        id: Unique edge ID
+        source: Name of the source state
+        target: Name of the target state
+        label: Name of the trigger
+        triggers: Triggers of all edges a merged edge stands for, empty for single edges
+    """
+
+    id: str
+    source: str
+    target: str
+    label: str
+    triggers: Tuple[str, ...] = ()
+
+    @classmethod
+    def create(cls, edge_id: str, source: str, target: str, label: str) -> "EdgeRecord":
+        """
+        Create a record with interned state and trigger names.
+
+        Args:
+            edge_id: Unique edge ID
+            source: Name of the source state
+            target: Name of the target state
+            label: Name of the trigger
+
+        Returns:
+            The edge record
+        """
+        return cls(edge_id, _intern(source), _intern(target), _intern(label))
+
+    @staticmethod
+    def make_id(source: str, target: str, count: int = 0) -> str:
+        """
+        Return the ID of an edge.
+
+        Args:
+            source: Name of the source state
+            target: Name of the target state
+            count: Number of earlier edges with the same source and target
+
+        Returns:
+            'e-{source}-{target}' for the first edge, with '-{count}' appended for later ones
+        """
+        return f"e-{source}-{target}-{count}" if count > 0 else f"e-{source}-{target}"
+
+    def id_count(self) -> Optional[int]:
+        """Return the count the ID was made with by make_id, None if it was not."""
+        prefix = self.make_id(self.source, self.target)
+        if self.id == prefix:
+            return 0
+        suffix = self.id[len(prefix) + 1:]
+        if self.id.startswith(prefix + "-") and suffix.isdigit():
+            return int(suffix)
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Return the React Flow edge dictionary.
+
+        Merged edges list their triggers and the number of merged edges in their data.
+        """
+        edge: Dict[str, Any] = {"id": self.id, "source": self.source, "target": self.target, "label": self.label}
+        if self.triggers:
+            edge["data"] = {"triggers": list(self.triggers), "count": len(self.triggers)}
+        return edge
+
+
+Record = Union[NodeRecord, EdgeRecord]
+# Entry of the change log: version, changes of the version and the next older entry
+_LogEntry = Tuple[int, Dict[str, List[Tuple[str, str, Optional[Record]]]], Any]
+
+
+class GraphTopology:
+    """
+    Index of the nodes and edges that make up a React Flow graph.
+
+    The index is built once from the machine's markup and then kept up to date
+    with small deltas (add node, add/remove edge) whenever the machine changes.
+    Nodes are only part of the output while at least one edge references them,
+    which is tracked with a reference count per state.
+
+    Every delta is also recorded as React Flow NodeChange/EdgeChange patches,
+    so clients can catch up with diff() instead of refetching the whole graph.
+
+    Indices that are read without the machine lock are marked with share().
+    for_update() then returns a copy to apply the next delta to, while
+    indices that were never shared are changed in place.
+
+    Nodes and edges are stored as NodeRecord/EdgeRecord tuples. React Flow
+    dictionaries are only created when the graph is serialized, and are then
+    kept per element so later versions reuse them.
+
+    Nested states are nodes with a parent. A parent is a node as long as one of
+    its descendants is, and always precedes its children, as React Flow
+    requires. Views with collapsed subtrees are derived from the full index.
+
+    Attributes:
+        fingerprint: Topology fingerprint of the machine this index reflects.
+            Its first element is the graph version.
+        layouts: Latest result of every layout by its key. Unlike cached
+            serializations, these are kept across deltas and rebuilds so
+            layouts can reuse earlier positions.
+    """
+
+    def __init__(self, fingerprint: Tuple[Any, ...]) -> None:
+        """
+        Initialize an empty index.
+
+        Args:
+            fingerprint: Topology fingerprint of the machine this index reflects
+        """
+        self.fingerprint = fingerprint
+        self.layouts: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._states: Dict[str, NodeRecord] = {}
+        self._used: Dict[str, NodeRecord] = {}
+        self._refcount: Dict[str, int] = {}
+        self._edges: Dict[str, EdgeRecord] = {}
+        self._edge_counter: Dict[Tuple[str, str], int] = {}
+        self._trigger_edges: Dict[str, List[str]] = {}
+        self._pair_edges: Dict[Tuple[str, str], List[str]] = {}
+        # Outgoing and incoming edge IDs per state, as insertion ordered sets
+        self._out_edges: Dict[str, Dict[str, None]] = {}
+        self._in_edges: Dict[str, Dict[str, None]] = {}
+        # IDs of the nested states per parent state
+        self._children: Dict[str, List[str]] = {}
+        # Serialized graphs of the current index by format
+        self._outputs: Dict[str, Any] = {}
+        # React Flow dictionaries of elements that were already serialized
+        self._node_dicts: Dict[str, Dict[str, Any]] = {}
+        self._edge_dicts: Dict[str, Dict[str, Any]] = {}
+        # Changes not yet committed to a version, and the committed change log.
+        # Changes are (type, id, record) tuples, record is None for removals.
+        # The log is a linked list of (version, changes, older entry) tuples,
+        # newest first, which is never changed, so copies share it.
+        self._pending: Dict[str, List[Tuple[str, str, Optional[Record]]]] = {"nodes": [], "edges": []}
+        self._log: Optional[_LogEntry] = None
+        self._log_size = 0
+        self._log_floor = fingerprint[0]
+        # IDs of the nested lists and dicts this index may change, None if it
+        # owns all of them. Copies share the others with their original.
+        self._owned: Optional[Set[int]] = None
+        # Whether the index was read without the machine lock, and whether a
+        # delta is being applied to it in place
+        self._shared = False
+        self._updating = False
+        self._share_lock = Lock()
+
+    @property
+    def version(self) -> int:
+        """Graph version this index reflects."""
+        return self.fingerprint[0]
+
+    def load(self, nodes: List[NodeRecord], edges: List[EdgeRecord]) -> None:
+        """
+        Fill the index from fully built node and edge lists.
+
+        Args:
+            nodes: Node records for all states, whether used or not
+            edges: Edge records as built by ReactFlowGraph._build_edges
+        """
+        for node in nodes:
+            self._states[node.id] = node
+            if node.parent is not None:
+                self._children.setdefault(node.parent, []).append(node.id)
+
+        for edge in edges:
+            edge_key = (edge.source, edge.target)
+            # IDs taken over from a previous index may skip suffixes
+            edge_count = (edge.id_count() or 0) + 1
+            if edge_count > self._edge_counter.get(edge_key, 0):
+                self._edge_counter[edge_key] = edge_count
+            self._insert_edge(edge)
+
+        used = {name for name in self._refcount if name in self._states}
+        for name in list(used):
+            parent = self._states[name].parent
+            while parent is not None and parent not in used and parent in self._states:
+                used.add(parent)
+                parent = self._states[parent].parent
+
+        # Keep nodes in state order rather than in order of first reference
+        self._used = {name: node for name, node in self._states.items() if name in used}
+        self._outputs.clear()
+        self._pending = {"nodes": [], "edges": []}
+
+    def inherit(self, previous: "GraphTopology") -> None:
+        """
+        Continue the change log of an index this one replaces.
+
+        Edges that are in both indices keep their ID from the previous one,
+        which may differ from a fresh build after deltas removed edges. The
+        differences between both indices are recorded as changes for the
+        version of this index, so diff() keeps working across full rebuilds.
+        Earlier layout results are taken over as well.
+
+        Args:
+            previous: Index that was built for an earlier version
+        """
+        edges = _reuse_edge_ids(previous._edges, list(self._edges.values()))
+        if edges is not None:
+            nodes = list(self._states.values())
+            self.__init__(self.fingerprint)  # type: ignore
+            self.load(nodes, edges)
+
+        pairs = (("nodes", previous._used, self._used), ("edges", previous._edges, self._edges))
+        for key, old_items, new_items in pairs:
+            changes = self._pending[key]
+            changes.extend(("remove", item_id, None) for item_id in old_items if item_id not in new_items)
+            for item_id, item in new_items.items():
+                if item_id not in old_items:
+                    changes.append(("add", item_id, item))
+                elif old_items[item_id] != item:
+                    changes.append(("replace", item_id, item))
+
+        self.layouts = previous.layouts
+        self._log = previous._log
+        self._log_size = previous._log_size
+        self._log_floor = previous._log_floor
+        self.commit(self.fingerprint)
+
+    def share(self) -> bool:
+        """
+        Mark the index as read by a thread that does not hold the machine lock.
+
+        Returns:
+            False if a delta is being applied to the index, which must then
+            not be read without the machine lock
+        """
+        with self._share_lock:
+            if self._updating:
+                return False
+            self._shared = True
+            return True
+
+    def for_update(self) -> "GraphTopology":
+        """
+        Return an index a delta can be applied to without changing shared data.
+
+        Indices that were never shared are returned themselves and cannot be
+        shared until the delta is committed. Shared indices are copied.
+
+        Returns:
+            This index or a copy of it
+        """
+        with self._share_lock:
+            if not self._shared:
+                self._updating = True
+                return self
+        return self.copy()
+
+    def copy(self) -> "GraphTopology":
+        """
+        Return a copy of the index that deltas can be applied to without changing this one.
+
+        Only the top level dictionaries are copied. The lists and dictionaries
+        nested in them, e.g. the edges of a state, are shared with this index
+        until the copy changes them. Layout results and the change log are
+        shared as well.
+
+        Returns:
+            New index with the same fingerprint, records, caches and change log
+        """
+        topology = GraphTopology.__new__(GraphTopology)
+        topology.__dict__.update(self.__dict__)
+        topology._states = dict(self._states)
+        topology._used = dict(self._used)
+        topology._refcount = dict(self._refcount)
+        topology._edges = dict(self._edges)
+        topology._edge_counter = dict(self._edge_counter)
+        topology._trigger_edges = dict(self._trigger_edges)
+        topology._pair_edges = dict(self._pair_edges)
+        topology._out_edges = dict(self._out_edges)
+        topology._in_edges = dict(self._in_edges)
+        topology._outputs = dict(self._outputs)
+        topology._node_dicts = dict(self._node_dicts)
+        topology._edge_dicts = dict(self._edge_dicts)
+        topology._pending = {key: list(changes) for key, changes in self._pending.items()}
+        topology._owned = set()
+        topology._shared = False
+        topology._updating = False
+        topology._share_lock = Lock()
+        return topology
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle the index without its lock."""
+        state = self.__dict__.copy()
+        del state["_share_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore a pickled index with a new lock."""
+        self.__dict__.update(state)
+        self._share_lock = Lock()
+
+    def commit(self, fingerprint: Tuple[Any, ...]) -> None:
+        """
+        Record the pending changes for a new version.
+
+        Args:
+            fingerprint: Topology fingerprint of the machine after the changes
+        """
+        self.fingerprint = fingerprint
+        pending = self._pending
+        size = _count_changes(pending)
+        if size:
+            self._log = (self.version, pending, self._log)
+            self._log_size += size
+            self._pending = {"nodes": [], "edges": []}
+        if self._log_size > MAX_CHANGES:
+            self._trim_log()
+        self._updating = False
+
+    def _trim_log(self) -> None:
+        """
+        Drop the oldest changes, keeping at most half of MAX_CHANGES.
+
+        The kept entries are linked anew, since copies may share the old ones.
+        Trimming to half the limit keeps the cost per commit constant on average.
+        """
+        kept = []
+        size = 0
+        entry = self._log
+        while entry is not None:
+            version, changes, older = entry
+            entry_size = _count_changes(changes)
+            if size + entry_size > MAX_CHANGES // 2:
+                self._log_floor = version
+                break
+            kept.append((version, changes))
+            size += entry_size
+            entry = older
+
+        log: Optional[_LogEntry] = None
+        for version, changes in reversed(kept):
+            log = (version, changes, log)
+        self._log = log
+        self._log_size = size
+
+    def diff(self, since_version: int) -> Dict[str, Any]:
+        """
+        Return the changes made to the graph after a given version.
+
+        Args:
+            since_version: Graph version the client currently has
+
+        Returns:
+            Dictionary with the current 'version', a 'reset' flag and React Flow
+            compatible 'nodes' and 'edges' change lists ('add', 'remove' and
+            'replace'). If the changes since the version are no longer known,
+            'reset' is True and the lists add every element of the current graph,
+            so clients have to clear their graph before applying them.
+        """
+        if since_version < self._log_floor or since_version > self.version:
+            return {
+                "version": self.version,
+                "reset": True,
+                "nodes": [{"type": "add", "item": node.to_dict()} for node in self._used.values()],
+                "edges": [{"type": "add", "item": edge.to_dict()} for edge in self._edges.values()],
+            }
+
+        newer = []
+        entry = self._log
+        while entry is not None and entry[0] > since_version:
+            newer.append(entry[1])
+            entry = entry[2]
+        newer.reverse()
+        return {
+            "version": self.version,
+            "reset": False,
+            "nodes": [_to_change(change) for changes in newer for change in changes["nodes"]],
+            "edges": [_to_change(change) for changes in newer for change in changes["edges"]],
+        }
+
+    def get_graph(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Return the React Flow graph for the current index.
+
+        Returns:
+            Dictionary with 'nodes' and 'edges' keys. The result is cached until
+            the next delta is applied and must not be modified.
+        """
+        return self.cached("react-flow", lambda: {
+            "nodes": [_as_dict(self._node_dicts, node) for node in self._used.values()],
+            "edges": [_as_dict(self._edge_dicts, edge) for edge in self._edges.values()],
+        })
+
+    def is_cached(self, key: str) -> bool:
+        """Whether a serialization of the current index is cached under key."""
+        return key in self._outputs
+
+    def cached(self, key: str, factory: Callable[[], Any]) -> Any:
+        """
+        Return a serialization of the current index, creating it on first use.
+
+        Args:
+            key: Name of the serialization format
+            factory: Callable that creates the serialization
+
+        Returns:
+            The serialization, cached until the next delta is applied
+        """
+        if key not in self._outputs:
+            self._outputs[key] = factory()
+        return self._outputs[key]
+
+    def get_records(self) -> Dict[str, List[Any]]:
+        """
+        Return the compact graph for the current index.
+
+        Returns:
+            Dictionary with 'nodes' and 'edges' keys containing NodeRecord and
+            EdgeRecord tuples in the same order as get_graph().
+        """
+        return {"nodes": list(self._used.values()), "edges": list(self._edges.values())}
+
+    def add_node(self, node: NodeRecord) -> None:
+        """
+        Add or replace the node of a state.
+
+        Args:
+            node: Node record of the state
+        """
+        name = node.id
+        self._states[name] = node
+        if self._refcount.get(name):
+            self._used[name] = node
+            self._node_dicts.pop(name, None)
+            self._pending["nodes"].append(("replace", name, node))
+            self._outputs.clear()
+
+    def edge_ids(self, source: str, target: str, trigger: Optional[str] = None) -> List[str]:
+        """
+        Return the IDs of all edges between two states.
+
+        Args:
+            source: Name of the source state
+            target: Name of the target state
+            trigger: If given, only the edges of this trigger are returned
+
+        Returns:
+            List of edge IDs, one per trigger connecting both states
+        """
+        edge_ids = self._pair_edges.get((source, target), [])
+        if trigger is None:
+            return edge_ids
+        return [edge_id for edge_id in edge_ids if self._edges[edge_id].label == trigger]
+
+    def out_edges(self, name: str) -> List[EdgeRecord]:
+        """
+        Return the edges leaving a state.
+
+        Args:
+            name: Name of the state
+
+        Returns:
+            Edge records in the order they were added
+        """
+        return [self._edges[edge_id] for edge_id in self._out_edges.get(name, ())]
+
+    def in_edges(self, name: str) -> List[EdgeRecord]:
+        """
+        Return the edges entering a state.
+
+        Args:
+            name: Name of the state
+
+        Returns:
+            Edge records in the order they were added
+        """
+        return [self._edges[edge_id] for edge_id in self._in_edges.get(name, ())]
+
+    def triggers(self, name: str) -> List[str]:
+        """
+        Return the triggers of the edges leaving a state.
+
+        Args:
+            name: Name of the state
+
+        Returns:
+            Names of the triggers without duplicates
+        """
+        return list(dict.fromkeys(self._edges[edge_id].label for edge_id in self._out_edges.get(name, ())))
+
+    def reachable(self, name: str, max_distance: Optional[int] = None) -> Iterator[str]:
+        """
+        Yield the states that can be reached from a state by following edges.
+
+        States are visited breadth-first, so they are yielded by increasing
+        distance and the search can be stopped early. The state itself is only
+        yielded if it is part of a cycle.
+
+        Args:
+            name: Name of the state to start from
+            max_distance: Maximum number of edges to follow, None for no limit
+
+        Yields:
+            Names of the reachable states
+        """
+        visited: Set[str] = set()
+        frontier = [name]
+        distance = 0
+        while frontier and (max_distance is None or distance < max_distance):
+            distance += 1
+            following = []
+            for state in frontier:
+                for edge_id in self._out_edges.get(state, ()):
+                    target = self._edges[edge_id].target
+                    if target not in visited:
+                        visited.add(target)
+                        following.append(target)
+                        yield target
+            frontier = following
+
+    def has_node(self, name: str) -> bool:
+        """
+        Check whether a state is a node of the graph.
+
+        Args:
+            name: Name of the state
+
+        Returns:
+            True if at least one edge references the state
+        """
+        return name in self._used
+
+    def subgraph(self, roots: Iterable[str], radius: int = 1,
+                 max_nodes: Optional[int] = None) -> Dict[str, List[Any]]:
+        """
+        Return the neighbourhood of some states.
+
+        Nodes are collected with a breadth-first search from the roots that
+        follows edges in both directions. Only edges between collected nodes
+        are included.
+
+        Args:
+            roots: Names of the states to start from, unknown names are ignored
+            radius: Maximum number of edges between a root and a collected node
+            max_nodes: Maximum number of collected nodes, None for no limit
+
+        Returns:
+            Dictionary with 'nodes' and 'edges' keys containing NodeRecord and
+            EdgeRecord tuples, nodes in the order they were collected. The
+            ancestors of collected nested states are included before them.
+        """
+        limit = len(self._used) if max_nodes is None else max_nodes
+        collected: Dict[str, None] = {}
+        frontier = []
+        for name in roots:
+            if name in self._used and name not in collected and len(collected) < limit:
+                collected[name] = None
+                frontier.append(name)
+
+        for _ in range(radius):
+            following = []
+            for name in frontier:
+                if len(collected) >= limit:
+                    break
+                for other in self._neighbours(name):
+                    if other not in collected:
+                        collected[other] = None
+                        following.append(other)
+                        if len(collected) >= limit:
+                            break
+            frontier = following
+
+        edges = [
+            self._edges[edge_id]
+            for name in collected
+            for edge_id in self._out_edges.get(name, ())
+            if self._edges[edge_id].target in collected
+        ]
+        nodes: Dict[str, NodeRecord] = {}
+        for name in collected:
+            if self._used[name].parent is not None:
+                for ancestor in reversed(self._ancestors(name)):
+                    nodes.setdefault(ancestor, self._used[ancestor])
+            nodes.setdefault(name, self._used[name])
+        return {"nodes": list(nodes.values()), "edges": edges}
+
+    def collapse(self, max_depth: Optional[int] = None, collapsed: Collection[str] = ()) -> Dict[str, List[Any]]:
+        """
+        Return the graph with the descendants of some states hidden in them.
+
+        Edges of hidden states are rolled up to their closest visible ancestor.
+        Edges within a hidden subtree are dropped, and edges leaving or entering
+        it are merged into one edge per source, target and trigger. Rolled up
+        edges continue the ID counter of their state pair, so their IDs never
+        collide with edges of the full graph.
+
+        Args:
+            max_depth: Deepest nesting level that is shown, 0 for top level
+                       states only, None for no limit
+            collapsed: IDs of nodes whose descendants are hidden
+
+        Returns:
+            Dictionary with 'nodes' and 'edges' keys containing NodeRecord and
+            EdgeRecord tuples. Nodes with hidden descendants are marked as collapsed.
+        """
+        visible = self._resolver(max_depth, collapsed)
+        nodes = [self._view_node(node, visible) for name, node in self._used.items() if visible(name) == name]
+        return {"nodes": nodes, "edges": self._view_edges(self._edges.values(), visible)}
+
+    def expand(self, name: str, max_depth: Optional[int] = None,
+               collapsed: Collection[str] = ()) -> Dict[str, List[Any]]:
+        """
+        Return the elements hidden in a collapsed node.
+
+        The view is the one of collapse(max_depth, collapsed) with the node
+        expanded by one level, so its children are shown and collapsed in turn
+        if they have children. Only the nested states and edges of the node are
+        visited, not the whole graph.
+
+        Args:
+            name: ID of the node to expand
+            max_depth: Deepest nesting level shown by the view, None for no limit
+            collapsed: IDs of nodes whose descendants are hidden in the view
+
+        Returns:
+            Dictionary with 'nodes' and 'edges' keys containing NodeRecord and
+            EdgeRecord tuples: the children of the node and every edge of the
+            view incident to the node or its children. These edges replace the
+            edges of the collapsed node.
+
+        Raises:
+            ValueError: If the node does not exist or is hidden in the view
+        """
+        if name not in self._used or self._resolver(max_depth, collapsed)(name) != name:
+            raise ValueError(f"State {name!r} is not a node of the graph")
+        visible = self._resolver(max_depth, collapsed, name)
+        children = [child for child in self._children.get(name, ()) if child in self._used]
+        shown = set(children)
+        shown.add(name)
+
+        edge_ids: Dict[str, None] = {}
+        pending = [name]
+        while pending:
+            state = pending.pop()
+            edge_ids.update(self._out_edges.get(state, {}))
+            edge_ids.update(self._in_edges.get(state, {}))
+            pending.extend(self._children.get(state, ()))
+        edges = self._view_edges((self._edges[edge_id] for edge_id in edge_ids), visible)
+        return {
+            "nodes": [self._view_node(self._used[child], visible) for child in children],
+            "edges": [edge for edge in edges if edge.source in shown or edge.target in shown],
+        }
+
+    def bundle(self, records: Dict[str, List[Any]], min_sources: int) -> Dict[str, List[Any]]:
+        """
+        Replace edges of one trigger into one node from many sources by a single edge.
+
+        Edges with the same label and target from at least min_sources
+        different sources form a bundle. Bundles with the same sources share a
+        virtual source node, which is marked as collapsed. Its ID is '*' if it
+        stands for every node of the records, as for transitions with source
+        '*', and '*1', '*2', ... otherwise. Bundled edges follow the other edges.
+
+        Args:
+            records: Dictionary with 'nodes' and 'edges' record lists, e.g. from get_records()
+            min_sources: Minimum number of sources of a bundle
+
+        Returns:
+            Dictionary with 'nodes' and 'edges' record lists, including the virtual nodes
+        """
+        sources: Dict[Tuple[str, str], Dict[str, None]] = {}
+        for edge in records["edges"]:
+            sources.setdefault((edge.label, edge.target), {})[edge.source] = None
+        bundles = {key: frozenset(names) for key, names in sources.items() if len(names) >= min_sources}
+        if not bundles:
+            return records
+
+        everything = frozenset(node.id for node in records["nodes"])
+        virtual: Dict[FrozenSet[str], NodeRecord] = {}
+        numbered = 0
+        edges = [edge for edge in records["edges"] if (edge.label, edge.target) not in bundles]
+        edge_counter: Dict[Tuple[str, str], int] = {}
+        for (label, target), names in bundles.items():
+            node = virtual.get(names)
+            if node is None:
+                if names == everything:
+                    node = NodeRecord("*", "any state", None, True)
+                else:
+                    numbered += 1
+                    node = NodeRecord(f"*{numbered}", f"{len(names)} states", None, True)
+                virtual[names] = node
+            edge_count = edge_counter.get((node.id, target), 0)
+            edge_counter[(node.id, target)] = edge_count + 1
+            edges.append(EdgeRecord(EdgeRecord.make_id(node.id, target, edge_count), node.id, target, label))
+        return {"nodes": records["nodes"] + list(virtual.values()), "edges": edges}
+
+    def merge_parallel(self, records: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
+        """
+        Merge parallel edges between the same source and target into one edge.
+
+        The merged edge takes the place and ID of the first edge it stands for,
+        so overlays highlighting that edge apply to it. Its label joins the
+        distinct triggers of the merged edges.
+
+        Args:
+            records: Dictionary with 'nodes' and 'edges' record lists, e.g. from get_records()
+
+        Returns:
+            Dictionary with 'nodes' and 'edges' record lists
+        """
+        pairs: Dict[Tuple[str, str], List[EdgeRecord]] = {}
+        for edge in records["edges"]:
+            pairs.setdefault((edge.source, edge.target), []).append(edge)
+        if len(pairs) == len(records["edges"]):
+            return records
+
+        edges = []
+        for edge in records["edges"]:
+            parallel = pairs[(edge.source, edge.target)]
+            if len(parallel) == 1:
+                edges.append(edge)
+            elif parallel[0] is edge:
+                triggers = tuple(other.label for other in parallel)
+                label = ", ".join(dict.fromkeys(triggers))
+                edges.append(EdgeRecord(edge.id, edge.source, edge.target, label, triggers))
+        return {"nodes": records["nodes"], "edges": edges}
+
+    def to_dicts(self, records: Dict[str, List[Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Convert records of this index to React Flow dictionaries.
+
+        Args:
+            records: Dictionary with 'nodes' and 'edges' record lists, e.g. from subgraph()
+
+        Returns:
+            Dictionary with 'nodes' and 'edges' keys. Dictionaries of elements
+            that are part of the index are shared with get_graph() and must not
+            be modified.
+        """
+        return {
+            "nodes": [_as_dict(self._node_dicts, node, self._used) for node in records["nodes"]],
+            "edges": [_as_dict(self._edge_dicts, edge, self._edges) for edge in records["edges"]],
+        }
+
+    def sync_trigger(self, trigger: str, pairs: Iterable[Tuple[str, str]]) -> None:
+        """
+        Bring the edges of a trigger in line with its current transitions.
+
+        Edges that still exist keep their IDs, missing edges are added and
+        edges without a matching transition are removed.
+
+        Args:
+            trigger: Name of the trigger
+            pairs: (source, target) pairs of all transitions of the trigger
+        """
+        pairs = list(pairs)
+        wanted = Counter(pairs)
+        kept = []
+
+        for edge_id in self._trigger_edges.pop(trigger, []):
+            edge = self._edges[edge_id]
+            key = (edge.source, edge.target)
+            if wanted[key] > 0:
+                wanted[key] -= 1
+                kept.append(edge_id)
+            else:
+                self._delete_edge(edge_id)
+
+        if kept:
+            self._trigger_edges[trigger] = kept
+
+        for source, target in pairs:
+            if wanted[(source, target)] > 0:
+                wanted[(source, target)] -= 1
+                self._add_edge(source, target, trigger)
+
+    def _add_edge(self, source: str, target: str, trigger: str) -> None:
+        """Create an edge with a unique ID and add it to the index."""
+        edge_count = self._edge_counter.get((source, target), 0)
+        self._edge_counter[(source, target)] = edge_count + 1
+        self._insert_edge(EdgeRecord.create(EdgeRecord.make_id(source, target, edge_count), source, target, trigger))
+
+    def _insert_edge(self, edge: EdgeRecord) -> None:
+        """Add an edge to the index and reference its endpoints."""
+        self._edges[edge.id] = edge
+        self._own(self._trigger_edges, edge.label, list).append(edge.id)
+        self._own(self._pair_edges, (edge.source, edge.target), list).append(edge.id)
+        self._own(self._out_edges, edge.source, dict)[edge.id] = None
+        self._own(self._in_edges, edge.target, dict)[edge.id] = None
+        self._reference(edge.source, 1)
+        self._reference(edge.target, 1)
+        self._pending["edges"].append(("add", edge.id, edge))
+        self._outputs.clear()
+
+    def _delete_edge(self, edge_id: str) -> None:
+        """Remove an edge from the index and release its endpoints."""
+        edge = self._edges.pop(edge_id)
+        self._edge_dicts.pop(edge_id, None)
+        pair = (edge.source, edge.target)
+        pair_edges = self._own(self._pair_edges, pair, list)
+        pair_edges.remove(edge_id)
+        if not pair_edges:
+            del self._pair_edges[pair]
+        self._discard(self._out_edges, edge.source, edge_id)
+        self._discard(self._in_edges, edge.target, edge_id)
+        self._reference(edge.source, -1)
+        self._reference(edge.target, -1)
+        self._pending["edges"].append(("remove", edge_id, None))
+        self._outputs.clear()
+
+    def _own(self, index: Dict[Any, Any], key: Any, factory: Callable[..., Any]) -> Any:
+        """
+        Return the list or dictionary of an index entry for changing it.
+
+        Missing entries are created, and entries shared with the index this
+        one was copied from are copied first.
+
+        Args:
+            index: Index mapping keys to lists or dictionaries
+            key: Key of the entry
+            factory: Type of the entry, called without arguments to create and
+                     with the shared entry to copy it
+
+        Returns:
+            The entry, which is only referenced by this index
+        """
+        entry = index.get(key)
+        if entry is not None and (self._owned is None or id(entry) in self._owned):
+            return entry
+        entry = index[key] = factory() if entry is None else factory(entry)
+        if self._owned is not None:
+            self._owned.add(id(entry))
+        return entry
+
+    def _discard(self, index: Dict[str, Dict[str, None]], name: str, edge_id: str) -> None:
+        """Remove an edge ID from the adjacency of a state."""
+        edges = self._own(index, name, dict)
+        del edges[edge_id]
+        if not edges:
+            del index[name]
+
+    def _neighbours(self, name: str) -> Iterator[str]:
+        """Yield the targets of outgoing and the sources of incoming edges of a state."""
+        for edge_id in self._out_edges.get(name, ()):
+            yield self._edges[edge_id].target
+        for edge_id in self._in_edges.get(name, ()):
+            yield self._edges[edge_id].source
+
+    def _ancestors(self, name: str) -> List[str]:
+        """Return the IDs of the ancestors of a state, starting with its parent."""
+        ancestors = []
+        node = self._states.get(name)
+        while node is not None and node.parent is not None:
+            ancestors.append(node.parent)
+            node = self._states.get(node.parent)
+        return ancestors
+
+    def _resolver(self, max_depth: Optional[int], collapsed: Collection[str],
+                  expanded: Optional[str] = None) -> Callable[[str], str]:
+        """
+        Create a function that maps states to their node in a collapsed view.
+
+        Args:
+            max_depth: Deepest nesting level that is shown, None for no limit
+            collapsed: IDs of nodes whose descendants are hidden
+            expanded: ID of a node whose children are shown regardless of both
+
+        Returns:
+            Function returning the ID of the closest visible ancestor of a
+            state, or the state itself if it is visible
+        """
+        resolved: Dict[str, str] = {}
+
+        def visible(name: str) -> str:
+            result = resolved.get(name)
+            if result is None:
+                result = name
+                path = self._ancestors(name)
+                path.reverse()
+                path.append(name)
+                for depth, state in enumerate(path):
+                    if state == expanded:
+                        continue
+                    if (depth > 0 and path[depth - 1] == expanded) or state in collapsed or depth == max_depth:
+                        result = state
+                        break
+                resolved[name] = result
+            return result
+
+        return visible
+
+    def _view_node(self, node: NodeRecord, visible: Callable[[str], str]) -> NodeRecord:
+        """Return the record of a visible node, marked as collapsed if its children are hidden."""
+        children = self._children.get(node.id)
+        if children and any(child in self._used and visible(child) != child for child in children):
+            return node._replace(collapsed=True)
+        return node
+
+    def _view_edges(self, edges: Iterable[EdgeRecord], visible: Callable[[str], str]) -> List[EdgeRecord]:
+        """Return the edges between visible nodes, rolling up edges of hidden states."""
+        kept = []
+        rolled: Dict[Tuple[str, str], Set[str]] = {}
+        for edge in edges:
+            source, target = visible(edge.source), visible(edge.target)
+            if source == edge.source and target == edge.target:
+                kept.append(edge)
+            elif source != target:
+                rolled.setdefault((source, target), set()).add(edge.label)
+
+        for (source, target), labels in rolled.items():
+            # Triggers that also connect both nodes directly are already shown
+            labels.difference_update(
+                self._edges[edge_id].label for edge_id in self._pair_edges.get((source, target), ()))
+            # Sorted, so IDs do not depend on the order the edges were visited in
+            for edge_count, label in enumerate(sorted(labels), self._edge_counter.get((source, target), 0)):
+                kept.append(EdgeRecord(EdgeRecord.make_id(source, target, edge_count), source, target, label))
+        return kept
+
+    def _reference(self, name: str, delta: int) -> None:
+        """Adjust the reference count of a state and update the used nodes."""
+        count = self._refcount.get(name, 0) + delta
+        if count > 0:
+            self._refcount[name] = count
+            if count == delta and name in self._states:
+                self._used[name] = self._states[name]
+                self._pending["nodes"].append(("add", name, self._states[name]))
+        else:
+            self._refcount.pop(name, None)
+            if self._used.pop(name, None) is not None:
+                self._node_dicts.pop(name, None)
+                self._pending["nodes"].append(("remove", name, None))
+
+
+def _reuse_edge_ids(previous: Dict[str, EdgeRecord], edges: List[EdgeRecord]) -> Optional[List[EdgeRecord]]:
+    """
+    Give rebuilt edges the IDs of the equal edges of a previous index.
+
+    Edges are equal if their source, target and trigger are. Other edges keep
+    their ID unless an equal edge took it, in which case they get the next
+    free suffix.
+
+    Args:
+        previous: Edges of the previous index by their ID
+        edges: Edges of the rebuilt index
+
+    Returns:
+        The edges with their new IDs, or None if no ID changed
+    """
+    # Usually every previous edge is rebuilt with its ID, and the others are new
+    kept = 0
+    for edge in edges:
+        other = previous.get(edge.id)
+        if other is not None:
+            if other != edge:
+                break
+            kept += 1
+    else:
+        if kept == len(previous):
+            return None
+
+    previous_ids: Dict[Tuple[str, str, str], Deque[str]] = {}
+    for edge in previous.values():
+        previous_ids.setdefault((edge.source, edge.target, edge.label), deque()).append(edge.id)
+
+    ids: List[Optional[str]] = []
+    for edge in edges:
+        candidates = previous_ids.get((edge.source, edge.target, edge.label))
+        ids.append(candidates.popleft() if candidates else None)
+    used = {edge_id for edge_id in ids if edge_id is not None}
+    for index, edge in enumerate(edges):
+        if ids[index] is None and edge.id not in used:
+            ids[index] = edge.id
+            used.add(edge.id)
+
+    result = []
+    for edge, edge_id in zip(edges, ids):
+        if edge_id is None:
+            edge_count = 0
+            edge_id = EdgeRecord.make_id(edge.source, edge.target)
+            while edge_id in used:
+                edge_count += 1
+                edge_id = EdgeRecord.make_id(edge.source, edge.target, edge_count)
+            used.add(edge_id)
+        result.append(edge if edge_id == edge.id else edge._replace(id=edge_id))
+    if all(new is old for new, old in zip(result, edges)):
+        return None
+    return result
+
+
+def _intern(value: Any) -> Any:
+    """Intern strings so repeated state and trigger names share one object."""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _count_changes(changes: Dict[str, List[Tuple[str, str, Optional[Record]]]]) -> int:
+    """Return the number of node and edge changes of a version."""
+    return len(changes["nodes"]) + len(changes["edges"])
+
+
+def _as_dict(cache: Dict[str, Dict[str, Any]], record: Record,
+             index: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Return the React Flow dictionary of a record, reusing an earlier conversion.
+
+    If an index is given, only records stored in it are cached, so derived
+    records with the same ID are converted on their own.
+    """
+    if index is not None and index.get(record.id) is not record:
+        return record.to_dict()
+    item = cache.get(record.id)
+    if item is None:
+        item = cache[record.id] = record.to_dict()
+    return item
+
+
+def _to_change(change: Tuple[str, str, Optional[Record]]) -> Dict[str, Any]:
+    """Convert a recorded (type, id, record) change to a React Flow change."""
+    change_type, item_id, record = change
+    if record is None:
+        return {"type": change_type, "id": item_id}
+    if change_type == "add":
+        return {"type": change_type, "item": record.to_dict()}
+    return {"type": change_type, "id": item_id, "item": record.to_dict()}
@@ -0,0 +1,163 @@
+"""Type stubs for GraphTopology."""
+
+from typing import (
+    Any, Callable, Collection, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+)
+
+MAX_CHANGES: int
+
+
+class NodeRecord(NamedTuple):
+    id: str
+    label: str
+    parent: Optional[str] = ...
+    collapsed: bool = ...
+
+    @classmethod
+    def create(
+        cls, name: str, label: Optional[str] = ..., parent: Optional[str] = ...
+    ) -> NodeRecord: ...
+
+    def to_dict(self) -> Dict[str, Any]: ...
+
+
+class EdgeRecord(NamedTuple):
+    id: str
+    source: str
+    target: str
+    label: str
+    triggers: Tuple[str, ...] = ...
+
+    @classmethod
+    def create(
+        cls, edge_id: str, source: str, target: str, label: str
+    ) -> EdgeRecord: ...
+
+    @staticmethod
+    def make_id(source: str, target: str, count: int = ...) -> str: ...
+
+    def id_count(self) -> Optional[int]: ...
+
+    def to_dict(self) -> Dict[str, Any]: ...
+
+
+Record = Union[NodeRecord, EdgeRecord]
+
+
+class GraphTopology:
+    fingerprint: Tuple[Any, ...]
+    layouts: Dict[str, Dict[str, Dict[str, Any]]]
+
+    def __init__(self, fingerprint: Tuple[Any, ...]) -> None: ...
+
+    @property
+    def version(self) -> int: ...
+
+    def load(
+        self, nodes: List[NodeRecord], edges: List[EdgeRecord]
+    ) -> None: ...
+
+    def inherit(self, previous: GraphTopology) -> None: ...
+
+    def share(self) -> bool: ...
+
+    def for_update(self) -> GraphTopology: ...
+
+    def copy(self) -> GraphTopology: ...
+
+    def __getstate__(self) -> Dict[str, Any]: ...
+
+    def __setstate__(self, state: Dict[str, Any]) -> None: ...
+
+    def commit(self, fingerprint: Tuple[Any, ...]) -> None: ...
+
+    def _trim_log(self) -> None: ...
+
+    def diff(self, since_version: int) -> Dict[str, Any]: ...
+
+    def get_graph(self) -> Dict[str, List[Dict[str, Any]]]: ...
+
+    def is_cached(self, key: str) -> bool: ...
+
+    def cached(self, key: str, factory: Callable[[], Any]) -> Any: ...
+
+    def get_records(self) -> Dict[str, List[Any]]: ...
+
+    def add_node(self, node: NodeRecord) -> None: ...
+
+    def edge_ids(
+        self, source: str, target: str, trigger: Optional[str] = ...
+    ) -> List[str]: ...
+
+    def out_edges(self, name: str) -> List[EdgeRecord]: ...
+
+    def in_edges(self, name: str) -> List[EdgeRecord]: ...
+
+    def triggers(self, name: str) -> List[str]: ...
+
+    def reachable(
+        self, name: str, max_distance: Optional[int] = ...
+    ) -> Iterator[str]: ...
+
+    def has_node(self, name: str) -> bool: ...
+
+    def subgraph(
+        self,
+        roots: Iterable[str],
+        radius: int = ...,
+        max_nodes: Optional[int] = ...,
+    ) -> Dict[str, List[Any]]: ...
+
+    def collapse(
+        self, max_depth: Optional[int] = ..., collapsed: Collection[str] = ...
+    ) -> Dict[str, List[Any]]: ...
+
+    def expand(
+        self,
+        name: str,
+        max_depth: Optional[int] = ...,
+        collapsed: Collection[str] = ...,
+    ) -> Dict[str, List[Any]]: ...
+
+    def bundle(
+        self, records: Dict[str, List[Any]], min_sources: int
+    ) -> Dict[str, List[Any]]: ...
+
+    def merge_parallel(
+        self, records: Dict[str, List[Any]]
+    ) -> Dict[str, List[Any]]: ...
+
+    def to_dicts(
+        self, records: Dict[str, List[Any]]
+    ) -> Dict[str, List[Dict[str, Any]]]: ...
+
+    def sync_trigger(
+        self, trigger: str, pairs: Iterable[Tuple[str, str]]
+    ) -> None: ...
+
+    def _own(
+        self, index: Dict[Any, Any], key: Any, factory: Callable[..., Any]
+    ) -> Any: ...
+
+    def _discard(
+        self, index: Dict[str, Dict[str, None]], name: str, edge_id: str
+    ) -> None: ...
+
+    def _neighbours(self, name: str) -> Iterator[str]: ...
+
+    def _ancestors(self, name: str) -> List[str]: ...
+
+    def _resolver(
+        self,
+        max_depth: Optional[int],
+        collapsed: Collection[str],
+        expanded: Optional[str] = ...,
+    ) -> Callable[[str], str]: ...
+
+    def _view_node(
+        self, node: NodeRecord, visible: Callable[[str], str]
+    ) -> NodeRecord: ...
+
+    def _view_edges(
+        self, edges: Iterable[EdgeRecord], visible: Callable[[str], str]
+    ) -> List[EdgeRecord]: ...